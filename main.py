@@ -10,14 +10,39 @@ them to three output surfaces:
 * **PR comment** — a compact Markdown summary (idempotently updated)
 """
 
+import abc
+import asyncio
+import base64
+import contextlib
+import functools
+import hashlib
+import heapq
+import itertools
 import json
+import mmap
 import os
+import queue
+import re
+import shutil
+import sqlite3
+import struct
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from typing import IO, Any, Callable, Iterable, Iterator
 
 COMMIT_MESSAGE_DELIMITER = "\x00"
+#: Bytes of ``git rev-list`` output read at a time.
+LOG_CHUNK_SIZE = 64 * 1024
+#: Commits read ahead of the checks; past this many git waits for them.
+LOG_QUEUE_SIZE = 256
 RULES_URL = "https://commit-check.com/rules/"
 
 #: Hidden marker identifying comments this action owns.
@@ -52,8 +77,6 @@ REPORT_TITLE = "## Commit Check"
 #: Drop these once a release has been out long enough.
 LEGACY_TITLES = ("# Commit Check", "# Commit-Check")
 
-GITHUB_STEP_SUMMARY = os.getenv("GITHUB_STEP_SUMMARY", "")
-
 #: Human-readable labels for the non-message CLI flags.
 CHECK_LABELS = {
     "--branch": "Branch",
@@ -61,12 +84,29 @@ CHECK_LABELS = {
     "--author-email": "Author email",
 }
 
+#: The ``check`` names commit-check reports for each non-message CLI flag, used
+#: to split one combined invocation back into one scope per flag.
+CHECK_TYPES = {
+    "--branch": ("branch", "merge_base"),
+    "--author-name": ("author_name",),
+    "--author-email": ("author_email",),
+}
+
 
 def env_flag(name: str, default: str = "false") -> bool:
     """Read a GitHub Action boolean-style environment variable."""
     return os.getenv(name, default).lower() == "true"
 
 
+def env_int(name: str, default: int = 0) -> int:
+    """Read a GitHub Action integer input; blank or malformed means ``default``."""
+    try:
+        return int(os.getenv(name, "").strip() or default)
+    except ValueError:
+        print(f"::warning::Ignoring non-integer {name}={os.getenv(name)!r}")
+        return default
+
+
 def _reconfigure_io() -> None:
     """Reconfigure stdout/stderr to UTF-8 so emoji and check marks never
     crash on runners with legacy encodings (e.g. cp1252 on Windows)."""
@@ -75,14 +115,71 @@ def _reconfigure_io() -> None:
             stream.reconfigure(encoding="utf-8", errors="replace")
 
 
-MESSAGE_ENABLED = env_flag("MESSAGE")
-BRANCH_ENABLED = env_flag("BRANCH")
-AUTHOR_NAME_ENABLED = env_flag("AUTHOR_NAME")
-AUTHOR_EMAIL_ENABLED = env_flag("AUTHOR_EMAIL")
-DRY_RUN_ENABLED = env_flag("DRY_RUN")
-JOB_SUMMARY_ENABLED = env_flag("JOB_SUMMARY")
-PR_COMMENTS_ENABLED = env_flag("PR_COMMENTS")
-PR_TITLE_ENABLED = env_flag("PR_TITLE")
+# The action's inputs, set by load_inputs().
+GITHUB_STEP_SUMMARY: str
+MESSAGE_ENABLED: bool
+BRANCH_ENABLED: bool
+AUTHOR_NAME_ENABLED: bool
+AUTHOR_EMAIL_ENABLED: bool
+DRY_RUN_ENABLED: bool
+JOB_SUMMARY_ENABLED: bool
+PR_COMMENTS_ENABLED: bool
+PR_TITLE_ENABLED: bool
+MAX_WORKERS: int
+BACKEND: str
+SCOPE_TIMEOUT: int
+TIME_BUDGET: int
+FAIL_FAST_ENABLED: bool
+MAX_FAILURES: int
+CACHE_DIR: str
+CACHE_MAX_SIZE: int
+GIT_NOTES_ENABLED: bool
+GIT_NOTES_PUSH_ENABLED: bool
+STATS_FILE: str
+SKIP_UPSTREAM_ENABLED: bool
+NATIVE_GIT_ENABLED: bool
+DEEPEN_ROUNDS: int
+
+
+def load_inputs() -> None:
+    """Read the action's inputs from the environment.
+
+    Done on import, and again by every ``main()``, so a process that runs the
+    action more than once sees each run's inputs rather than the first's.
+    """
+    global GITHUB_STEP_SUMMARY, MESSAGE_ENABLED, BRANCH_ENABLED
+    global AUTHOR_NAME_ENABLED, AUTHOR_EMAIL_ENABLED, DRY_RUN_ENABLED
+    global JOB_SUMMARY_ENABLED, PR_COMMENTS_ENABLED, PR_TITLE_ENABLED
+    global MAX_WORKERS, BACKEND, SCOPE_TIMEOUT, TIME_BUDGET, FAIL_FAST_ENABLED
+    global MAX_FAILURES, CACHE_DIR, CACHE_MAX_SIZE, GIT_NOTES_ENABLED
+    global GIT_NOTES_PUSH_ENABLED, STATS_FILE, SKIP_UPSTREAM_ENABLED
+    global NATIVE_GIT_ENABLED, DEEPEN_ROUNDS
+    GITHUB_STEP_SUMMARY = os.getenv("GITHUB_STEP_SUMMARY", "")
+    MESSAGE_ENABLED = env_flag("MESSAGE")
+    BRANCH_ENABLED = env_flag("BRANCH")
+    AUTHOR_NAME_ENABLED = env_flag("AUTHOR_NAME")
+    AUTHOR_EMAIL_ENABLED = env_flag("AUTHOR_EMAIL")
+    DRY_RUN_ENABLED = env_flag("DRY_RUN")
+    JOB_SUMMARY_ENABLED = env_flag("JOB_SUMMARY")
+    PR_COMMENTS_ENABLED = env_flag("PR_COMMENTS")
+    PR_TITLE_ENABLED = env_flag("PR_TITLE")
+    MAX_WORKERS = env_int("MAX_WORKERS")
+    BACKEND = os.getenv("BACKEND", "auto").strip().lower() or "auto"
+    SCOPE_TIMEOUT = env_int("SCOPE_TIMEOUT")
+    TIME_BUDGET = env_int("TIME_BUDGET")
+    FAIL_FAST_ENABLED = env_flag("FAIL_FAST")
+    MAX_FAILURES = env_int("MAX_FAILURES")
+    CACHE_DIR = os.getenv("CACHE_DIR", "").strip()
+    CACHE_MAX_SIZE = env_int("CACHE_MAX_SIZE", 64)
+    GIT_NOTES_ENABLED = env_flag("GIT_NOTES")
+    GIT_NOTES_PUSH_ENABLED = env_flag("GIT_NOTES_PUSH")
+    STATS_FILE = os.getenv("STATS_FILE", "").strip()
+    SKIP_UPSTREAM_ENABLED = env_flag("SKIP_UPSTREAM")
+    NATIVE_GIT_ENABLED = env_flag("NATIVE_GIT")
+    DEEPEN_ROUNDS = env_int("DEEPEN_ROUNDS", 8)
+
+
+load_inputs()
 
 
 @dataclass
@@ -93,15 +190,27 @@ class ScopeResult:
     ``checks`` holds the parsed JSON check outcomes (only set when the CLI
     produced valid JSON); ``raw_text`` holds the raw CLI output when parsing
     failed (a defensive fallback so unexpected output is never swallowed).
+
+    ``outcome`` is set instead when the scope never got a verdict at all —
+    ``timeout`` when its check was killed, ``skip`` when it was never started
+    — and ``reason`` says why, in words the report can print as they are.
     """
 
     label: str
     checks: list[dict[str, str]] = field(default_factory=list)
     raw_text: str = ""
+    outcome: str = ""
+    reason: str = ""
+    #: The commit a ``Commit i/N`` scope checked, when git reported it.
+    sha: str = ""
 
     @property
     def status(self) -> str:
-        """Overall status: ``pass``, ``fail``, or ``skip``.
+        """Overall status: ``pass``, ``fail``, ``skip`` or ``timeout``.
+
+        ``timeout`` and a never-started ``skip`` come from ``outcome``; a
+        killed check produced no output, and reading that as unparseable
+        output would report it as a policy failure with nothing to show.
 
         ``skip`` means every rule in this scope declined to run — the author
         is on an ``ignore_authors`` list, or there was nothing to check. It
@@ -112,6 +221,8 @@ class ScopeResult:
         A single real verdict outranks the skips: a scope is ``skip`` only
         when *all* of its checks skipped.
         """
+        if self.outcome:
+            return self.outcome
         if self.raw_text and not self.checks:
             return "fail"
         if any(c["status"] == "fail" for c in self.checks):
@@ -127,29 +238,187 @@ class ScopeResult:
 
 
 def overall_status(results: list[ScopeResult]) -> str:
-    """Reduce scope statuses to one of ``pass``/``fail``/``skip``.
+    """Reduce scope statuses to one of ``pass``/``fail``/``timeout``/``skip``.
 
     One function, used by every completion path, because the alternative
     is what this replaced: four separate ``all(... == "pass")`` tests, each
     correct only while exactly two statuses existed. The moment ``skip``
     appeared they all silently reclassified a skipped run as a failure.
 
-    ``skip`` requires at least one scope and all of them skipped.
+    ``skip`` requires at least one scope and all of them skipped. A real
+    failure outranks a timeout, which outranks everything else: a scope that
+    never finished cannot be reported as passing. Nor can a run that ran out
+    of its time budget before starting every scope, so that is a timeout too.
     """
-    if any(scope.status == "fail" for scope in results):
+    return reduce_statuses(
+        [scope.status for scope in results],
+        any(scope.reason == BUDGET_EXHAUSTED for scope in results),
+    )
+
+
+def reduce_statuses(statuses: list[str], out_of_time: bool = False) -> str:
+    """``overall_status`` of statuses already read off their scopes;
+    ``out_of_time`` when the time budget left any of them unstarted."""
+    if "fail" in statuses:
         return "fail"
-    if results and all(scope.status == "skip" for scope in results):
+    if "timeout" in statuses or out_of_time:
+        return "timeout"
+    if statuses and all(status == "skip" for status in statuses):
         return "skip"
     return "pass"
 
 
-def exit_code_for(results: list[ScopeResult]) -> int:
-    """Only a failure is an error.
+def exit_code_for(results: "list[ScopeResult] | Report") -> int:
+    """Only a failure or a timeout is an error.
 
     A skipped run validated nothing, but it violated no policy either, so
-    it must not fail the workflow.
+    it must not fail the workflow. A timed-out one might have.
+    """
+    status = results.status if isinstance(results, Report) else overall_status(results)
+    return 1 if status in ("fail", "timeout") else 0
+
+
+#: Monotonic time by which the run's checks must finish; ``None`` for no limit.
+_deadline: float | None = None
+
+#: ``reason`` of a scope never started because the time budget ran out.
+BUDGET_EXHAUSTED = "not evaluated: time budget exhausted"
+
+
+def time_left(scopes: int = 1) -> float | None:
+    """Seconds the next check of ``scopes`` scopes may take; ``None`` for no limit.
+
+    The ``scope-timeout`` input per scope, cut to whatever is left of the
+    ``time-budget`` input. Zero or less means the budget is spent.
     """
-    return 1 if overall_status(results) == "fail" else 0
+    limits: list[float] = []
+    if SCOPE_TIMEOUT > 0:
+        limits.append(SCOPE_TIMEOUT * scopes)
+    if _deadline is not None:
+        limits.append(_deadline - time.monotonic())
+    return min(limits) if limits else None
+
+
+#: Failed or timed-out scopes so far in this run, and the lock guarding it:
+#: scopes finish on several threads at once.
+_failures = 0
+_failures_lock = threading.Lock()
+
+#: ``reason`` of a scope never started because the failure limit was reached.
+FAILURE_LIMIT_REACHED = "not evaluated: failure limit reached"
+
+#: Why a check was not started because the run stopped starting checks.
+NOT_STARTED = (FAILURE_LIMIT_REACHED, BUDGET_EXHAUSTED)
+
+#: ``reason`` of a scope whose check was running when the failure limit was
+#: reached, and was killed.
+CANCELLED = "not evaluated: cancelled at the failure limit"
+
+#: Kill switches of the checks running right now (see ``cancellable``), and
+#: the lock guarding them.
+_running: set[Callable[[], None]] = set()
+_running_lock = threading.Lock()
+
+
+class CheckCancelled(Exception):
+    """A running check was killed because the failure limit was reached."""
+
+
+def failure_limit() -> int:
+    """Failures after which no new check is started; ``0`` for no limit.
+
+    ``max-failures`` when set, else 1 for ``fail-fast``.
+    """
+    if MAX_FAILURES > 0:
+        return MAX_FAILURES
+    return 1 if FAIL_FAST_ENABLED else 0
+
+
+def failure_limit_reached() -> bool:
+    """Whether enough scopes failed that the run's verdict is already known."""
+    limit = failure_limit()
+    return limit > 0 and _failures >= limit
+
+
+def tally(scope: ScopeResult) -> ScopeResult:
+    """Count ``scope`` towards the failure limit if it failed; return it.
+
+    The failure that reaches the limit cancels every check still running:
+    the verdict is known, and they could only make the run take longer.
+    """
+    global _failures
+    if scope.status in ("fail", "timeout"):
+        with _failures_lock:
+            _failures += 1
+            reached = _failures == failure_limit()
+        if reached:
+            cancel_running()
+    return scope
+
+
+@contextlib.contextmanager
+def cancellable(kill: Callable[[], None]) -> Iterator[threading.Event]:
+    """Let the failure limit ``kill`` the check running inside the block.
+
+    Yields an event that is set when it did, for the check to raise
+    ``CheckCancelled`` instead of reading the kill as a crash. A check that
+    registers after the limit was reached is killed at once.
+    """
+    cancelled = threading.Event()
+
+    def cancel() -> None:
+        cancelled.set()
+        kill()
+
+    with _running_lock:
+        _running.add(cancel)
+    try:
+        if failure_limit_reached():
+            cancel()
+        yield cancelled
+    finally:
+        with _running_lock:
+            _running.discard(cancel)
+
+
+def cancel_running() -> None:
+    """Kill every check running now (see ``cancellable``)."""
+    with _running_lock:
+        running = list(_running)
+    if running:
+        print(f"::debug::failure limit reached, cancelling {len(running)} checks")
+    for cancel in running:
+        with contextlib.suppress(OSError):
+            cancel()
+
+
+@dataclass
+class RunStats:
+    """What a run measured about itself, for ``stats-file``."""
+
+    backend: str = ""
+    unique_inputs: int = 0
+    #: Seconds spent per phase; see timed().
+    phases: dict[str, float] = field(default_factory=dict)
+
+
+#: The stats of the last run, left in place for main() to record.
+_run_stats = RunStats()
+_run_stats_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def timed(phase: str):
+    """Add the time spent inside to ``phase`` of the run's stats. Also a
+    decorator."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        with _run_stats_lock:
+            phases = _run_stats.phases
+            phases[phase] = phases.get(phase, 0.0) + elapsed
 
 
 def log_env_vars():
@@ -167,157 +436,2536 @@ def log_env_vars():
         "JOB_SUMMARY",
         "PR_COMMENTS",
         "PR_TITLE",
+        "MAX_WORKERS",
+        "BACKEND",
+        "SCOPE_TIMEOUT",
+        "TIME_BUDGET",
+        "FAIL_FAST",
+        "MAX_FAILURES",
+        "CACHE_DIR",
+        "CACHE_MAX_SIZE",
+        "GIT_NOTES",
+        "GIT_NOTES_PUSH",
+        "STATS_FILE",
+        "SKIP_UPSTREAM",
+        "NATIVE_GIT",
+        "DEEPEN_ROUNDS",
     ):
         value = os.getenv(name, "false")
         print(f"::debug::{name}={value}")
 
 
+class RunContext:
+    """The event a run was triggered by, read from the runner on first use.
+
+    The payload behind ``GITHUB_EVENT_PATH`` can run to megabytes on a large
+    PR, and the title, commit count, head SHA, fork and PR number all come
+    from it. It is parsed at most once per context, and everything derived
+    from it is cached alongside, so one run pays for a single parse however
+    many of those it asks for.
+    """
+
+    def __init__(self) -> None:
+        self.event_name = os.getenv("GITHUB_EVENT_NAME", "")
+        self.event_path = os.getenv("GITHUB_EVENT_PATH", "")
+        self.event_error: Exception | None = None
+        self._event: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_pr_event(self) -> bool:
+        return self.event_name in {"pull_request", "pull_request_target"}
+
+    @property
+    def event(self) -> dict[str, Any]:
+        """The payload, or ``{}`` when it is missing or unreadable (see
+        ``event_error``). Locked, since checks ask for it from several
+        threads and the parse is the cost being saved."""
+        with self._lock:
+            if self._event is None:
+                self._event = self._load_event()
+            return self._event
+
+    def _load_event(self) -> dict[str, Any]:
+        if not self.event_path:
+            return {}
+        try:
+            with open(self.event_path, "r", encoding="utf-8") as f:
+                event = json.load(f)
+        except Exception as e:
+            self.event_error = e
+            return {}
+        return event if isinstance(event, dict) else {}
+
+    @functools.cached_property
+    def pull_request(self) -> dict[str, Any]:
+        pull_request = self.event.get("pull_request")
+        return pull_request if isinstance(pull_request, dict) else {}
+
+    @functools.cached_property
+    def pr_commit_count(self) -> int | None:
+        try:
+            return int(self.pull_request["commits"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @functools.cached_property
+    def is_fork(self) -> bool:
+        # A deleted fork leaves ``"repo": null`` behind.
+        head = _payload_field(self.pull_request, "head", "repo", "full_name")
+        base = _payload_field(self.pull_request, "base", "repo", "full_name")
+        return bool(head and base and head != base)
+
+    @functools.cached_property
+    def pr_issue(self) -> Any:
+        """The PR as a PyGithub issue (see ``_get_pr_issue``)."""
+        return _get_pr_issue()
+
+    @functools.cached_property
+    def pr_comments(self) -> list[Any]:
+        """The PR's comments, listed once: ``load_pr_state`` reads the
+        action's own one before the checks, ``add_pr_comments`` updates it
+        after."""
+        return list(self.pr_issue.get_comments())
+
+
+def _payload_field(value: Any, *keys: str) -> Any:
+    """``value[key][...]``, or ``None`` where a level is missing, null or not
+    an object."""
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+_context: RunContext | None = None
+
+
+def run_context() -> RunContext:
+    """The context of the run in progress, or a fresh one outside of one."""
+    return _context or RunContext()
+
+
+@contextlib.contextmanager
+def in_run_context():
+    """Share one RunContext with everything called inside, unless an outer
+    call already does."""
+    global _context
+    if _context is not None:
+        yield _context
+        return
+    _context = RunContext()
+    try:
+        yield _context
+    finally:
+        _context = None
+
+
 def is_pr_event() -> bool:
     """Return whether the workflow was triggered by a PR-style event."""
-    return os.getenv("GITHUB_EVENT_NAME", "") in {"pull_request", "pull_request_target"}
+    return run_context().is_pr_event
 
 
 def get_pr_title() -> str | None:
     """Read PR title from GitHub event payload."""
     if not is_pr_event():
         return None
-    event_path = os.getenv("GITHUB_EVENT_PATH")
-    if not event_path:
+    context = run_context()
+    if context.event_error is not None or not context.event:
+        if context.event_error is not None:
+            print(
+                f"::warning::Failed to read PR title from event: {context.event_error}",
+                file=sys.stderr,
+            )
         return None
-    try:
-        with open(event_path, "r", encoding="utf-8") as f:
-            event = json.load(f)
-        return event.get("pull_request", {}).get("title")
-    except Exception as e:
-        print(f"::warning::Failed to read PR title from event: {e}", file=sys.stderr)
+    return context.pull_request.get("title")
+
+
+def get_pr_commit_count() -> int | None:
+    """Read the number of commits in the PR from the GitHub event payload."""
+    return run_context().pr_commit_count
+
+
+def _read_event_payload() -> dict[str, Any]:
+    """The GitHub event payload, or ``{}`` when it is missing or unreadable."""
+    return run_context().event
+
+
+def get_pr_head_sha() -> str | None:
+    """The SHA of the PR's head commit, from the event payload."""
+    return _payload_field(_read_event_payload(), "pull_request", "head", "sha")
+
+
+def get_pr_base_sha() -> str | None:
+    """The SHA of the base branch the PR targets, from the event payload."""
+    return _payload_field(_read_event_payload(), "pull_request", "base", "sha")
+
+
+def get_edited_fields() -> set[str] | None:
+    """The PR fields an ``edited`` event changed; ``None`` for any other event."""
+    if not is_pr_event():
         return None
+    event = _read_event_payload()
+    if event.get("action") != "edited":
+        return None
+    changes = event.get("changes")
+    return set(changes) if isinstance(changes, dict) else set()
 
 
-def parse_commit_messages(output: str) -> list[str]:
-    """Split git log output into individual commit messages."""
-    return [
-        message.strip("\n")
-        for message in output.split(COMMIT_MESSAGE_DELIMITER)
-        if message.strip("\n")
-    ]
+@dataclass
+class GitCommit:
+    """One commit object, as ``git cat-file`` prints it."""
 
+    sha: str
+    message: str
+    #: ``Name <email>``, without the timestamp.
+    author: str = ""
+    committer: str = ""
+    parents: list[str] = field(default_factory=list)
+    #: When it was committed, in seconds since the epoch.
+    commit_time: int = 0
 
-def get_messages_from_merge_ref() -> list[str]:
-    """Read PR commit messages from GitHub's synthetic merge commit."""
-    result = subprocess.run(
-        ["git", "log", "--pretty=format:%B%x00", "--reverse", "HEAD^1..HEAD^2"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        check=False,
+
+def parse_commit_object(sha: str, data: bytes) -> GitCommit:
+    """Read a raw commit object: header lines, a blank line, the message.
+
+    The message is decoded from the ``encoding`` header when there is one,
+    as ``git log`` would re-encode it.
+    """
+    header, _blank, body = data.partition(b"\n\n")
+    fields: dict[str, list[str]] = {}
+    for line in header.decode("utf-8", "replace").split("\n"):
+        # Lines that start with a space continue a multi-line header (gpgsig).
+        if not line.startswith(" "):
+            key, _space, value = line.partition(" ")
+            fields.setdefault(key, []).append(value)
+
+    def identity(key: str) -> str:
+        value = fields.get(key, [""])[0]
+        return value[: value.rfind(">") + 1] or value
+
+    committed = fields.get("committer", [""])[0].rpartition(">")[2].split()
+
+    try:
+        message = body.decode(fields.get("encoding", ["utf-8"])[0], "replace")
+    except LookupError:
+        message = body.decode("utf-8", "replace")
+    return GitCommit(
+        sha=sha,
+        message=message.strip("\n"),
+        author=identity("author"),
+        committer=identity("committer"),
+        parents=fields.get("parent", []),
+        commit_time=(
+            int(committed[0]) if committed[:1] and committed[0].isdigit() else 0
+        ),
     )
-    if result.returncode == 0 and result.stdout:
-        return parse_commit_messages(result.stdout)
-    return []
 
 
-def get_messages_from_head_ref(base_ref: str) -> list[str]:
-    """Read PR commit messages when the workflow checks out the head SHA."""
-    result = subprocess.run(
-        [
-            "git",
-            "log",
-            "--pretty=format:%B%x00",
-            "--reverse",
-            f"origin/{base_ref}..HEAD",
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        check=False,
+class ObjectReader(abc.ABC):
+    """Where a run reads git objects from (see git_objects).
+
+    A reader only has to ``read`` one object by any name git understands;
+    the rest is built on that.
+    """
+
+    @abc.abstractmethod
+    def read(self, name: str) -> tuple[str, str, bytes] | None:
+        """``(sha, type, contents)`` of the object ``name`` names, or ``None``
+        when there is no such object."""
+
+    def resolve(self, name: str) -> str | None:
+        """The SHA of the commit ``name`` names, or ``None``."""
+        found = self.read(f"{name}^{{commit}}")
+        return found[0] if found is not None else None
+
+    def commit(self, sha: str) -> GitCommit | None:
+        """The commit ``sha``, or ``None`` when it is not a commit here."""
+        found = self.read(sha)
+        if found is None or found[1] != "commit":
+            return None
+        return parse_commit_object(found[0], found[2])
+
+    def note(self, ref: str, sha: str) -> str | None:
+        """The note ``ref`` holds for ``sha``, if any.
+
+        A notes tree names each note by the SHA it annotates, split into
+        two-character directories once it grows large; git picks the fan-out,
+        so each depth is tried in turn.
+        """
+        for depth in range(3):
+            fanout = [sha[i : i + 2] for i in range(0, 2 * depth, 2)]
+            found = self.read(f"{ref}:{'/'.join([*fanout, sha[2 * depth :]])}")
+            if found is not None and found[1] == "blob":
+                return found[2].decode("utf-8", "replace")
+        return None
+
+    def walk(self, revisions: str) -> Iterator[tuple[str, str]]:
+        """The ``(mark, sha)`` of each commit ``revisions`` lists, oldest
+        first (see rev_list)."""
+        return rev_list(revisions)
+
+    def close(self) -> None:
+        """Release whatever the reader holds."""
+
+
+class GitObjects(ObjectReader):
+    """One long-lived ``git cat-file --batch`` process that serves every
+    object a run reads: refs to resolve, commits, and their notes.
+
+    Requests go one at a time, and each answer is read in full before the
+    next is sent, so neither pipe can fill up, however large the objects or
+    however many of them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, name: str) -> tuple[str, str, bytes] | None:
+        stdin, stdout = self.process.stdin, self.process.stdout
+        with self._lock:
+            stdin.write(name.encode() + b"\n")  # type: ignore[union-attr]
+            stdin.flush()  # type: ignore[union-attr]
+            header = stdout.readline()  # type: ignore[union-attr]
+            if not header:
+                raise EOFError(f"git cat-file exited with {self.process.poll()}")
+            # "<sha> <type> <size>", or "<name> missing" (or "ambiguous").
+            fields = header.split()
+            if len(fields) != 3:
+                return None
+            # The contents, then a newline.
+            data = stdout.read(int(fields[2]) + 1)[:-1]  # type: ignore[union-attr]
+        return fields[0].decode(), fields[1].decode(), data
+
+    def close(self) -> None:
+        """Let git exit by closing its stdin; kill it if it lingers."""
+        try:
+            self.process.stdin.close()  # type: ignore[union-attr]
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class UnsupportedRepository(Exception):
+    """The repository uses something NativeObjects does not read."""
+
+
+#: Repository extensions that change nothing NativeObjects reads. Any other
+#: (``objectformat``, ``partialclone``, ``refstorage``, ...) means git.
+NATIVE_EXTENSIONS = {"noop", "preciousobjects", "worktreeconfig"}
+
+#: Object types by the number a pack stores them under; 6 and 7 are deltas
+#: against an earlier object in the pack, or any object by SHA.
+PACK_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA, REF_DELTA = 6, 7
+
+#: Objects other than blobs NativeObjects keeps decoded: delta bases, and
+#: the notes trees every commit's lookup goes through.
+NATIVE_CACHE_SIZE = 1024
+
+#: Commits the walk still looks at once only uninteresting ones are left,
+#: in case committer clocks were skewed; as many as ``git rev-list`` does.
+WALK_SLOP = 5
+
+
+def find_git_dir() -> str:
+    """The git directory of the repository around the working directory,
+    following a worktree's ``gitdir:`` file."""
+    if os.getenv("GIT_DIR"):
+        return os.path.abspath(os.environ["GIT_DIR"])
+    path = os.getcwd()
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            with open(candidate, encoding="utf-8") as f:
+                line = f.read().strip()
+            if line.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, line[7:].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            raise UnsupportedRepository("not inside a git repository")
+        path = parent
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def _git_config(path: str) -> dict[str, str]:
+    """``section.key`` to value in a git config file, as far as NativeObjects
+    needs it: no includes, and a subsection stays part of its section."""
+    values = {}
+    section = ""
+    for line in _read_text(path).splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            section = line[1 : line.find("]")].strip().lower()
+            continue
+        key, _equals, value = line.partition("=")
+        values[f"{section}.{key.strip().lower()}"] = value.strip()
+    return values
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Rebuild an object from ``base`` and a pack delta against it."""
+
+    def varint(pos: int) -> tuple[int, int]:
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    _base_size, pos = varint(0)
+    size, pos = varint(pos)
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # Copy from the base: which offset and size bytes follow is in op.
+            offset = length = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    length |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset : offset + (length or 0x10000)]
+        elif op:
+            # Insert the next op bytes.
+            out += delta[pos : pos + op]
+            pos += op
+        else:
+            raise UnsupportedRepository("reserved delta instruction")
+    if len(out) != size:
+        raise UnsupportedRepository("delta does not match its base")
+    return bytes(out)
+
+
+class Pack:
+    """One packfile and its version 2 index, both memory-mapped."""
+
+    def __init__(self, path: str) -> None:
+        with open(path + ".idx", "rb") as f:
+            self.index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(path + ".pack", "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index[:8] != b"\377tOc\0\0\0\2":
+            self.close()
+            raise UnsupportedRepository(f"{path}.idx is not a version 2 index")
+        # The fan-out table: how many objects start with each byte or less.
+        self.fanout = struct.unpack_from(">256I", self.index, 8)
+        self.count = self.fanout[255]
+
+    def offset(self, sha: bytes) -> int | None:
+        """Where object ``sha`` starts in the pack, or ``None``."""
+        names = 8 + 256 * 4
+        lo = self.fanout[sha[0] - 1] if sha[0] else 0
+        hi = self.fanout[sha[0]]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.index[names + mid * 20 : names + mid * 20 + 20]
+            if name < sha:
+                lo = mid + 1
+            elif name > sha:
+                hi = mid
+            else:
+                # Past the names and their CRCs; the top bit points into a
+                # table of 8-byte offsets for packs over 2 GiB.
+                offsets = names + self.count * 24
+                (offset,) = struct.unpack_from(">I", self.index, offsets + mid * 4)
+                if offset & 0x80000000:
+                    large = offsets + self.count * 4 + (offset & 0x7FFFFFFF) * 8
+                    (offset,) = struct.unpack_from(">Q", self.index, large)
+                return offset
+        return None
+
+    def inflate(self, offset: int, size: int) -> bytes:
+        """The ``size`` bytes zlib-compressed at ``offset``."""
+        inflater = zlib.decompressobj()
+        chunks = []
+        step = max(size, 4096)
+        while not inflater.eof:
+            piece = self.data[offset : offset + step]
+            if not piece:
+                raise UnsupportedRepository("truncated pack")
+            chunks.append(inflater.decompress(piece))
+            offset += step
+        return b"".join(chunks)
+
+    def entry(self, offset: int) -> tuple[int, int, int, int | bytes | None]:
+        """``(type, size, data offset, delta base)`` of the object at
+        ``offset``; the base is an offset or a SHA for the two delta types."""
+        byte = self.data[offset]
+        offset += 1
+        kind, size, shift = (byte >> 4) & 7, byte & 0x0F, 4
+        while byte & 0x80:
+            byte = self.data[offset]
+            offset += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        base: int | bytes | None = None
+        if kind == OFS_DELTA:
+            start = offset - 1 - (shift - 4) // 7
+            byte = self.data[offset]
+            offset += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = self.data[offset]
+                offset += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = start - distance
+        elif kind == REF_DELTA:
+            base = self.data[offset : offset + 20]
+            offset += 20
+        return kind, size, offset, base
+
+    def close(self) -> None:
+        self.index.close()
+        self.data.close()
+
+
+class NativeObjects(ObjectReader):
+    """Reads the repository's files itself: loose objects and packs (through
+    ``mmap`` and ``zlib``), refs and packed-refs. No process is started.
+
+    It understands the plain SHA-1 repositories a checkout produces. Anything
+    else is refused when it is opened, with ``UnsupportedRepository``, and
+    the run reads through git instead (see git_objects).
+    """
+
+    def __init__(self, git_dir: str | None = None) -> None:
+        self.git_dir = git_dir or find_git_dir()
+        commondir = _read_text(os.path.join(self.git_dir, "commondir")).strip()
+        self.common_dir = os.path.normpath(os.path.join(self.git_dir, commondir))
+        config = _git_config(os.path.join(self.common_dir, "config"))
+        if config.get("core.repositoryformatversion", "0") not in ("0", "1"):
+            raise UnsupportedRepository("unknown repository format version")
+        for key, value in config.items():
+            extension = key.partition("extensions.")[2]
+            if key.startswith("extensions.") and extension not in NATIVE_EXTENSIONS:
+                raise UnsupportedRepository(f"extensions.{extension} = {value}")
+        if os.path.isdir(os.path.join(self.common_dir, "reftable")):
+            raise UnsupportedRepository("reftable refs")
+        objects = os.path.join(self.common_dir, "objects")
+        alternates = _read_text(os.path.join(objects, "info", "alternates"))
+        self.object_dirs = [objects] + [
+            os.path.normpath(os.path.join(objects, line.strip()))
+            for line in alternates.splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+        self.packs = [
+            Pack(os.path.join(folder, "pack", name[:-4]))
+            for folder in self.object_dirs
+            if os.path.isdir(os.path.join(folder, "pack"))
+            for name in sorted(os.listdir(os.path.join(folder, "pack")))
+            if name.endswith(".idx")
+        ]
+        self.shallow = set(_read_text(os.path.join(self.common_dir, "shallow")).split())
+        self.packed_refs = {}
+        for line in _read_text(
+            os.path.join(self.common_dir, "packed-refs")
+        ).splitlines():
+            sha, _space, ref = line.partition(" ")
+            if ref and not line.startswith(("#", "^")):
+                self.packed_refs[ref] = sha
+        self._cache: dict[str, tuple[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _ref(self, name: str, depth: int = 0) -> str | None:
+        """What the full ref ``name`` (or ``HEAD``) points at."""
+        if depth > 5:
+            return None
+        for folder in (self.git_dir, self.common_dir):
+            path = os.path.join(folder, *name.split("/"))
+            if os.path.isfile(path):
+                target = _read_text(path).strip()
+                if target.startswith("ref:"):
+                    return self._ref(target[4:].strip(), depth + 1)
+                return target or None
+        return self.packed_refs.get(name)
+
+    def _name(self, name: str) -> str | None:
+        """The SHA a full SHA or a ref name stands for, looked up the way
+        ``git rev-parse`` does."""
+        if re.fullmatch(r"[0-9a-f]{40}", name):
+            return name
+        if name == "HEAD" or name.startswith("refs/"):
+            candidates = [name]
+        else:
+            candidates = [
+                f"refs/{name}",
+                f"refs/tags/{name}",
+                f"refs/heads/{name}",
+                f"refs/remotes/{name}",
+                f"refs/remotes/{name}/HEAD",
+            ]
+        for candidate in candidates:
+            sha = self._ref(candidate)
+            if sha is not None:
+                return sha
+        return None
+
+    def _object(self, sha: str) -> tuple[str, bytes] | None:
+        """``(type, contents)`` of object ``sha``, or ``None``."""
+        cached = self._cache.get(sha)
+        if cached is not None:
+            return cached
+        found = None
+        for folder in self.object_dirs:
+            path = os.path.join(folder, sha[:2], sha[2:])
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    raw = zlib.decompress(f.read())
+                header, _nul, data = raw.partition(b"\0")
+                found = (header.split(b" ")[0].decode(), data)
+                break
+        else:
+            key = bytes.fromhex(sha)
+            for pack in self.packs:
+                offset = pack.offset(key)
+                if offset is not None:
+                    found = self._packed(pack, offset)
+                    break
+        if found is not None and found[0] != "blob":
+            if len(self._cache) >= NATIVE_CACHE_SIZE:
+                del self._cache[next(iter(self._cache))]
+            self._cache[sha] = found
+        return found
+
+    def _packed(self, pack: Pack, offset: int) -> tuple[str, bytes]:
+        """The object at ``offset`` in ``pack``, with its deltas applied."""
+        deltas = []
+        while True:
+            kind, size, start, base = pack.entry(offset)
+            if kind in PACK_TYPES:
+                found = (PACK_TYPES[kind], pack.inflate(start, size))
+                break
+            deltas.append(pack.inflate(start, size))
+            if isinstance(base, int):
+                offset = base
+                continue
+            if kind != REF_DELTA or not isinstance(base, bytes):
+                raise UnsupportedRepository(f"pack object type {kind}")
+            resolved = self._object(base.hex())
+            if resolved is None:
+                raise UnsupportedRepository(f"missing delta base {base.hex()}")
+            found = resolved
+            break
+        kind_name, data = found
+        for delta in reversed(deltas):
+            data = apply_delta(data, delta)
+        return kind_name, data
+
+    def _peel(self, sha: str, want: str) -> str | None:
+        """Follow tags from ``sha`` to an object of type ``want`` (any, when
+        empty)."""
+        found = self._object(sha)
+        while found is not None and found[0] == "tag" and want != "tag":
+            sha = found[1].split(b"\n", 1)[0].partition(b" ")[2].decode()
+            found = self._object(sha)
+        if found is None or (want and found[0] != want):
+            return None
+        return sha
+
+    def read(self, name: str) -> tuple[str, str, bytes] | None:
+        """Also understands what the run asks git for: ``^N``, ``~N`` and
+        ``^{type}`` after a name, and ``<revision>:<path>``."""
+        revision, colon, path = name.partition(":")
+        match = re.fullmatch(r"(.*?)((?:\^\{\w*\}|\^\d*|~\d*)*)", revision)
+        if match is None:
+            return None
+        with self._lock:
+            sha = self._name(match[1])
+            for peel, caret, tilde in re.findall(
+                r"\^\{(\w*)\}|(\^\d*)|(~\d*)", match[2]
+            ):
+                if sha is None:
+                    return None
+                if caret:
+                    # ^N is the Nth parent; ^0 the commit itself.
+                    steps = int(caret[1:] or 1)
+                    sha = self._peel(sha, "commit")
+                    if steps:
+                        commit = self._commit_at(sha)
+                        parents = commit.parents if commit is not None else []
+                        sha = parents[steps - 1] if steps <= len(parents) else None
+                elif tilde:
+                    # ~N is N first parents back.
+                    sha = self._peel(sha, "commit")
+                    for _step in range(int(tilde[1:] or 1)):
+                        commit = self._commit_at(sha)
+                        sha = commit.parents[0] if commit and commit.parents else None
+                else:
+                    sha = self._peel(sha, peel)
+            if sha is not None and colon:
+                sha = self._path(sha, path)
+            found = self._object(sha) if sha is not None else None
+        return (sha, *found) if sha is not None and found is not None else None
+
+    def _commit_at(self, sha: str | None) -> GitCommit | None:
+        """commit, for callers that already hold the lock."""
+        found = self._object(sha) if sha is not None else None
+        if sha is None or found is None or found[0] != "commit":
+            return None
+        return parse_commit_object(sha, found[1])
+
+    def _path(self, sha: str, path: str) -> str | None:
+        """The object at ``path`` in the tree of commit (or tree) ``sha``."""
+        found = self._object(sha)
+        if found is not None and found[0] == "commit":
+            sha = found[1].split(b"\n", 1)[0].partition(b" ")[2].decode()
+        for part in filter(None, path.split("/")):
+            found = self._object(sha)
+            if found is None or found[0] != "tree":
+                return None
+            entry = _tree_entry(found[1], part.encode())
+            if entry is None:
+                return None
+            sha = entry
+        return sha
+
+    def walk(self, revisions: str) -> Iterator[tuple[str, str]]:
+        """``git rev-list --reverse base..head``: the commits reachable from
+        head but not from base, newest found first and handed on oldest
+        first, as git orders them by committer date.
+
+        Like git, the walk stops once only commits reachable from base are
+        left to look at (and ``WALK_SLOP`` more), and does not go past the
+        commits a shallow clone was cut at.
+        """
+        base, dots, head = revisions.partition("..")
+        if not dots or head.startswith("."):
+            raise UnsupportedRepository(f"cannot walk {revisions}")
+        uninteresting: dict[str, bool] = {}
+        parents: dict[str, list[str]] = {}
+        heap: list[tuple[int, int, str]] = []
+        order = itertools.count()
+        # What is on the heap, and how much of it is still interesting: kept
+        # up to date as commits come and go and get marked, so the walk need
+        # not look through the whole heap after every commit to know whether
+        # to stop.
+        queued: set[str] = set()
+        interesting = 0
+
+        def mark(sha: str) -> None:
+            nonlocal interesting
+            stack = [sha]
+            while stack:
+                sha = stack.pop()
+                if uninteresting.get(sha) is False:
+                    uninteresting[sha] = True
+                    if sha in queued:
+                        interesting -= 1
+                    stack.extend(parents.get(sha, []))
+
+        def push(sha: str, boring: bool) -> None:
+            nonlocal interesting
+            if sha in uninteresting:
+                if boring:
+                    mark(sha)
+                return
+            commit = self.commit(sha)
+            if commit is None:
+                return
+            uninteresting[sha] = boring
+            parents[sha] = [] if sha in self.shallow else commit.parents
+            heapq.heappush(heap, (-commit.commit_time, next(order), sha))
+            queued.add(sha)
+            interesting += not boring
+
+        for name, boring in ((base, True), (head, False)):
+            sha = self.resolve(name)
+            if sha is None:
+                raise UnsupportedRepository(f"unknown revision {name}")
+            push(sha, boring)
+        found = []
+        slop = WALK_SLOP
+        while heap:
+            _time, _order, sha = heapq.heappop(heap)
+            queued.discard(sha)
+            if not uninteresting[sha]:
+                interesting -= 1
+                found.append(sha)
+            for parent in parents[sha]:
+                push(parent, uninteresting[sha])
+            if not interesting:
+                slop -= 1
+                if slop < 0:
+                    break
+            else:
+                slop = WALK_SLOP
+        return iter([("", sha) for sha in reversed(found) if not uninteresting[sha]])
+
+    def close(self) -> None:
+        for pack in self.packs:
+            pack.close()
+
+
+def _tree_entry(tree: bytes, name: bytes) -> str | None:
+    """The SHA of entry ``name`` in a raw tree object: ``<mode> <name>\\0``
+    then 20 bytes of SHA, per entry."""
+    pos = 0
+    while pos < len(tree):
+        nul = tree.index(b"\0", pos)
+        entry = tree[tree.index(b" ", pos) + 1 : nul]
+        if entry == name:
+            return tree[nul + 1 : nul + 21].hex()
+        pos = nul + 21
+    return None
+
+
+_git_objects: ObjectReader | None = None
+_git_objects_lock = threading.Lock()
+
+
+def open_object_reader() -> ObjectReader:
+    """NativeObjects when ``native-git`` asks for it and it can read the
+    repository, or GitObjects."""
+    if NATIVE_GIT_ENABLED and SKIP_UPSTREAM_ENABLED:
+        # Telling equal patches apart means diffing trees, which is git's job.
+        print("::debug::skip-upstream compares patches: reading through git")
+    elif NATIVE_GIT_ENABLED:
+        try:
+            return NativeObjects()
+        except (UnsupportedRepository, OSError, ValueError) as e:
+            print(f"::debug::reading through git, not natively: {e}")
+    return GitObjects()
+
+
+def git_objects() -> ObjectReader:
+    """The run's object reader, started on first use."""
+    global _git_objects
+    with _git_objects_lock:
+        if _git_objects is None:
+            _git_objects = open_object_reader()
+        return _git_objects
+
+
+def close_git_objects() -> None:
+    """Stop the object reader, if one was started."""
+    global _git_objects
+    with _git_objects_lock:
+        if _git_objects is not None:
+            _git_objects.close()
+            _git_objects = None
+
+
+def iter_records(stream: IO[bytes], delimiter: bytes) -> Iterator[str]:
+    """The ``delimiter``-terminated records of ``stream``, each as soon as it
+    is complete.
+
+    The pipe is read ``LOG_CHUNK_SIZE`` bytes at a time and split before
+    decoding, which a single-byte delimiter allows: no multi-byte UTF-8
+    sequence contains one.
+    """
+    parts: list[bytes] = []
+    while chunk := stream.read(LOG_CHUNK_SIZE):
+        *complete, rest = chunk.split(delimiter)
+        for part in complete:
+            parts.append(part)
+            yield b"".join(parts).decode("utf-8")
+            parts = []
+        parts.append(rest)
+    tail = b"".join(parts)
+    if tail:
+        yield tail.decode("utf-8")
+
+
+def rev_list(revisions: str) -> Iterator[tuple[str, str]]:
+    """The ``(mark, sha)`` of each commit ``git rev-list`` lists for
+    ``revisions``, oldest first; the mark is ``=`` or ``+`` when
+    rev_list_args asks for one, or empty.
+
+    A rev-list that fails lists nothing. One still running when the time
+    budget runs out is killed, and ``subprocess.TimeoutExpired`` raised.
+    """
+    command = ["git", "rev-list", "--reverse", *rev_list_args(), revisions]
+    timeout = time_left()
+    # Unbuffered, so a read returns what git has written so far rather than
+    # waiting for a whole chunk.
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
     )
-    if result.returncode == 0 and result.stdout:
-        return parse_commit_messages(result.stdout)
-    return []
+    expired = threading.Event()
 
+    def expire() -> None:
+        expired.set()
+        process.kill()
 
-def get_pr_commit_messages() -> list[str]:
-    """Get all commit messages for the current PR workflow.
+    timer = threading.Timer(timeout, expire) if timeout is not None else None
+    if timer is not None:
+        timer.start()
+    try:
+        for line in iter_records(process.stdout, b"\n"):  # type: ignore[arg-type]
+            yield (line[0], line[1:]) if line[:1] in ("=", "+") else ("", line)
+    finally:
+        if timer is not None:
+            timer.cancel()
+        # Also when the reader stopped early: git must not be left blocked
+        # on a pipe nobody reads.
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(command, timeout or 0)
+
+
+def stream_commits(
+    revisions: str, objects: ObjectReader, walked: list[str] | None = None
+) -> Iterator[tuple[str, str]]:
+    """The ``(sha, message)`` of the commits ``revisions`` lists, oldest
+    first.
+
+    ``objects`` walks them (see ObjectReader.walk); each commit is read the
+    moment the walk hands on its SHA, and handed on in turn. Notes go into
+    ``_notes`` and upstream marks into ``_upstream`` along the way (see
+    rev_list_args). Commits with an empty message are not handed on; every
+    SHA walked still goes into ``walked``, when given.
+    """
+    notes = GIT_NOTES_ENABLED and objects.read(NOTES_REF) is not None
+    for mark, sha in objects.walk(revisions):
+        if walked is not None:
+            walked.append(sha)
+        if mark == "=":
+            _upstream.add(sha)
+        commit = objects.commit(sha)
+        if commit is None or not commit.message:
+            continue
+        note = objects.note(NOTES_REF, sha) if notes else None
+        if note and note.strip():
+            _notes[sha] = note
+        yield sha, commit.message
+
+
+def pr_commit_range(objects: ObjectReader) -> str | None:
+    """The revisions that list the PR's commits, or ``None`` when the
+    checkout has nothing to compare.
+
+    The event payload names the base and head commits exactly, so when the
+    checkout has both, they are the range, whatever was checked out.
+    Otherwise the range is guessed from the checkout.
 
     In pull_request-style workflows, actions/checkout checks out a synthetic merge
     commit (HEAD = merge of PR branch into base). HEAD^1 is the base branch
     tip, HEAD^2 is the PR branch tip. So HEAD^1..HEAD^2 gives all PR commits.
     If the workflow explicitly checks out the PR head SHA instead, fall back to
     diffing against origin/<base-ref> when that ref is available locally.
+    All are resolved through ``objects``, so the guess costs no process.
     """
-    if not is_pr_event():
-        return []
+    base, head = get_pr_base_sha(), get_pr_head_sha()
+    if base and head:
+        base, head = objects.resolve(base), objects.resolve(head)
+        if base and head:
+            return commit_range(base, head)
+        print("::debug::the PR's base or head is not in the checkout; guessing")
+    head = objects.resolve("HEAD^2")
+    if head is not None:
+        base = objects.resolve("HEAD^1")
+    else:
+        base_ref = os.getenv("GITHUB_BASE_REF", "")
+        base = objects.resolve(f"origin/{base_ref}") if base_ref else None
+        head = objects.resolve("HEAD")
+    return commit_range(base, head) if base and head else None
+
+
+#: Commits past the PR's own that the first deepening round fetches; each
+#: later round fetches twice as many as the one before.
+DEEPEN_STEP = 16
+
+
+def deepen_shallow_clone() -> None:
+    """Fetch just enough history for a shallow checkout to list the PR's
+    commits, instead of asking for ``fetch-depth: 0``.
+
+    Each round runs ``git fetch --deepen`` for the payload's base and head
+    commits, until the two share a merge base, for at most ``DEEPEN_ROUNDS``
+    rounds. How many commits that fetched is reported. Best effort: without
+    the payload's SHAs, the remote, or the time, the run goes on with the
+    history it has (see iter_pr_commits).
+    """
+    base, head = get_pr_base_sha(), get_pr_head_sha()
+    if DEEPEN_ROUNDS <= 0 or not base or not head:
+        return
+
+    def git(*args: str) -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            ["git", *args],
+            capture_output=True,
+            encoding="utf-8",
+            check=False,
+            timeout=time_left(),
+        )
+
+    def commits() -> int:
+        count = git("rev-list", "--count", "--ignore-missing", base, head)
+        return int(count.stdout) if count.stdout.strip().isdigit() else 0
 
     try:
-        messages = get_messages_from_merge_ref()
-        if messages:
-            return messages
+        if git("rev-parse", "--is-shallow-repository").stdout.strip() != "true":
+            return
+        before = commits()
+        depth = (get_pr_commit_count() or 0) + DEEPEN_STEP
+        rounds = 0
+        while git("merge-base", base, head).returncode != 0:
+            if rounds == DEEPEN_ROUNDS:
+                print(
+                    f"::warning::No merge base of {base[:7]} and {head[:7]} after "
+                    f"{rounds} rounds of deepening; use fetch-depth: 0"
+                )
+                break
+            fetch = git(
+                "fetch",
+                "--quiet",
+                "--no-tags",
+                f"--deepen={depth}",
+                "origin",
+                base,
+                head,
+            )
+            if fetch.returncode != 0:
+                print(f"::warning::Unable to deepen the clone: {fetch.stderr.strip()}")
+                break
+            rounds += 1
+            depth *= 2
+        if rounds:
+            print(
+                f"Deepened the shallow clone in {rounds} round(s): "
+                f"{commits() - before} commits fetched"
+            )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"::debug::could not deepen the clone: {e}")
 
-        base_ref = os.getenv("GITHUB_BASE_REF", "")
-        if base_ref:
-            return get_messages_from_head_ref(base_ref)
+
+def iter_pr_commits() -> Iterator[tuple[str, str]]:
+    """The ``(sha, message)`` of every commit in the current PR, as git
+    lists them (see pr_commit_range).
+
+    A walk that lists a different number of commits than the PR has (the
+    payload's ``commits``) is warned about: the checkout's history is cut
+    short, or the range is not the PR's.
+    """
+    try:
+        if GIT_NOTES_ENABLED:
+            fetch_git_notes()
+        # Before the object reader opens, so it sees what was fetched.
+        deepen_shallow_clone()
+        objects = git_objects()
+        revisions = pr_commit_range(objects)
+        if revisions is None:
+            return
+        walked: list[str] = []
+        yield from stream_commits(revisions, objects, walked)
+        expected = get_pr_commit_count()
+        if expected is not None and len(walked) != expected:
+            print(
+                f"::warning::Found {len(walked)} commits in {revisions}, but the pull "
+                f"request has {expected}; is the checkout's history complete?",
+                file=sys.stderr,
+            )
+    except subprocess.TimeoutExpired:
+        # Not a failure to read: the commits not listed are reported as
+        # timed out (see check_commit_messages).
+        raise
     except Exception as e:
         print(
             f"::warning::Failed to retrieve PR commit messages: {e}",
             file=sys.stderr,
         )
-    return []
+
+
+def get_pr_commits() -> Iterator[tuple[str, str]]:
+    """Get the ``(sha, message)`` of every commit in the current PR workflow.
+
+    Git starts at once, on a thread of its own, and this returns straight
+    away: the commits come out of the iterator as git prints them, so the
+    first checks run while git is still listing the rest. At most
+    ``LOG_QUEUE_SIZE`` commits wait to be taken; past that git is paused,
+    which bounds the memory a PR of thousands of commits takes.
+
+    A listing the time budget cut short raises ``subprocess.TimeoutExpired``
+    from the iterator, after the commits listed before it.
+    """
+    if not is_pr_event():
+        return iter(())
+    commits: queue.Queue[tuple[str, str] | Exception | None] = queue.Queue(
+        LOG_QUEUE_SIZE
+    )
+
+    def read() -> None:
+        try:
+            with timed("git"):
+                for commit in iter_pr_commits():
+                    commits.put(commit)
+        except subprocess.TimeoutExpired as e:
+            commits.put(e)
+        finally:
+            commits.put(None)
+
+    def listed() -> Iterator[tuple[str, str]]:
+        while (commit := commits.get()) is not None:
+            if isinstance(commit, Exception):
+                raise commit
+            yield commit
+
+    threading.Thread(target=read, name="git-log", daemon=True).start()
+    return listed()
 
 
 def run_check_json(
-    args: list[str], input_text: str | None = None
+    args: list[str], input_text: str | None = None, timeout: float | None = None
 ) -> tuple[int, dict[str, Any] | None, str]:
     """Run ``commit-check --format json`` and return (exit code, parsed JSON, raw output).
 
     The parsed JSON is ``None`` when the CLI did not produce valid JSON; the
     raw output is kept so callers can fall back to showing it as text.
+
+    Past ``timeout`` seconds the CLI is killed and ``subprocess.TimeoutExpired``
+    raised. With a failure limit the CLI can also be killed when the limit is
+    reached, and ``CheckCancelled`` is raised.
     """
-    command = ["commit-check", "--format", "json"] + args
-    result = subprocess.run(
+    command = ["commit-check", "--format", "json", *config_args()] + args
+    if failure_limit() > 0:
+        returncode, raw = _run_cancellable(command, input_text, timeout)
+    else:
+        result = subprocess.run(
+            command,
+            input=input_text,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            check=False,
+            timeout=timeout,
+        )
+        returncode, raw = result.returncode, result.stdout or ""
+    try:
+        return returncode, json.loads(raw), raw
+    except json.JSONDecodeError:
+        return returncode, None, raw
+
+
+def _run_cancellable(
+    command: list[str], input_text: str | None, timeout: float | None
+) -> tuple[int, str]:
+    """``subprocess.run`` for run_check_json, with the process registered to
+    be killed when the failure limit is reached (see ``cancellable``).
+
+    ``subprocess.run`` never hands out its process, so there would be nothing
+    to kill; without a failure limit nothing ever is, and it is used as is.
+    """
+    with subprocess.Popen(
         command,
-        input=input_text,
+        stdin=subprocess.PIPE if input_text is not None else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
         encoding="utf-8",
+    ) as process:
+        with cancellable(process.kill) as cancelled:
+            try:
+                stdout, _ = process.communicate(input_text, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise
+    if cancelled.is_set():
+        raise CheckCancelled(command)
+    return process.returncode, stdout or ""
+
+
+class InProcessEngine:
+    """commit-check's validation engine, imported once and run in this process.
+
+    The CLI pays for an interpreter, the ``commit_check`` import and a config
+    load on every invocation; here all three happen once per run. Each call
+    then does what ``commit-check --format json`` does after it has loaded the
+    config: parse the check flags, filter the rules to the requested checks and
+    run them with the input as stdin.
+
+    This goes through ``commit_check.main``'s own parser and check selection
+    rather than the public ``commit_check.api`` helpers on purpose. Those apply
+    built-in defaults unless handed a config, and name their own check lists,
+    so they can drift from what the CLI — and so the fallback — would report.
+    """
+
+    def __init__(self, config_path: str | None = None) -> None:
+        from commit_check.config_merger import ConfigMerger
+        from commit_check.engine import (
+            ValidationContext,
+            ValidationEngine,
+            overall_status,
+        )
+        from commit_check.main import _get_parser, _get_requested_checks
+        from commit_check.rule_builder import RuleBuilder
+
+        self._parser = _get_parser()
+        self._requested_checks = _get_requested_checks
+        self._context = ValidationContext
+        self._engine = ValidationEngine
+        self._overall_status = overall_status
+        self._config = ConfigMerger.from_all_sources(
+            self._parser.parse_args([]), config_path
+        )
+        self._rules = RuleBuilder(self._config).build_all_rules()
+
+    @property
+    def config(self) -> dict[str, Any]:
+        """The resolved config: defaults, TOML (with ``inherit_from``) and env."""
+        return self._config
+
+    def run(self, args: list[str], input_text: str | None = None) -> dict[str, Any]:
+        """Evaluate one scope and return the CLI's JSON document as a dict."""
+        cli_args = self._parser.parse_args(["--format", "json"] + args)
+        requested = self._requested_checks(cli_args)
+        rules = [rule for rule in self._rules if rule.check in requested]
+        # The CLI strips piped stdin and treats an empty one as absent, which
+        # is what sends it to git for the message instead.
+        stdin_text = input_text.strip() if input_text else None
+        context = self._context(stdin_text=stdin_text or None, config=self._config)
+        outcomes = self._engine(rules).validate_all_detailed(context)
+        return {
+            "status": self._overall_status(o.status for o in outcomes),
+            "checks": [outcome.to_dict() for outcome in outcomes],
+        }
+
+
+_in_process_engine: InProcessEngine | None = None
+_in_process_failed = False
+_in_process_lock = threading.Lock()
+
+
+def get_in_process_engine() -> InProcessEngine | None:
+    """The shared in-process engine, or ``None`` when it cannot be used.
+
+    Loaded on first use and at most once: a failed import or config load is
+    remembered, so a run that has to fall back to the CLI pays for finding
+    that out once rather than once per scope. Locked because commit checks
+    run on several threads.
+    """
+    global _in_process_engine, _in_process_failed
+    with _in_process_lock:
+        if _in_process_engine is None and not _in_process_failed:
+            try:
+                _in_process_engine = InProcessEngine(_config_path)
+            except Exception as e:
+                _in_process_failed = True
+                print(f"::debug::in-process engine unavailable, using the CLI: {e}")
+        return _in_process_engine
+
+
+def run_check_in_process(
+    args: list[str], input_text: str | None = None
+) -> dict[str, Any] | None:
+    """Evaluate a scope in-process, or return ``None`` to send it to the CLI.
+
+    Any exception is a reason to fall back rather than a result: the CLI turns
+    the same error into output the report can show, and an unexpected change
+    in the library's internals should cost speed, never a verdict.
+    """
+    engine = get_in_process_engine()
+    if engine is None:
+        return None
+    try:
+        return engine.run(args, input_text=input_text)
+    except Exception as e:
+        print(f"::debug::in-process check failed, retrying with the CLI: {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Worker pool
+#
+# When commit_check cannot be imported here — the CLI was installed into a
+# different interpreter than the one running this script — a few long-lived
+# copies of this script are started under *that* interpreter instead. Each one
+# hosts an InProcessEngine and answers one JSON line per request on stdin with
+# one JSON line on stdout, so the import and config load are paid once per
+# worker rather than once per scope.
+# ---------------------------------------------------------------------------
+
+#: Argument that starts this script as a pool worker instead of the action.
+WORKER_FLAG = "--worker"
+
+#: Requests a worker serves before it is replaced, so state a long run might
+#: accumulate in the library can never grow without bound.
+WORKER_MAX_REQUESTS = 500
+
+
+def commit_check_python() -> str | None:
+    """The interpreter the ``commit-check`` console script runs under.
+
+    A console script lives next to its interpreter in every virtualenv (and in
+    the pipx venv a ``~/.local/bin`` symlink resolves to), and on POSIX names it
+    in its shebang. ``None`` when neither says.
+    """
+    script = shutil.which("commit-check")
+    if not script:
+        return None
+    script = os.path.realpath(script)
+    folder = os.path.dirname(script)
+    for name in ("python", "python3", "python.exe"):
+        candidate = os.path.join(folder, name)
+        if os.path.isfile(candidate):
+            return candidate
+    try:
+        with open(script, "rb") as f:
+            first_line = f.readline().decode("utf-8", "replace").strip()
+    except OSError:
+        return None
+    if first_line.startswith("#!"):
+        interpreter = first_line[2:].split()
+        if interpreter and os.path.isfile(interpreter[0]):
+            return interpreter[0]
+    return None
+
+
+def serve_worker(config_path: str | None = None) -> None:
+    """Answer check requests from a WorkerPool until stdin closes.
+
+    The protocol stream is the original stdout; anything else that prints —
+    a config warning from the library, say — is sent to stderr so it cannot
+    corrupt a reply. ``config_path`` is the run's flattened config, if any.
+    """
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    def send(message: dict[str, Any]) -> None:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    try:
+        engine = InProcessEngine(config_path)
+    except Exception as e:
+        send({"ready": False, "error": str(e)})
+        return
+    send({"ready": True})
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            send({"data": engine.run(request["args"], input_text=request["input"])})
+        except Exception as e:
+            send({"error": str(e)})
+
+
+class Worker:
+    """One long-lived worker process and its JSON-lines pipe."""
+
+    def __init__(self, python: str) -> None:
+        self.requests = 0
+        self.process = subprocess.Popen(
+            [python, os.path.abspath(__file__), WORKER_FLAG, *config_args()[1:]],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+        )
+
+    def _read(self) -> dict[str, Any]:
+        line = self.process.stdout.readline()  # type: ignore[union-attr]
+        if not line:
+            raise EOFError(f"worker exited with {self.process.poll()}")
+        return json.loads(line)
+
+    def wait_ready(self) -> bool:
+        """Whether the worker loaded its engine. Read once, right after start."""
+        try:
+            return bool(self._read().get("ready"))
+        except (OSError, EOFError, ValueError):
+            return False
+
+    def request(
+        self, args: list[str], input_text: str | None, timeout: float | None = None
+    ) -> dict[str, Any]:
+        """Send one scope and return the worker's reply.
+
+        A pipe read cannot time out portably, so past ``timeout`` seconds the
+        worker is killed instead, which ends the read, and
+        ``subprocess.TimeoutExpired`` is raised in place of the read's error.
+        The failure limit kills it the same way, and ``CheckCancelled`` is
+        raised.
+        """
+        self.requests += 1
+        expired = threading.Event()
+
+        def expire() -> None:
+            expired.set()
+            self.process.kill()
+
+        timer = threading.Timer(timeout, expire) if timeout is not None else None
+        if timer is not None:
+            timer.start()
+        try:
+            with cancellable(self.process.kill) as cancelled:
+                self.process.stdin.write(  # type: ignore[union-attr]
+                    json.dumps({"args": args, "input": input_text}) + "\n"
+                )
+                self.process.stdin.flush()  # type: ignore[union-attr]
+                return self._read()
+        except (OSError, EOFError, ValueError):
+            if expired.is_set():
+                raise subprocess.TimeoutExpired(self.process.args, timeout or 0)
+            if cancelled.is_set():
+                raise CheckCancelled(self.process.args)
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def close(self) -> None:
+        """Ask the worker to exit by closing its stdin; kill it if it lingers."""
+        try:
+            self.process.stdin.close()  # type: ignore[union-attr]
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """A fixed number of workers handed out to one checking thread at a time.
+
+    A worker is replaced after ``max_requests`` requests, or as soon as it
+    fails mid-request. A slot whose replacement cannot be started holds
+    ``None`` from then on, and any request that draws it goes to the CLI.
+    """
+
+    def __init__(
+        self, python: str, size: int, max_requests: int = WORKER_MAX_REQUESTS
+    ) -> None:
+        self.python = python
+        self.max_requests = max_requests
+        self._idle: queue.Queue[Worker | None] = queue.Queue()
+        # Start them all before waiting on any, so they load in parallel.
+        workers = [Worker(python) for _ in range(size)]
+        for worker in workers:
+            self._idle.put(self._ready_or_none(worker))
+
+    @staticmethod
+    def _ready_or_none(worker: Worker) -> Worker | None:
+        if worker.wait_ready():
+            return worker
+        worker.close()
+        return None
+
+    def _spawn(self) -> Worker | None:
+        try:
+            return self._ready_or_none(Worker(self.python))
+        except OSError:
+            return None
+
+    @property
+    def alive(self) -> bool:
+        """Whether any slot still holds a worker."""
+        return any(w is not None for w in list(self._idle.queue))
+
+    def run(
+        self, args: list[str], input_text: str | None, timeout: float | None = None
+    ) -> dict[str, Any] | None:
+        """Evaluate one scope on a worker, or return ``None`` to use the CLI.
+
+        A worker killed for overrunning ``timeout`` is replaced and the
+        ``subprocess.TimeoutExpired`` passed on: the CLI would only hang too.
+        One killed at the failure limit is not, since the run starts no more
+        checks, and the ``CheckCancelled`` is passed on.
+        """
+        worker = self._idle.get()
+        if worker is None:
+            self._idle.put(None)
+            return None
+        try:
+            reply = worker.request(args, input_text, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            worker.close()
+            self._idle.put(self._spawn())
+            raise
+        except CheckCancelled:
+            worker.close()
+            self._idle.put(None)
+            raise
+        except (OSError, EOFError, ValueError) as e:
+            print(f"::debug::commit-check worker failed, replacing it: {e}")
+            worker.close()
+            self._idle.put(self._spawn())
+            return None
+        if worker.requests >= self.max_requests:
+            worker.close()
+            worker = self._spawn()
+        self._idle.put(worker)
+        data = reply.get("data")
+        return data if isinstance(data, dict) else None
+
+    def shutdown(self) -> None:
+        """Close every worker. The pool is unusable afterwards."""
+        while not self._idle.empty():
+            worker = self._idle.get_nowait()
+            if worker is not None:
+                worker.close()
+
+
+_worker_pool: WorkerPool | None = None
+
+
+def start_worker_pool() -> None:
+    """Pre-fork the worker pool, when the CLI has to be reached out of process.
+
+    Called at the start of a run, so workers load while git history is read.
+    Does nothing when the CLI's interpreter cannot be found or no worker
+    starts; every check then goes to the CLI.
+    """
+    global _worker_pool
+    if _worker_pool is not None:
+        return
+    python = commit_check_python()
+    if python is None:
+        return
+    pool = WorkerPool(python, check_workers(sys.maxsize))
+    if pool.alive:
+        _worker_pool = pool
+        print(f"::debug::started commit-check workers under {python}")
+    else:
+        pool.shutdown()
+
+
+def stop_worker_pool() -> None:
+    """Shut the worker pool down, if one was started."""
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.shutdown()
+        _worker_pool = None
+
+
+def check_workers(pending: int) -> int:
+    """How many scopes to check at once.
+
+    A CLI check is its own ``commit-check`` process, so the threads mostly
+    wait on children and the useful ceiling is the runner's CPU count. The
+    ``max-workers`` input overrides it; ``0`` (the default) means "size from
+    the CPUs". Never more workers than there is work for.
+    """
+    workers = MAX_WORKERS if MAX_WORKERS > 0 else (os.cpu_count() or 1)
+    return max(1, min(workers, pending))
+
+
+# ---------------------------------------------------------------------------
+# Execution backends
+#
+# Everything above is a way of evaluating a scope; a backend decides which of
+# them a run uses. check_scope and run_pr_message_checks only ever talk to the
+# backend, so a new strategy is one more class here, not another branch in
+# every caller.
+# ---------------------------------------------------------------------------
+
+
+class Backend:
+    """Serial subprocess: one ``commit-check`` process per scope, one at a time.
+
+    The base the other backends build on, and the last resort each of them
+    falls back to for a scope it cannot evaluate itself.
+    """
+
+    name = "serial"
+
+    def start(self) -> None:
+        """Acquire whatever the backend needs before the first check."""
+
+    def stop(self) -> None:
+        """Release it again."""
+
+    def workers(self, pending: int) -> int:
+        """How many of ``pending`` scopes to check at once."""
+        return 1
+
+    def run(
+        self,
+        args: list[str],
+        input_text: str | None = None,
+        timeout: float | None = None,
+    ) -> tuple[dict[str, Any] | None, str]:
+        """Evaluate one scope and return (parsed JSON, raw CLI output).
+
+        Raises ``subprocess.TimeoutExpired`` when the check overran ``timeout``.
+        """
+        _rc, data, raw = run_check_json(args, input_text=input_text, timeout=timeout)
+        return data, raw
+
+
+class ParallelBackend(Backend):
+    """One ``commit-check`` process per scope, ``check_workers`` at a time."""
+
+    name = "parallel"
+
+    def workers(self, pending: int) -> int:
+        return check_workers(pending)
+
+
+class WorkerPoolBackend(Backend):
+    """Long-lived workers under the CLI's interpreter (see ``WorkerPool``)."""
+
+    name = "workers"
+
+    def start(self) -> None:
+        start_worker_pool()
+
+    def stop(self) -> None:
+        stop_worker_pool()
+
+    def workers(self, pending: int) -> int:
+        return check_workers(pending)
+
+    def run(
+        self,
+        args: list[str],
+        input_text: str | None = None,
+        timeout: float | None = None,
+    ) -> tuple[dict[str, Any] | None, str]:
+        data = _worker_pool.run(args, input_text, timeout) if _worker_pool else None
+        if data is not None:
+            return data, ""
+        return super().run(args, input_text, timeout)
+
+
+class InProcessBackend(Backend):
+    """The commit-check engine imported into this process (``InProcessEngine``).
+
+    One scope at a time: the rules are pure Python and hold the GIL, so more
+    threads would add switching, not throughput.
+
+    Holding the GIL also means a check running here cannot be stopped — not
+    even by a watchdog thread, which never gets to run while a regex
+    backtracks. So when checks have a time limit, each one goes to a single
+    worker under this same interpreter (see ``Worker``) instead, which is
+    killed and replaced when a check overruns. Only when that worker cannot
+    start are checks run here, where the limit can merely stop new ones from
+    starting.
+    """
+
+    name = "in-process"
+
+    def __init__(self) -> None:
+        self._guard: WorkerPool | None = None
+
+    def start(self) -> None:
+        if SCOPE_TIMEOUT <= 0 and TIME_BUDGET <= 0:
+            return
+        pool = WorkerPool(sys.executable, 1)
+        if pool.alive:
+            self._guard = pool
+        else:
+            pool.shutdown()
+            print("::debug::no worker to time checks out in, checking in-process")
+
+    def stop(self) -> None:
+        if self._guard is not None:
+            self._guard.shutdown()
+            self._guard = None
+
+    def run(
+        self,
+        args: list[str],
+        input_text: str | None = None,
+        timeout: float | None = None,
+    ) -> tuple[dict[str, Any] | None, str]:
+        guard = self._guard
+        data = guard.run(args, input_text, timeout) if guard is not None else None
+        if data is None:
+            data = run_check_in_process(args, input_text=input_text)
+        if data is not None:
+            return data, ""
+        return super().run(args, input_text, timeout)
+
+
+BACKENDS: dict[str, type[Backend]] = {
+    backend.name: backend
+    for backend in (
+        Backend,
+        ParallelBackend,
+        WorkerPoolBackend,
+        InProcessBackend,
+    )
+}
+
+#: Up to this many scopes, ``auto`` runs the CLI serially: starting a pool
+#: costs more than it could save.
+SERIAL_MAX_SCOPES = 2
+
+
+def select_backend(scope_count: int | None) -> tuple[Backend, str]:
+    """Pick the backend for a run of about ``scope_count`` scopes, and say why.
+
+    ``backend`` names one outright; ``auto`` prefers the cheapest thing that
+    works: in-process when commit_check imports here, else the CLI serially
+    for a couple of scopes, else persistent workers when the CLI's interpreter
+    can be found, else a pool of CLI processes. ``None`` means the count is
+    unknown.
+    """
+    if BACKEND in BACKENDS:
+        return BACKENDS[BACKEND](), "set by the backend input"
+    if BACKEND != "auto":
+        print(f"::warning::Unknown backend {BACKEND!r}, using auto")
+    if get_in_process_engine() is not None:
+        return InProcessBackend(), "commit_check imports in this interpreter"
+    if scope_count is not None and scope_count <= SERIAL_MAX_SCOPES:
+        return Backend(), f"{scope_count} scope(s) do not pay for a pool"
+    if commit_check_python() is not None:
+        return WorkerPoolBackend(), "the CLI's interpreter can host workers"
+    return ParallelBackend(), "no faster option is available"
+
+
+_backend: Backend | None = None
+
+#: What get_backend picked outside a run, for the ``backend`` input it was
+#: picked for.
+_idle_backend: tuple[str, Backend] | None = None
+
+
+def get_backend() -> Backend:
+    """The backend of the run in progress, or outside of one, the pick
+    select_backend makes, made once per ``backend`` input."""
+    global _idle_backend
+    if _backend is not None:
+        return _backend
+    if _idle_backend is None or _idle_backend[0] != BACKEND:
+        _idle_backend = (BACKEND, select_backend(None)[0])
+    return _idle_backend[1]
+
+
+def run_checks(
+    args: list[str], input_text: str | None = None, timeout: float | None = None
+) -> tuple[dict[str, Any] | None, str]:
+    """Evaluate ``args`` on the current backend; return (parsed JSON, raw output)."""
+    return get_backend().run(args, input_text=input_text, timeout=timeout)
+
+
+#: What ``run_checks`` returns: the parsed JSON (or ``None``) and the raw output.
+CheckOutcome = tuple[dict[str, Any] | None, str]
+
+
+class InputMemo:
+    """Check outcomes of one run, keyed by ``(args, input text)``.
+
+    The same input comes up more than once more often than it seems: the PR
+    title of a one-commit PR is usually that commit's subject, and fixup,
+    revert and "wip" commits repeat one message many times. Each distinct
+    input is evaluated once; a scope that asks while the first evaluation is
+    still running waits for it instead of starting another. A timeout is
+    shared the same way, as the exception the first evaluation raised.
+    """
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self._futures: dict[tuple[tuple[str, ...], str | None], Future] = {}
+        self._lock = threading.Lock()
+
+    def lookup(
+        self,
+        args: list[str],
+        input_text: str | None,
+        evaluate: Callable[[], CheckOutcome],
+    ) -> CheckOutcome:
+        """The outcome for this input, calling ``evaluate`` only the first time."""
+        key = (tuple(args), input_text)
+        with self._lock:
+            self.lookups += 1
+            future = self._futures.get(key)
+            first = future is None
+            if future is None:
+                future = self._futures[key] = Future()
+        if not first:
+            return future.result()
+        try:
+            outcome = evaluate()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(outcome)
+        return outcome
+
+    @property
+    def unique(self) -> int:
+        """Number of distinct inputs looked up."""
+        return len(self._futures)
+
+    def summary(self) -> str:
+        """``N scopes, M unique inputs (ratio)`` for the debug log."""
+        unique = self.unique
+        ratio = self.lookups / unique if unique else 1.0
+        return f"{self.lookups} scopes, {unique} unique inputs ({ratio:.1f}x)"
+
+
+#: The memo of the run in progress; ``None`` outside of one.
+_memo: InputMemo | None = None
+
+
+# ---------------------------------------------------------------------------
+# Inherited config
+#
+# A config with ``inherit_from`` makes commit-check fetch and parse the parent
+# every time it loads the config: once per CLI call, once per worker. The
+# action resolves it once instead, writes local settings over the parent's to
+# a temporary file without ``inherit_from``, and hands every check that file.
+# ---------------------------------------------------------------------------
+
+#: Where commit-check looks for its TOML config, in its own order.
+CONFIG_PATHS = (
+    "cchk.toml",
+    "commit-check.toml",
+    os.path.join(".github", "cchk.toml"),
+    os.path.join(".github", "commit-check.toml"),
+)
+
+#: Seconds to wait for a remote parent config, as commit-check does.
+CONFIG_FETCH_TIMEOUT = 10
+
+#: The flattened config of the run in progress; ``None`` when the config
+#: inherits nothing or could not be flattened, and commit-check resolves it.
+_config_path: str | None = None
+
+
+def config_args() -> list[str]:
+    """The CLI arguments that point commit-check at the flattened config."""
+    return ["--config", _config_path] if _config_path else []
+
+
+def _parse_toml(data: bytes) -> dict[str, Any]:
+    try:
+        import tomllib
+    except ImportError:  # Python 3.10, where commit-check depends on tomli
+        import tomli as tomllib  # type: ignore[import-not-found, no-redef]
+    return tomllib.loads(data.decode("utf-8"))
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        # A JSON string is a TOML basic string, but for DEL, which TOML
+        # only accepts escaped.
+        return json.dumps(value, ensure_ascii=False).replace("\x7f", "\\u007f")
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        items = (f"{_toml_key(k)} = {_toml_value(v)}" for k, v in value.items())
+        return "{" + ", ".join(items) + "}"
+    raise TypeError(f"cannot write {type(value).__name__} to TOML")
+
+
+def _toml_key(key: str) -> str:
+    bare = key and all(c.isascii() and (c.isalnum() or c in "-_") for c in key)
+    return key if bare else json.dumps(key, ensure_ascii=False)
+
+
+def dump_toml(config: dict[str, Any], table: str = "") -> str:
+    """Write a parsed config back as TOML: its values, then a ``[table]`` per
+    nested dict. Enough for anything ``tomllib`` reads from a commit-check
+    config; dates, which no option takes, raise ``TypeError``."""
+    lines = [
+        f"{_toml_key(key)} = {_toml_value(value)}"
+        for key, value in config.items()
+        if not isinstance(value, dict)
+    ]
+    if table and lines:
+        lines.insert(0, f"[{table}]")
+    text = "".join(line + "\n" for line in lines)
+    for key, value in config.items():
+        if isinstance(value, dict):
+            name = f"{table}.{_toml_key(key)}" if table else _toml_key(key)
+            text += ("\n" if text else "") + dump_toml(value, name)
+    return text
+
+
+def _merge_config(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """``override`` deep-merged over ``base``, as commit-check merges layers."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(merged.get(key), dict) and isinstance(value, dict):
+            merged[key] = _merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def inherit_url(value: str) -> str | None:
+    """The URL an ``inherit_from`` value is fetched from, in commit-check's
+    rules: ``github:owner/repo[@ref]:path`` and ``https://`` URLs are remote,
+    anything else is a local path (``None``). A malformed ``github:`` value
+    maps to ``""``, which commit-check ignores."""
+    if value.startswith("https://"):
+        return value
+    if not value.startswith("github:"):
+        return None
+    repo, _sep, path = value[len("github:") :].partition(":")
+    repo, _at, ref = repo.partition("@")
+    if "/" not in repo or not path:
+        return ""
+    return f"https://raw.githubusercontent.com/{repo}/{ref or 'HEAD'}/{path}"
+
+
+def fetch_config_layer(url: str) -> dict[str, Any] | None:
+    """Fetch and parse the remote parent config at ``url``.
+
+    With ``cache-dir`` set, the last copy is kept under ``config/`` there with
+    its ``ETag`` and ``Last-Modified``, and each run revalidates it with a
+    conditional request: unchanged, the parent costs a ``304`` and no parse of
+    a fresh download. A copy is only stored once it parses. When the fetch
+    fails the stored copy is used, with a warning; without one the result is
+    ``None`` and commit-check is left to resolve the config itself.
+    """
+    entry_path = None
+    cached: dict[str, Any] = {}
+    if CACHE_DIR:
+        name = hashlib.sha256(url.encode()).hexdigest()
+        entry_path = os.path.join(CACHE_DIR, "config", f"{name}.json")
+        with contextlib.suppress(OSError, ValueError):
+            with open(entry_path, encoding="utf-8") as f:
+                cached = json.load(f)
+    request = urllib.request.Request(url)
+    if cached.get("etag"):
+        request.add_header("If-None-Match", cached["etag"])
+    if cached.get("last_modified"):
+        request.add_header("If-Modified-Since", cached["last_modified"])
+    timeout = time_left()
+    try:
+        with urllib.request.urlopen(  # noqa: S310 - https, or a test's file://
+            request, timeout=min(CONFIG_FETCH_TIMEOUT, timeout or CONFIG_FETCH_TIMEOUT)
+        ) as response:
+            body = response.read()
+            headers = response.headers
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and "body" in cached:
+            print(f"::debug::inherited config {url} not modified")
+            return _parse_toml(cached["body"].encode())
+        error: Exception = e
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        error = e
+    else:
+        config = _parse_toml(body)
+        if entry_path is not None:
+            entry = {
+                "body": body.decode("utf-8"),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+            }
+            temp = f"{entry_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+                with open(temp, "w", encoding="utf-8") as f:
+                    json.dump(entry, f)
+                os.replace(temp, entry_path)
+            except OSError as e:
+                print(f"::debug::could not cache inherited config: {e}")
+        return config
+    if "body" in cached:
+        print(f"::warning::Could not fetch {url} ({error}), using the cached copy")
+        return _parse_toml(cached["body"].encode())
+    print(f"::debug::could not fetch inherited config {url}: {error}")
+    return None
+
+
+def resolve_config() -> dict[str, Any] | None:
+    """The config file commit-check would load, with its parent merged in.
+
+    ``None`` when there is nothing to flatten — no config file, or one without
+    ``inherit_from`` — or the parent cannot be had. Like commit-check, this
+    follows one ``inherit_from``: the parent's own is dropped, not followed.
+    """
+    for path in CONFIG_PATHS:
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                local = _parse_toml(f.read())
+            break
+    else:
+        return None
+    inherit_from = local.pop("inherit_from", None)
+    if not isinstance(inherit_from, str) or not inherit_from:
+        return None
+    url = inherit_url(inherit_from)
+    if url is None:
+        with open(inherit_from, "rb") as f:
+            parent: dict[str, Any] | None = _parse_toml(f.read())
+    else:
+        parent = fetch_config_layer(url) if url else {}
+    if parent is None:
+        return None
+    parent.pop("inherit_from", None)
+    return _merge_config(parent, local)
+
+
+def flatten_config() -> str | None:
+    """Write the resolved config to a temporary file and return its path.
+
+    The file is read back before it is used, so a value ``dump_toml`` got
+    wrong can only cost the speed-up: on any failure the result is ``None``
+    and commit-check resolves the original config, as it would without this.
+    """
+    try:
+        config = resolve_config()
+        if config is None:
+            return None
+        text = dump_toml(config)
+        if _parse_toml(text.encode()) != config:
+            raise ValueError("the flattened config does not read back the same")
+    except Exception as e:
+        print(f"::debug::config not flattened: {e}")
+        return None
+    fd, path = tempfile.mkstemp(prefix="commit-check-", suffix=".toml")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"::debug::flattened the inherited config into {path}")
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+#: Part of every key; bump it when the layout of an entry changes.
+CACHE_FORMAT = 1
+
+
+def results_namespace() -> str | None:
+    """What a stored message result is only valid under: the commit-check
+    version and ``config_fingerprint()``. ``None`` when either is unknown,
+    in which case nothing may be reused."""
+    version = _commit_check_version()
+    fingerprint = config_fingerprint() if version else None
+    return f"{CACHE_FORMAT}:{version}:{fingerprint}" if fingerprint else None
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    """Hold an exclusive lock on ``path`` (created if missing) across processes.
+
+    ``msvcrt`` on Windows, ``fcntl`` everywhere else; closing the file
+    releases either.
+    """
+    with open(path, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def config_fingerprint() -> str | None:
+    """Hash of everything besides the input that decides a message check.
+
+    That is the resolved config — from the in-process engine when it loads,
+    else the config files (or the flattened one) and ``CCHK_*`` variables it
+    is resolved from — and the author commit-check compares to
+    ``ignore_authors`` for a message given on stdin: ``user.name``, or when
+    that is unset, HEAD's author. ``None`` when it cannot be known: a config
+    file that inherits from another and was not flattened.
+    """
+    digest = hashlib.sha256()
+    engine = get_in_process_engine()
+    if engine is not None:
+        digest.update(json.dumps(engine.config, sort_keys=True, default=str).encode())
+    else:
+        for path in [_config_path] if _config_path else CONFIG_PATHS:
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+            except OSError:
+                continue
+            if b"inherit_from" in content:
+                return None
+            digest.update(path.encode() + b"\0" + content + b"\0")
+        for name in sorted(os.environ):
+            if name.startswith("CCHK_"):
+                digest.update(f"{name}={os.environ[name]}\0".encode())
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            check=False,
+            timeout=time_left(),
+        ).stdout.strip()
+
+    author = git("config", "user.name") or git(
+        "log", "-n", "1", "--pretty=format:%an", "HEAD"
+    )
+    digest.update(author.encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Checks of earlier runs on disk, so an unchanged commit is not re-checked.
+
+    Every ``synchronize`` push re-checks every commit in the PR, though most
+    of the messages and the config have not changed. An entry is the parsed
+    ``checks`` of one message, under a hash of the message as commit-check
+    reads it (stripped), the check flags, ``config_fingerprint()`` and the
+    commit-check version — so a change to any of them is a miss, never a
+    stale hit. Only checks with input text are cached: branch and author
+    checks read their value from git.
+
+    Entries are written to a temporary file and renamed into place, so a
+    reader never sees half of one and jobs sharing the directory need no lock
+    to read or write. Eviction does take one, ``.lock`` in the directory: it
+    deletes the least recently used entries (reads refresh the mtime) until
+    the directory is under ``max_bytes``.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._prefix: str | None = None
+
+    def _key_prefix(self) -> str:
+        """Version and config fingerprint; ``""`` disables the cache."""
+        with self._lock:
+            if self._prefix is None:
+                self._prefix = results_namespace() or ""
+                if not self._prefix:
+                    print("::debug::result cache disabled: config cannot be keyed")
+            return self._prefix
+
+    def _path(self, args: list[str], input_text: str | None) -> str | None:
+        prefix = self._key_prefix() if input_text is not None else ""
+        if not prefix:
+            return None
+        key = json.dumps([prefix, args, (input_text or "").strip()])
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, name[:2], f"{name}.json")
+
+    def get(self, args: list[str], input_text: str | None) -> list[dict] | None:
+        """The cached checks for this input, or ``None`` on a miss."""
+        path = self._path(args, input_text)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                checks = json.load(f)["checks"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            checks = None
+        with self._lock:
+            if checks is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return checks
+
+    def put(self, args: list[str], input_text: str | None, checks: list[dict]) -> None:
+        """Store the checks for this input; a failure to write is ignored."""
+        path = self._path(args, input_text)
+        if path is None:
+            return
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump({"checks": checks}, f)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"::debug::could not write result cache entry: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``.
+
+        Only the entries' own two-hex-digit shard directories are counted and
+        evicted; anything else kept under the directory, such as the
+        ``inherit_from`` layers in ``config/``, is left alone.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with _file_lock(os.path.join(self.directory, ".lock")):
+                entries = []
+                shards = [
+                    shard.path
+                    for shard in os.scandir(self.directory)
+                    if re.fullmatch("[0-9a-f]{2}", shard.name) and shard.is_dir()
+                ]
+                for shard in shards:
+                    for entry in os.scandir(shard):
+                        if entry.name.endswith(".json") and entry.is_file():
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total = sum(size for _mtime, size, _path in entries)
+                for _mtime, size, path in sorted(entries):
+                    if total <= self.max_bytes:
+                        break
+                    with contextlib.suppress(OSError):
+                        os.remove(path)
+                    total -= size
+        except OSError as e:
+            print(f"::debug::could not evict result cache entries: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts, for the debug log and the ``result`` output."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+#: The result cache of the last run; ``None`` when ``cache-dir`` is not set.
+_result_cache: ResultCache | None = None
+
+
+# ---------------------------------------------------------------------------
+# Git notes
+# ---------------------------------------------------------------------------
+
+#: Where each commit's results are recorded with ``git-notes: true``.
+NOTES_REF = "refs/notes/commit-check"
+
+#: Results kept per note, newest last: one per config and commit-check
+#: version, so branches with different configs do not overwrite each other.
+NOTES_KEEP = 3
+
+#: Note text by SHA, as the run read it (see stream_commits).
+_notes: dict[str, str] = {}
+
+#: PR commits whose patch is already on the base branch, by SHA.
+_upstream: set[str] = set()
+
+#: ``reason`` of a commit ``skip-upstream`` does not check.
+ALREADY_UPSTREAM = "not evaluated: same patch as a commit on the base branch"
+
+
+def rev_list_args() -> list[str]:
+    """The ``git rev-list`` options stream_commits needs: with
+    ``skip-upstream``, each SHA marked ``=`` when its patch is already on the
+    base branch (``+`` otherwise)."""
+    return ["--cherry-mark", "--right-only"] if SKIP_UPSTREAM_ENABLED else []
+
+
+def commit_range(base: str, head: str) -> str:
+    """The PR's commits, ``base..head``, in the form rev_list_args needs.
+
+    ``--cherry-mark`` compares the two sides of a symmetric difference, so
+    with ``skip-upstream`` this is ``base...head``; ``--right-only`` then
+    keeps the same commits ``base..head`` lists.
+    """
+    return f"{base}...{head}" if SKIP_UPSTREAM_ENABLED else f"{base}..{head}"
+
+
+def fetch_git_notes() -> None:
+    """Fetch ``NOTES_REF`` from origin, which a checkout does not do.
+
+    Best effort: the ref may not have been pushed yet, the local one may be
+    ahead (the fetch is not forced), and either way the run goes on.
+    """
+    try:
+        subprocess.run(
+            ["git", "fetch", "--quiet", "origin", f"{NOTES_REF}:{NOTES_REF}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            timeout=time_left(),
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"::debug::could not fetch {NOTES_REF}: {e}")
+
+
+def _decode_note(text: str) -> dict[str, Any]:
+    try:
+        entries = json.loads(text)
+    except ValueError:
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _note_checks(text: str, namespace: str) -> list[dict[str, str]] | None:
+    checks = _decode_note(text).get(namespace)
+    if isinstance(checks, list) and all(isinstance(c, dict) for c in checks):
+        return checks
+    return None
+
+
+def notes_results() -> dict[str, list[dict[str, str]]]:
+    """Checks recorded in the notes the run read, by SHA, for this config."""
+    namespace = results_namespace() if _notes else None
+    if namespace is None:
+        return {}
+    results = {}
+    for sha, text in _notes.items():
+        checks = _note_checks(text, namespace)
+        if checks is not None:
+            results[sha] = checks
+    return results
+
+
+def write_git_notes(results: list[ScopeResult]) -> None:
+    """Record each commit's checks in ``NOTES_REF``, and push it if asked.
+
+    All notes go in one ``git fast-import`` commit on top of the current
+    ``NOTES_REF``, rather than one ``git notes add`` per commit; fast-import
+    resolves that parent itself, once the run's object reader (which read
+    the notes) says there is one. A note the run did not read while walking
+    is read from there too, so other namespaces' results are kept. Commits
+    whose note already holds these results are left alone, so a run that
+    checked nothing new writes nothing. Failures are warnings: the notes
+    are an optimization, not part of the verdict.
+    """
+    namespace = results_namespace()
+    if namespace is None:
+        return
+    scopes = [s for s in results if s.sha and s.checks and not s.outcome]
+    if not scopes:
+        return
+    notes = {}
+    try:
+        objects = git_objects()
+        exists = objects.resolve(NOTES_REF) is not None
+        for scope in scopes:
+            # A run that did not walk this commit (one restored from the PR
+            # comment) has not read its note; the other namespaces' entries
+            # in it must survive all the same.
+            text = _notes.get(scope.sha)
+            if text is None and exists:
+                text = objects.note(NOTES_REF, scope.sha)
+            entries = _decode_note(text or "")
+            if entries.get(namespace) == scope.checks:
+                continue
+            entries.pop(namespace, None)
+            entries[namespace] = scope.checks
+            kept = dict(list(entries.items())[-NOTES_KEEP:])
+            notes[scope.sha] = json.dumps(kept, separators=(",", ":")).encode()
+    except (OSError, EOFError) as e:
+        print(f"::warning::Unable to write {NOTES_REF}: {e}")
+        return
+    if not notes:
+        return
+
+    def data(content: bytes) -> bytes:
+        return b"data %d\n%s\n" % (len(content), content)
+
+    stream = [
+        f"commit {NOTES_REF}\n".encode(),
+        f"committer commit-check-action <> {int(time.time())} +0000\n".encode(),
+        data(b"Record commit-check results"),
+    ]
+    if exists:
+        stream.append(f"from {NOTES_REF}^0\n".encode())
+    for sha, content in notes.items():
+        stream.extend([f"N inline {sha}\n".encode(), data(content)])
+    result = subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input=b"".join(stream),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         check=False,
     )
-    raw = result.stdout or ""
-    try:
-        return result.returncode, json.loads(raw), raw
-    except json.JSONDecodeError:
-        return result.returncode, None, raw
+    if result.returncode != 0:
+        error = result.stderr.decode("utf-8", "replace").strip()
+        print(f"::warning::Unable to write {NOTES_REF}: {error}")
+        return
+    print(f"::debug::recorded {len(notes)} commits in {NOTES_REF}")
+    if GIT_NOTES_PUSH_ENABLED:
+        push = subprocess.run(
+            ["git", "push", "--quiet", "origin", NOTES_REF],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            check=False,
+        )
+        if push.returncode != 0:
+            print(f"::warning::Unable to push {NOTES_REF}: {push.stderr.strip()}")
+
+
+def run_checks_cached(
+    args: list[str], input_text: str | None = None, timeout: float | None = None
+) -> CheckOutcome:
+    """``run_checks`` behind the result cache, when there is one."""
+    cache = _result_cache
+    checks = cache.get(args, input_text) if cache is not None else None
+    if checks is not None:
+        return {"checks": checks}, ""
+    data, raw = run_checks(args, input_text=input_text, timeout=timeout)
+    if cache is not None and isinstance(data, dict):
+        if isinstance(data.get("checks"), list):
+            cache.put(args, input_text, data["checks"])
+    return data, raw
+
+
+def evaluate(
+    args: list[str], input_text: str | None = None, timeout: float | None = None
+) -> CheckOutcome:
+    """``run_checks``, once per distinct input in a run (see ``InputMemo``),
+    and not at all for one the result cache has seen (see ``ResultCache``)."""
+    memo = _memo
+    if memo is None:
+        return run_checks_cached(args, input_text=input_text, timeout=timeout)
+    return memo.lookup(
+        args,
+        input_text,
+        lambda: run_checks_cached(args, input_text=input_text, timeout=timeout),
+    )
 
 
 def check_scope(
     label: str, args: list[str], input_text: str | None = None
 ) -> ScopeResult:
-    """Run commit-check for one scope and wrap the outcome in a ScopeResult."""
-    _rc, data, raw = run_check_json(args, input_text=input_text)
+    """Run commit-check for one scope and wrap the outcome in a ScopeResult.
+
+    A scope that would start after the time budget ran out, or after the
+    failure limit was reached, is not started; one that overruns its time, or
+    is still running when the limit is reached, is killed. All of them are
+    reported as such rather than as failures.
+    """
+    if failure_limit_reached():
+        return ScopeResult(label=label, outcome="skip", reason=FAILURE_LIMIT_REACHED)
+    timeout = time_left()
+    if timeout is not None and timeout <= 0:
+        return ScopeResult(label=label, outcome="skip", reason=BUDGET_EXHAUSTED)
+    try:
+        data, raw = evaluate(args, input_text=input_text, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return tally(
+            ScopeResult(
+                label=label,
+                outcome="timeout",
+                reason=f"timed out after {timeout:.0f}s",
+            )
+        )
+    except CheckCancelled:
+        return ScopeResult(label=label, outcome="skip", reason=CANCELLED)
     if isinstance(data, dict):
-        return ScopeResult(label=label, checks=data.get("checks", []))
-    return ScopeResult(label=label, raw_text=raw)
+        return tally(ScopeResult(label=label, checks=data.get("checks", [])))
+    return tally(ScopeResult(label=label, raw_text=raw))
 
 
-def run_pr_message_checks(pr_messages: list[str]) -> list[ScopeResult]:
-    """Check each PR commit message individually via commit-check --message."""
-    results: list[ScopeResult] = []
+def run_pr_message_checks(
+    pr_messages: list[str],
+    known: dict[int, list[dict[str, str]]] | None = None,
+    upstream: set[int] | None = None,
+) -> list[ScopeResult]:
+    """Check each PR commit message individually via commit-check --message.
+
+    Up to ``Backend.workers`` messages are checked at once, but results come
+    back in commit order — ``Executor.map`` yields in submission order no
+    matter which check finishes first — so ``Commit i/N`` labels and every
+    rendered surface are the same as a serial run.
+
+    With a failure limit the newest commits are checked first: they are the
+    ones most likely still wrong, and once the limit is hit the older ones
+    are not started at all.
+
+    ``known`` maps commit numbers (from 1) to checks restored from an earlier
+    run (see ``load_pr_state``); those commits are not checked again. Nor are
+    the ones in ``upstream``, which are reported as skipped.
+    """
     total = len(pr_messages)
-    for index, msg in enumerate(pr_messages, start=1):
-        results.append(
-            check_scope(f"Commit {index}/{total}", ["--message"], input_text=msg)
+    known = known or {}
+    # Restored first, so they count towards the failure limit before any
+    # new check could start.
+    scopes = {
+        index: tally(ScopeResult(label=f"Commit {index}/{total}", checks=checks))
+        for index, checks in known.items()
+    }
+    for index in upstream or ():
+        scopes.setdefault(
+            index,
+            ScopeResult(
+                label=f"Commit {index}/{total}",
+                outcome="skip",
+                reason=ALREADY_UPSTREAM,
+            ),
         )
-    return results
+    todo = [
+        (index, msg)
+        for index, msg in enumerate(pr_messages, start=1)
+        if index not in scopes
+    ]
+
+    def check(item: tuple[int, str]) -> ScopeResult:
+        index, msg = item
+        return check_scope(f"Commit {index}/{total}", ["--message"], input_text=msg)
+
+    if failure_limit() > 0:
+        todo.reverse()
+    workers = get_backend().workers(len(todo)) if todo else 1
+    if workers == 1:
+        checked = [check(item) for item in todo]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            checked = list(pool.map(check, todo))
+    scopes.update(zip((index for index, _msg in todo), checked))
+    return [scopes[index] for index in range(1, total + 1)]
 
 
 def run_other_checks(args: list[str]) -> list[ScopeResult]:
-    """Run each non-message check (branch, author) once, as its own scope."""
-    results: list[ScopeResult] = []
-    for flag in args:
-        label = CHECK_LABELS.get(flag)
-        if label:
-            results.append(check_scope(label, [flag]))
-    return results
+    """Run the non-message checks (branch, author) and report each as its own scope.
+
+    All of them go to commit-check in one invocation, and the returned checks
+    are split back per flag by their ``check`` name (``CHECK_TYPES``). That is
+    one interpreter start-up and one config load instead of one per flag.
+
+    If the combined output cannot be split faithfully — it did not parse, it
+    names a check this action does not know how to attribute, or the call
+    timed out — each flag is run on its own instead, so a failure or a timeout
+    is never reported against the wrong scope or dropped.
+    """
+    flags = [flag for flag in args if flag in CHECK_LABELS]
+    timeout = time_left(len(flags))
+    if (
+        len(flags) <= 1
+        or (timeout is not None and timeout <= 0)
+        or failure_limit_reached()
+    ):
+        return [check_scope(CHECK_LABELS[flag], [flag]) for flag in flags]
+
+    try:
+        data, _raw = run_checks(flags, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        data = None
+    except CheckCancelled:
+        return [
+            ScopeResult(label=CHECK_LABELS[flag], outcome="skip", reason=CANCELLED)
+            for flag in flags
+        ]
+    checks = data.get("checks") if isinstance(data, dict) else None
+    owner = {check: flag for flag in flags for check in CHECK_TYPES[flag]}
+    if not isinstance(checks, list) or any(c.get("check") not in owner for c in checks):
+        return [check_scope(CHECK_LABELS[flag], [flag]) for flag in flags]
+
+    return [
+        tally(
+            ScopeResult(
+                label=CHECK_LABELS[flag],
+                checks=[c for c in checks if owner[c["check"]] == flag],
+            )
+        )
+        for flag in flags
+    ]
 
 
 def build_check_args() -> list[str]:
@@ -331,43 +2979,317 @@ def build_check_args() -> list[str]:
     return [flag for flag, enabled in flags if enabled]
 
 
+def estimate_scope_count(args: list[str]) -> int | None:
+    """How many scopes this run will report, known before reading git history.
+
+    The commit count comes from the event payload; ``None`` when a PR run
+    checks messages and the payload does not say how many commits there are.
+    """
+    in_pr = is_pr_event()
+    count = len([a for a in args if a in CHECK_LABELS])
+    if PR_TITLE_ENABLED and in_pr:
+        count += 1
+    if "--message" in args:
+        commits = get_pr_commit_count() if in_pr else 1
+        if commits is None:
+            return None
+        count += commits
+    return count
+
+
+def check_pr_title() -> list[ScopeResult]:
+    """The PR title scope, or nothing when the title is unavailable."""
+    pr_title = get_pr_title()
+    if not pr_title:
+        return []
+    return [check_scope("PR title", ["--message"], input_text=pr_title)]
+
+
+def stream_pr_message_checks(
+    commits: Iterable[tuple[str, str]],
+    state: dict[str, list[dict[str, str]]] | None = None,
+) -> list[ScopeResult]:
+    """check_commit_messages for commits still arriving from git (see
+    get_pr_commits).
+
+    Each commit is checked the moment it arrives, up to ``Backend.workers``
+    at once, while git lists the rest. No more than twice that many wait for
+    a worker, so slow checks hold git back instead of piling up messages.
+    Commits are restored or skipped as in run_pr_message_checks, and get
+    their ``Commit i/N`` label once the last one is in and N is known.
+    """
+    state = state or {}
+    namespace = results_namespace() if GIT_NOTES_ENABLED else None
+    workers = get_backend().workers(get_pr_commit_count() or LOG_QUEUE_SIZE)
+    slots = threading.BoundedSemaphore(2 * workers)
+
+    def check(msg: str) -> ScopeResult:
+        try:
+            return check_scope("", ["--message"], input_text=msg)
+        finally:
+            slots.release()
+
+    pending: list[ScopeResult | Future[ScopeResult]] = []
+    shas = []
+    restored = skipped = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for sha, msg in commits:
+            shas.append(sha)
+            checks = state.get(sha)
+            if checks is None and namespace is not None and sha in _notes:
+                checks = _note_checks(_notes[sha], namespace)
+            if checks is not None:
+                restored += 1
+                pending.append(tally(ScopeResult(label="", checks=checks)))
+            elif sha in _upstream:
+                skipped += 1
+                pending.append(
+                    ScopeResult(label="", outcome="skip", reason=ALREADY_UPSTREAM)
+                )
+            else:
+                slots.acquire()
+                pending.append(pool.submit(check, msg))
+    scopes = [
+        scope.result() if isinstance(scope, Future) else scope for scope in pending
+    ]
+    total = len(scopes)
+    for index, (scope, sha) in enumerate(zip(scopes, shas), start=1):
+        scope.label = f"Commit {index}/{total}"
+        scope.sha = sha
+    if restored:
+        print(f"::debug::restored {restored} of {total} commits from earlier runs")
+    if skipped:
+        print(
+            f"::debug::skipping {skipped} of {total} commits "
+            "already on the base branch"
+        )
+    return scopes
+
+
+def until_timeout(
+    commits: Iterator[tuple[str, str]], expired: list[subprocess.TimeoutExpired]
+) -> Iterator[tuple[str, str]]:
+    """``commits``, ending where a listing the time budget cut short raised;
+    the timeout goes into ``expired``."""
+    try:
+        yield from commits
+    except subprocess.TimeoutExpired as e:
+        expired.append(e)
+
+
+def unlisted_commits_scope(listed: int) -> ScopeResult:
+    """The commits git did not list in time, after the ``listed`` it did."""
+    expected = get_pr_commit_count()
+    count = (
+        f"{expected - listed} " if expected is not None and expected > listed else ""
+    )
+    return tally(
+        ScopeResult(
+            label="Unlisted commits",
+            outcome="timeout",
+            reason=f"git did not list the {count}remaining commits within the "
+            "time budget",
+        )
+    )
+
+
+def check_commit_messages(
+    pr_commits: Iterable[tuple[str, str]],
+    args: list[str],
+    state: dict[str, list[dict[str, str]]] | None = None,
+) -> list[ScopeResult]:
+    """The commit message scopes: one per PR commit, or HEAD's outside a PR.
+
+    When the time budget stopped git listing the PR's commits, those it
+    listed are checked, and the rest reported as one ``timeout`` scope: a
+    partial list is never passed as the whole PR, nor an empty one as a
+    checkout with nothing to compare, which would check HEAD instead.
+    """
+    expired: list[subprocess.TimeoutExpired] = []
+    if isinstance(pr_commits, Iterator):
+        pr_commits = until_timeout(pr_commits, expired)
+    scopes = _commit_message_scopes(pr_commits, state)
+    if expired:
+        scopes.append(unlisted_commits_scope(len(scopes)))
+    elif not scopes and "--message" in args:
+        return [check_scope("Commit message", ["--message"])]
+    return scopes
+
+
+def _commit_message_scopes(
+    pr_commits: Iterable[tuple[str, str]],
+    state: dict[str, list[dict[str, str]]] | None = None,
+) -> list[ScopeResult]:
+    """check_commit_messages, for the commits git listed.
+
+    Commits whose SHA is in ``state`` (see ``load_pr_state``) or in the git
+    notes (see ``notes_results``) are restored from there rather than
+    checked again. With ``skip-upstream``, commits whose patch is already on
+    the base branch were checked there, and are skipped.
+
+    Commits still arriving from git are checked as they come (see
+    stream_pr_message_checks), unless a failure limit asks for the newest
+    commits first.
+    """
+    if isinstance(pr_commits, Iterator) and failure_limit() == 0:
+        scopes = stream_pr_message_checks(pr_commits, state)
+        if scopes:
+            return scopes
+    pr_commits = list(pr_commits)
+    if pr_commits:
+        # In PR context: check each commit individually to avoid
+        # only validating the synthetic merge commit at HEAD.
+        stored = {**notes_results(), **(state or {})}
+        known = {
+            index: stored[sha]
+            for index, (sha, _msg) in enumerate(pr_commits, start=1)
+            if sha in stored
+        }
+        if known:
+            print(
+                f"::debug::restored {len(known)} of {len(pr_commits)} commits "
+                "from earlier runs"
+            )
+        upstream = {
+            index
+            for index, (sha, _msg) in enumerate(pr_commits, start=1)
+            if sha in _upstream and index not in known
+        }
+        if upstream:
+            print(
+                f"::debug::skipping {len(upstream)} of {len(pr_commits)} commits "
+                "already on the base branch"
+            )
+        scopes = run_pr_message_checks(
+            [msg for _sha, msg in pr_commits], known, upstream
+        )
+        for scope, (sha, _msg) in zip(scopes, pr_commits):
+            scope.sha = sha
+        return scopes
+    return []
+
+
+async def _run_checks_concurrently(
+    args: list[str], backend: Backend
+) -> list[ScopeResult]:
+    """Schedule every independent stage at once and collect them in report order.
+
+    Nothing here depends on anything else except the commit checks, which
+    need the messages. So git starts reading history first, the PR title and
+    branch/author checks start alongside it, and each commit check starts
+    the moment git printed its message (see get_pr_commits). Each stage is
+    blocking code (subprocesses, or the in-process engine) and runs on a
+    thread; ``gather`` returns in the order it was given, not the order things
+    finished.
+
+    With a failure limit the PR title and branch/author checks — one cheap
+    call each, and the likeliest to be wrong — finish before any commit check
+    starts, so a bad title alone can stop a thousand-commit run.
+
+    An ``edited`` event that changed only the title or description cannot
+    have changed anything else, so when the previous run's state covers this
+    one, nothing else is checked and git history is not read at all.
+    """
+    previous: dict[str, Any] | None = None
+    edited = get_edited_fields()
+    if edited is not None and edited <= EDIT_ONLY_FIELDS:
+        previous = await asyncio.to_thread(load_pr_state)
+        restored = await asyncio.to_thread(restore_edited_run, previous, edited, args)
+        if restored is not None:
+            print(f"::debug::edited {sorted(edited)}: restored the other scopes")
+            return restored
+    messages = (
+        asyncio.create_task(asyncio.to_thread(get_pr_commits))
+        if MESSAGE_ENABLED
+        else None
+    )
+    # The comment is listed once a run: what the edit check read, if it did.
+    state = (
+        asyncio.create_task(asyncio.to_thread(load_pr_state))
+        if MESSAGE_ENABLED and previous is None
+        else None
+    )
+    # The backend (workers, say) gets ready while git reads history, and
+    # before any check could want it.
+    await asyncio.to_thread(backend.start)
+
+    async def nothing() -> list[ScopeResult]:
+        return []
+
+    title = (
+        asyncio.to_thread(check_pr_title)
+        if PR_TITLE_ENABLED and is_pr_event()
+        else nothing()
+    )
+    others = asyncio.to_thread(run_other_checks, [a for a in args if a != "--message"])
+
+    async def commits() -> list[ScopeResult]:
+        pr_commits = await messages if messages is not None else []
+        loaded = await state if state is not None else previous
+        known = loaded.get("commits", {}) if loaded is not None else {}
+        return await asyncio.to_thread(check_commit_messages, pr_commits, args, known)
+
+    if failure_limit() > 0:
+        first, last = await asyncio.gather(title, others)
+        stages = [first, await commits(), last]
+    else:
+        stages = list(await asyncio.gather(title, commits(), others))
+    return [scope for stage in stages for scope in stage]
+
+
+@in_run_context()
 def run_commit_check() -> tuple[int, list[ScopeResult]]:
     """Runs all enabled checks and returns the overall exit code and results.
 
-    Checks are evaluated in order:
+    Results are reported in order, however the work overlaps:
       1. PR title (when ``pr-title: true`` and in a PR event)
-      2. Individual PR commit messages (when ``message: true`` and in a PR event)
+      2. Individual PR commit messages (when ``message: true`` and in a PR event),
+         or the HEAD commit message outside a PR
       3. All remaining checks (branch, author name/email, etc.)
-
-    Outside of a PR event all enabled checks are handed to the CLI at once.
     """
+    global _backend, _config_path, _deadline, _failures, _memo, _result_cache
+    global _run_stats
+    _run_stats = run_stats = RunStats()
+    # Before the backend is picked, which may load the in-process engine.
+    with timed("config"):
+        _config_path = config_path = flatten_config()
     args = build_check_args()
-    results: list[ScopeResult] = []
-
-    # ---- 1. PR title check ------------------------------------------------
-    if PR_TITLE_ENABLED and is_pr_event():
-        pr_title = get_pr_title()
-        if pr_title:
-            results.append(check_scope("PR title", ["--message"], input_text=pr_title))
-
-    # ---- 2. Commit message checks -----------------------------------------
-    if MESSAGE_ENABLED:
-        pr_messages = get_pr_commit_messages()
-        if pr_messages:
-            # In PR context: check each commit individually to avoid
-            # only validating the synthetic merge commit at HEAD.
-            results.extend(run_pr_message_checks(pr_messages))
-            args = [a for a in args if a != "--message"]
-
-    # ---- 3. Remaining checks (branch, author, etc.) -----------------------
-    # Outside a PR, check the HEAD commit message directly.
-    if "--message" in args:
-        results.append(check_scope("Commit message", ["--message"]))
-        args = [a for a in args if a != "--message"]
-    results.extend(run_other_checks(args))
-
-    exit_code = exit_code_for(results)
-    return exit_code, results
+    backend, reason = select_backend(estimate_scope_count(args))
+    print(f"::debug::backend={backend.name} ({reason})")
+    run_stats.backend = backend.name
+    _backend = backend
+    _deadline = time.monotonic() + TIME_BUDGET if TIME_BUDGET > 0 else None
+    _failures = 0
+    _notes.clear()
+    _upstream.clear()
+    _memo = memo = InputMemo()
+    _result_cache = cache = (
+        ResultCache(CACHE_DIR, CACHE_MAX_SIZE * 1024 * 1024) if CACHE_DIR else None
+    )
+    try:
+        with timed("checks"):
+            results = asyncio.run(_run_checks_concurrently(args, backend))
+        run_stats.unique_inputs = memo.unique
+        print(f"::debug::dedupe: {memo.summary()}")
+        if cache is not None:
+            stats = cache.stats()
+            print(
+                f"::debug::result cache: {stats['hits']} hits, {stats['misses']} misses"
+            )
+            cache.evict()
+        if GIT_NOTES_ENABLED:
+            write_git_notes(results)
+    finally:
+        _memo = None
+        _backend = None
+        _deadline = None
+        backend.stop()
+        close_git_objects()
+        _config_path = None
+        if config_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(config_path)
+    return exit_code_for(results), results
 
 
 # ---------------------------------------------------------------------------
@@ -398,69 +3320,47 @@ def _scope_group(label: str) -> str:
     return label
 
 
-def _grouped(results: list[ScopeResult]) -> list[tuple[str, list[ScopeResult]]]:
-    """Split results into ordered groups for step log folding."""
-    groups: list[tuple[str, list[ScopeResult]]] = []
-    for scope in results:
-        group_name = _scope_group(scope.label)
-        if groups and groups[-1][0] == group_name:
-            groups[-1][1].append(scope)
-        else:
-            groups.append((group_name, [scope]))
-    return groups
-
-
-def _render_scopes(scopes: list[ScopeResult], include_docs: bool) -> list[str]:
-    """Render the indented listing for one group of scopes, without its header.
+def _scope_lines(scope: ScopeResult, status: str) -> list[tuple[str, bool]]:
+    """Render the indented listing of one scope, as ``(line, docs_only)`` pairs.
 
     Shared by both output surfaces so they cannot drift: the step log and the
     Markdown details block are the same tree, and the only difference is the
     docs link, which the Markdown report already carries on the rule ID in the
-    table above it.
+    table above it. Those lines are the ``docs_only`` ones.
 
     A failing scope shows its value in full rather than truncated. It is the one
     value the reader has to act on, and the table's 60-character cap can cut off
     the part that explains the failure.
     """
-    lines: list[str] = []
-    for scope in scopes:
-        if scope.status == "skip":
-            # Deliberately not a ✔. Nothing was validated here, and a tick
-            # claiming otherwise is what made a bypassed policy look enforced.
-            lines.append(f"  ⊘ {scope.label} (skipped)")
-            continue
-        if scope.status == "pass":
-            value = _scope_value(scope)
-            lines.append(f"  ✔ {scope.label}{f' ({value})' if value else ''}")
-            continue
-        if scope.raw_text and not scope.checks:
-            # Defensive fallback: commit-check produced unexpected output.
-            lines.append(f"  ✖ {scope.label}")
-            lines.extend(f"      {ln}" for ln in scope.raw_text.strip().splitlines())
-            continue
-        failures = scope.failures
-        count = f" ({len(failures)} failure{'s' if len(failures) != 1 else ''})"
-        lines.append(f"  ✖ {scope.label}{count}")
-        for check in failures:
-            lines.append(f"      {_rule_label(check)}")
-            if check.get("value"):
-                lines.append(f"        value: {check['value']}")
-            for line in check.get("error", "").splitlines():
-                lines.append(f"        {line}")
-            if check.get("suggest"):
-                lines.append(f"        Suggest: {check['suggest']}")
-            if include_docs and check.get("docs_url"):
-                lines.append(f"        Docs: {check['docs_url']}")
-    return lines
-
-
-def _render_tree(results: list[ScopeResult], include_docs: bool) -> list[str]:
-    """Render the full grouped listing: a header line per group, then its scopes."""
-    lines: list[str] = []
-    for group_name, scopes in _grouped(results):
-        lines.append(group_name)
-        lines.extend(_render_scopes(scopes, include_docs))
-    return lines
+    if status == "skip":
+        # Deliberately not a ✔. Nothing was validated here, and a tick
+        # claiming otherwise is what made a bypassed policy look enforced.
+        return [(f"  ⊘ {scope.label} ({scope.reason or 'skipped'})", False)]
+    if status == "timeout":
+        # Neither ✔ nor ✖: the check was stopped before it said either.
+        return [(f"  ⏱ {scope.label} ({scope.reason})", False)]
+    if status == "pass":
+        value = _scope_value(scope)
+        return [(f"  ✔ {scope.label}{f' ({value})' if value else ''}", False)]
+    if scope.raw_text and not scope.checks:
+        # Defensive fallback: commit-check produced unexpected output.
+        lines = [f"  ✖ {scope.label}"]
+        lines.extend(f"      {ln}" for ln in scope.raw_text.strip().splitlines())
+        return [(line, False) for line in lines]
+    failures = scope.failures
+    count = f" ({len(failures)} failure{'s' if len(failures) != 1 else ''})"
+    listing = [(f"  ✖ {scope.label}{count}", False)]
+    for check in failures:
+        listing.append((f"      {_rule_label(check)}", False))
+        if check.get("value"):
+            listing.append((f"        value: {check['value']}", False))
+        for line in check.get("error", "").splitlines():
+            listing.append((f"        {line}", False))
+        if check.get("suggest"):
+            listing.append((f"        Suggest: {check['suggest']}", False))
+        if check.get("docs_url"):
+            listing.append((f"        Docs: {check['docs_url']}", True))
+    return listing
 
 
 def _annotation_escape(text: str) -> str:
@@ -472,7 +3372,7 @@ def _annotation_escape(text: str) -> str:
     return text.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
 
 
-def render_step_log(results: list[ScopeResult]) -> None:
+def render_step_log(results: "list[ScopeResult] | Report") -> None:
     """Print results to the step log, then emit one annotation per failure.
 
     The two are separated deliberately. An ``::error`` command renders as a
@@ -483,36 +3383,23 @@ def render_step_log(results: list[ScopeResult]) -> None:
     the log readable and still surfaces failures in the run summary and on the
     Files changed tab.
     """
+    report = as_report(results)
     # The tree is grouped, so it is printed group by group rather than in one
     # block: ::group:: and ::endgroup:: have to bracket each section's lines.
-    for group_name, scopes in _grouped(results):
+    for group_name, indices in report.groups:
         print(f"::group::{group_name}")
-        for line in _render_scopes(scopes, include_docs=True):
+        for line in report.listing(indices, include_docs=True):
             print(line)
         print("::endgroup::")
 
-    annotations: list[tuple[str, str]] = []
-    for scope in results:
-        if scope.status == "pass":
-            continue
-        if scope.raw_text and not scope.checks:
-            annotations.append(
-                (f"commit-check: {scope.label}", "output could not be parsed")
-            )
-            continue
-        for check in scope.failures:
-            error = check.get("error", "")
-            first_line = error.splitlines()[0] if error else "check failed"
-            annotations.append((_rule_label(check), f"{scope.label}: {first_line}"))
-
-    for title, message in annotations:
+    for title, message in report.annotations:
         print(
             f"::error title={_annotation_escape(title)}"
             f"::{_annotation_escape(message)}"
         )
 
-    if not annotations:
-        skipped, total = _skip_count(results), len(results)
+    if not report.annotations:
+        skipped, total = report.skipped, report.total
         if total and skipped == total:
             print("\u2298 commit-check: all checks skipped, nothing was validated")
         elif skipped:
@@ -524,41 +3411,134 @@ def render_step_log(results: list[ScopeResult]) -> None:
             print("\u2714 commit-check: all checks passed")
 
 
-def _check_counts(results: list[ScopeResult]) -> tuple[int, int]:
-    """Return ``(failed, total)`` where one check is one thing that was checked.
-
-    A "check" here is a scope \u2014 one commit message, the branch, the author name
-    \u2014 not one rule evaluation. Counting rule evaluations produced a number that
-    grew with the size of the pull request rather than with the strictness of
-    the policy: sixteen commit messages against six enabled rules reported
-    "1 of 100 checks failed", where 96 of the 100 were the same six rules run
-    again per commit. The large denominator also made a real failure look
-    negligible \u2014 one bad commit out of fifteen reads very differently from
-    1 of 100.
-
-    This number matches what the reader can count: the rows in the table plus
-    the \u2714/\u2716 lines in the details block. Which rules failed is not lost, it is
-    just reported where it belongs \u2014 in the table and the details.
+@dataclass
+class Report:
+    """The results, read once for every output surface to render from.
+
+    The step log, the job summary, the PR comment and the ``result`` output
+    show the same statuses, counts, groups and scope listings. Working those
+    out per surface re-evaluated every ``ScopeResult.status`` and rendered the
+    listing once for each; here ``compile_report`` reads each status once and
+    renders each scope's lines once, and a surface only joins the pieces, so
+    another surface costs a join rather than another pass.
     """
-    failed = sum(1 for scope in results if scope.status == "fail")
-    return failed, len(results)
 
+    results: list[ScopeResult]
+    #: ``ScopeResult.status`` of each scope, in order.
+    statuses: list[str]
+    #: Step log groups, with the indices of their scopes.
+    groups: list[tuple[str, list[int]]]
+    #: Each scope's listing as ``(line, docs_only)`` pairs; see _scope_lines.
+    lines: list[list[tuple[str, bool]]]
+    #: ``(title, message)`` of the ``::error`` annotation per failure.
+    annotations: list[tuple[str, str]]
+    status: str
+    failed: int
+    timed_out: int
+    skipped: int
+    #: Of ``skipped``, the checks never started because the run stopped
+    #: starting them (see NOT_STARTED), not because every rule declined.
+    not_started: int = 0
+    #: Of ``skipped``, the checks killed at the failure limit (see CANCELLED).
+    cancelled: int = 0
 
-def _failure_count(results: list[ScopeResult]) -> int:
-    """Number of scopes that failed."""
-    return _check_counts(results)[0]
-
+    @property
+    def total(self) -> int:
+        """Number of checks, against which ``failed`` and the rest are counted.
+
+        A "check" here is a scope — one commit message, the branch, the author
+        name — not one rule evaluation. Counting rule evaluations produced a
+        number that grew with the size of the pull request rather than with
+        the strictness of the policy: sixteen commit messages against six
+        enabled rules reported "1 of 100 checks failed", where 96 of the 100
+        were the same six rules run again per commit. The large denominator
+        also made a real failure look negligible — one bad commit out of
+        fifteen reads very differently from 1 of 100.
+
+        This number matches what the reader can count: the rows in the table
+        plus the ✔/✖ lines in the details block. Which rules failed is not
+        lost, it is just reported where it belongs — in the table and the
+        details.
+        """
+        return len(self.results)
+
+    def listing(self, indices: list[int], include_docs: bool) -> list[str]:
+        """The listing lines of the scopes at ``indices``."""
+        return [
+            line
+            for index in indices
+            for line, docs_only in self.lines[index]
+            if include_docs or not docs_only
+        ]
+
+    def tree(self, include_docs: bool) -> list[str]:
+        """The full grouped listing: a header line per group, then its scopes."""
+        lines: list[str] = []
+        for group_name, indices in self.groups:
+            lines.append(group_name)
+            lines.extend(self.listing(indices, include_docs))
+        return lines
+
+    @functools.cached_property
+    def markdown(self) -> str:
+        """The Markdown report; see render_report."""
+        return _render_markdown(self)
+
+
+def compile_report(results: list[ScopeResult]) -> Report:
+    """Walk the results once and build the Report every surface renders."""
+    statuses = [scope.status for scope in results]
+    # Why each skipped scope was skipped, if the run stopped it.
+    stopped = [
+        scope.reason
+        for scope, status in zip(results, statuses)
+        if status == "skip" and scope.reason
+    ]
+    groups: list[tuple[str, list[int]]] = []
+    annotations: list[tuple[str, str]] = []
+    for index, (scope, status) in enumerate(zip(results, statuses)):
+        group_name = _scope_group(scope.label)
+        if groups and groups[-1][0] == group_name:
+            groups[-1][1].append(index)
+        else:
+            groups.append((group_name, [index]))
+        if status in ("pass", "skip"):
+            continue
+        if status == "timeout":
+            annotations.append((f"commit-check: {scope.label}", scope.reason))
+        elif scope.raw_text and not scope.checks:
+            annotations.append(
+                (f"commit-check: {scope.label}", "output could not be parsed")
+            )
+        else:
+            for check in scope.failures:
+                error = check.get("error", "")
+                first_line = error.splitlines()[0] if error else "check failed"
+                annotations.append((_rule_label(check), f"{scope.label}: {first_line}"))
+    return Report(
+        results=results,
+        statuses=statuses,
+        groups=groups,
+        lines=[_scope_lines(s, status) for s, status in zip(results, statuses)],
+        annotations=annotations,
+        status=reduce_statuses(statuses, BUDGET_EXHAUSTED in stopped),
+        failed=statuses.count("fail"),
+        # A check killed before it finished.
+        timed_out=statuses.count("timeout"),
+        # Checks that never ran, reported separately from the pass count so
+        # the headline cannot claim that checks passed when they were skipped.
+        skipped=statuses.count("skip"),
+        not_started=sum(reason in NOT_STARTED for reason in stopped),
+        cancelled=stopped.count(CANCELLED),
+    )
 
-def _skip_count(results: list[ScopeResult]) -> int:
-    """Number of scopes that never ran.
 
-    Reported separately from the pass count so the headline cannot claim
-    that checks passed when they were skipped.
-    """
-    return sum(1 for scope in results if scope.status == "skip")
+def as_report(results: "list[ScopeResult] | Report") -> Report:
+    """``results`` compiled, unless it already is."""
+    return results if isinstance(results, Report) else compile_report(results)
 
 
-def _markdown_table(results: list[ScopeResult]) -> str:
+def _markdown_table(report: Report) -> str:
     """Render the failure table shared by summary and PR comment.
 
     Only failed scopes appear, so a per-row result column would read ``\u274c`` on
@@ -569,15 +3549,18 @@ def _markdown_table(results: list[ScopeResult]) -> str:
         "| Scope | Checked value | Failed checks |",
         "|---|---|---|",
     ]
-    for scope in results:
+    for scope, status in zip(report.results, report.statuses):
         # Only failures belong in this table. A skipped scope has no failed
         # checks and no checked value, so it contributed an entirely blank
         # row \u2014 an empty accusation in a table headed "Failed checks".
-        if scope.status != "fail":
+        # A timed-out scope does get a row: it still needs someone to act.
+        if status not in ("fail", "timeout"):
             continue
         value = _scope_value(scope)
         value_display = f"`{value}`" if value else "\u2014"
-        if scope.raw_text and not scope.checks:
+        if status == "timeout":
+            links = f"_{scope.reason} \u2014 not validated_"
+        elif scope.raw_text and not scope.checks:
             links = "_output could not be parsed \u2014 see details_"
         else:
             links = " \u00b7 ".join(
@@ -587,7 +3570,7 @@ def _markdown_table(results: list[ScopeResult]) -> str:
     return "\n".join(rows)
 
 
-def _markdown_details(results: list[ScopeResult]) -> str:
+def _markdown_details(report: Report) -> str:
     """Render the collapsible details block listing every scope.
 
     Mirrors the step log layout (group name, ✔/✖ scope lines with the checked
@@ -596,11 +3579,11 @@ def _markdown_details(results: list[ScopeResult]) -> str:
     The same block is used whether or not anything failed — on a clean run the
     failure branches simply never fire.
     """
-    _failed, total = _check_counts(results)
+    total = report.total
     unit = "check" if total == 1 else "checks"
     label = f"Show all {total} {unit}" if total else "Show details"
     lines = ["<details>", f"<summary>{label}</summary>", "", "```text"]
-    lines.extend(_render_tree(results, include_docs=False))
+    lines.extend(report.tree(include_docs=False))
     lines.extend(["```", "", "</details>"])
     return "\n".join(lines)
 
@@ -717,7 +3700,7 @@ def _scope_value(scope: ScopeResult, max_len: int = 60) -> str:
 # - Values are capped at 60 characters with a literal "..." suffix, except on a
 #   failing scope, where the details block prints the value in full — it is the
 #   one value the reader has to act on and the cap can hide the reason.
-# - The step log renders the same tree (_render_scopes); it adds the docs URL,
+# - The step log renders the same tree (Report.tree); it adds the docs URL,
 #   which the Markdown report already carries on the rule ID in the table.
 # ---------------------------------------------------------------------------
 
@@ -743,21 +3726,52 @@ def _report_footer() -> str:
     return f"_commit-check {installed} · {rules}_" if installed else f"_{rules}_"
 
 
-def render_report(results: list[ScopeResult]) -> str:
+def render_report(results: "list[ScopeResult] | Report") -> str:
     """Render the Markdown report shared by the job summary and PR comment.
 
     Opens with the hidden marker and the title, then a one-line verdict —
     ``✅ **All N checks passed**`` or ``❌ **N of M checks failed**`` — then the
     failure table (failures only) and the collapsible per-scope details.
+    Rendered once per Report, however many surfaces show it.
     """
-    failed, total = _check_counts(results)
-    skipped = _skip_count(results)
+    return as_report(results).markdown
+
+
+def _render_markdown(report: Report) -> str:
+    failed, total = report.failed, report.total
+    timed_out = report.timed_out
+    skipped = report.skipped
     unit = "check" if total == 1 else "checks"
 
     lines = [COMMENT_MARKER, REPORT_TITLE, ""]
-    if failed:
-        lines.append(f"❌ **{failed} of {total} {unit} failed**")
-        lines.extend(["", _markdown_table(results), ""])
+    if failed or timed_out or report.status == "timeout":
+        if failed:
+            verdict = f"❌ **{failed} of {total} {unit} failed**"
+            if timed_out:
+                verdict += f", {timed_out} timed out"
+        elif timed_out:
+            verdict = f"⏱ **{timed_out} of {total} {unit} timed out**"
+        else:
+            # Everything that ran passed, but the time budget ran out first:
+            # the rest was never validated, which is no pass.
+            passed = total - skipped
+            verdict = f"⏱ **Time budget exhausted**: {passed} of {total} {unit} passed"
+        # What fail-fast or the budget left unchecked: say so, rather than
+        # let the failure count read as the whole story.
+        if report.not_started:
+            verdict += f", {report.not_started} not started"
+        if report.cancelled:
+            verdict += f", {report.cancelled} cancelled"
+        declined = skipped - report.not_started - report.cancelled
+        if declined:
+            verdict += f", {declined} skipped"
+        elif not failed and not skipped:
+            verdict += " — not validated"
+        lines.append(verdict)
+        if failed or timed_out:
+            lines.extend(["", _markdown_table(report), ""])
+        else:
+            lines.append("")
     elif total and skipped == total:
         # Nothing ran, so there is no success to announce. Saying "all
         # checks passed" here is the defect this branch exists to prevent.
@@ -771,18 +3785,264 @@ def render_report(results: list[ScopeResult]) -> str:
     else:
         lines.append(f"✅ **All {total} {unit} passed**")
         lines.append("")
-    lines.extend([_markdown_details(results), "", _report_footer()])
+    lines.extend([_markdown_details(report), "", _report_footer()])
     return "\n".join(lines)
 
 
-def render_job_summary(results: list[ScopeResult]) -> str:
-    """Create the Markdown body for the GitHub job summary."""
-    return render_report(results)
+#: How action.yml came by the environment, as the job summary words it.
+SETUP_DETAILS = {
+    "cached": "cached environment",
+    "wheelhouse": "installed from the wheelhouse",
+    "fresh": "downloaded, verified and installed",
+}
+
+#: Seconds between the start of setup and main(), and ``SETUP_ENV``;
+#: ``None`` when action.yml did not export the start.
+_setup: tuple[float, str] | None = None
+
+
+def measure_setup() -> tuple[float, str] | None:
+    """Read the setup start action.yml exports, as ``_setup`` holds it."""
+    try:
+        started = float(os.getenv("SETUP_STARTED", ""))
+    except ValueError:
+        return None
+    return max(0.0, time.time() - started), os.getenv("SETUP_ENV", "")
+
+
+def render_job_summary(results: "list[ScopeResult] | Report") -> str:
+    """Create the Markdown body for the GitHub job summary: the report, then
+    how long the action took to set up, when action.yml said when it began,
+    and the performance trend, when ``stats-file`` has one."""
+    sections = [render_report(results)]
+    if _setup is not None:
+        seconds, how = _setup
+        detail = SETUP_DETAILS.get(how, "")
+        sections.append(
+            f"_Setup took {seconds:.0f}s{f' ({detail})' if detail else ''}._"
+        )
+    if _trend:
+        sections.append(_trend)
+    return "\n\n".join(sections)
+
+
+def render_pr_comment(results: "list[ScopeResult] | Report") -> str:
+    """Create the Markdown body for the PR comment: the report, then the
+    hidden state the next run restores its commits from."""
+    report = as_report(results)
+    state = encode_pr_state(report.results, report.statuses)
+    return f"{report.markdown}\n{state}" if state else report.markdown
+
+
+# ---------------------------------------------------------------------------
+# Run statistics
+#
+# With ``stats-file`` set, every run appends one row to a SQLite file that can
+# be carried between runs like ``cache-dir``, and the job summary compares the
+# run with the median of the ones before it. A commit-check upgrade or config
+# change that slows the checks down then shows up next to the run it affected.
+# ---------------------------------------------------------------------------
+
+#: Rows kept in ``stats-file``; older ones are deleted as new ones arrive.
+STATS_KEEP = 500
+
+#: Earlier runs the trend compares against, and how many it needs at least.
+TREND_WINDOW = 20
+TREND_MIN_RUNS = 3
+
+#: A timing this much above the median is flagged in the trend.
+TREND_SLOWER = 1.25
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,
+    version TEXT NOT NULL,
+    config TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    status TEXT NOT NULL,
+    scopes INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    timed_out INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    unique_inputs INTEGER NOT NULL,
+    cache_hits INTEGER NOT NULL,
+    cache_misses INTEGER NOT NULL,
+    setup_seconds REAL,
+    config_seconds REAL NOT NULL,
+    git_seconds REAL NOT NULL,
+    check_seconds REAL NOT NULL
+)
+"""
+
+#: The trend's rows: label, and how to read the value from a run's row.
+TREND_METRICS: list[tuple[str, Callable[[dict[str, Any]], float | None], str]] = [
+    ("Setup", lambda r: r["setup_seconds"], "s"),
+    ("Config", lambda r: r["config_seconds"], "s"),
+    ("Git history", lambda r: r["git_seconds"], "s"),
+    ("Checks", lambda r: r["check_seconds"], "s"),
+    (
+        "Checks per scope",
+        lambda r: r["check_seconds"] * 1000 / r["scopes"] if r["scopes"] else None,
+        "ms",
+    ),
+    (
+        "Cache hit rate",
+        lambda r: (
+            100 * r["cache_hits"] / (r["cache_hits"] + r["cache_misses"])
+            if r["cache_hits"] + r["cache_misses"]
+            else None
+        ),
+        "%",
+    ),
+]
+
+#: The trend section of the last recorded run; ``""`` for none.
+_trend = ""
+
+
+def run_record(report: Report) -> dict[str, Any]:
+    """The ``runs`` row for the run just finished."""
+    cache = _result_cache.stats() if _result_cache is not None else {}
+    phases = _run_stats.phases
+    return {
+        "finished": time.time(),
+        "version": _commit_check_version(),
+        "config": config_fingerprint() or "",
+        "backend": _run_stats.backend,
+        "status": report.status,
+        "scopes": report.total,
+        "failed": report.failed,
+        "timed_out": report.timed_out,
+        "skipped": report.skipped,
+        "unique_inputs": _run_stats.unique_inputs,
+        "cache_hits": cache.get("hits", 0),
+        "cache_misses": cache.get("misses", 0),
+        "setup_seconds": _setup[0] if _setup is not None else None,
+        "config_seconds": phases.get("config", 0.0),
+        "git_seconds": phases.get("git", 0.0),
+        "check_seconds": phases.get("checks", 0.0),
+    }
+
+
+def record_run(record: dict[str, Any], path: str) -> list[dict[str, Any]]:
+    """Append ``record`` to the store at ``path`` and return the runs before
+    it, newest first, at most ``TREND_WINDOW`` of them."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # The timeout is for jobs sharing the file: SQLite locks it while writing.
+    db = sqlite3.connect(path, timeout=10)
+    try:
+        db.row_factory = sqlite3.Row
+        with db:
+            db.execute(STATS_SCHEMA)
+            previous = [
+                dict(row)
+                for row in db.execute(
+                    "SELECT * FROM runs ORDER BY id DESC LIMIT ?", (TREND_WINDOW,)
+                )
+            ]
+            columns = ", ".join(record)
+            placeholders = ", ".join("?" for _ in record)
+            db.execute(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})",
+                list(record.values()),
+            )
+            db.execute(
+                "DELETE FROM runs WHERE id <= (SELECT MAX(id) FROM runs) - ?",
+                (STATS_KEEP,),
+            )
+    finally:
+        db.close()
+    return previous
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _format_metric(value: float, unit: str) -> str:
+    if unit == "s":
+        return f"{value:.1f} s"
+    if unit == "ms":
+        return f"{value:.0f} ms"
+    return f"{value:.0f}%"
+
+
+def render_trend(record: dict[str, Any], previous: list[dict[str, Any]]) -> str:
+    """The job summary's performance trend: this run against the median of
+    ``previous``, plus what changed since the last run that could explain a
+    difference. ``""`` until ``TREND_MIN_RUNS`` runs are on record."""
+    if len(previous) < TREND_MIN_RUNS:
+        return ""
+    rows = [
+        "| | This run | Median | Change |",
+        "|---|---|---|---|",
+    ]
+    for label, read, unit in TREND_METRICS:
+        value = read(record)
+        history = [v for v in (read(run) for run in previous) if v is not None]
+        if value is None or not history:
+            continue
+        median = _median(history)
+        if unit == "%":
+            change = f"{value - median:+.0f} points"
+        elif median:
+            change = f"{(value - median) / median:+.0%}"
+            if value > median * TREND_SLOWER:
+                change = f"⚠️ {change}"
+        else:
+            change = "—"
+        rows.append(
+            f"| {label} | {_format_metric(value, unit)} | "
+            f"{_format_metric(median, unit)} | {change} |"
+        )
+    lines = [
+        "### Performance trend",
+        "",
+        f"Compared with the median of the last {len(previous)} runs:",
+        "",
+        *rows,
+    ]
+    last = previous[0]
+    notes = []
+    if last["version"] != record["version"]:
+        notes.append(
+            f"commit-check changed from {last['version'] or 'unknown'} "
+            f"to {record['version'] or 'unknown'}"
+        )
+    if last["config"] != record["config"]:
+        notes.append("the config changed")
+    if last["backend"] != record["backend"]:
+        notes.append(
+            f"the backend changed from {last['backend']} to {record['backend']}"
+        )
+    if notes:
+        lines.extend(["", f"Since the previous run, {' and '.join(notes)}."])
+    return "\n".join(lines)
+
 
+def record_stats(report: Report) -> None:
+    """Record the run in ``stats-file`` and keep its trend for the job summary.
 
-def render_pr_comment(results: list[ScopeResult]) -> str:
-    """Create the Markdown body for the PR comment (same report as summary)."""
-    return render_report(results)
+    Best effort: an unwritable or corrupt store costs the trend, not the run.
+    """
+    global _trend
+    _trend = ""
+    if not STATS_FILE:
+        return
+    record = run_record(report)
+    try:
+        previous = record_run(record, STATS_FILE)
+    except (OSError, sqlite3.Error) as e:
+        print(f"::warning::Unable to record run statistics in {STATS_FILE}: {e}")
+        return
+    _trend = render_trend(record, previous)
 
 
 # ---------------------------------------------------------------------------
@@ -790,7 +4050,7 @@ def render_pr_comment(results: list[ScopeResult]) -> str:
 # ---------------------------------------------------------------------------
 
 
-def add_job_summary(results: list[ScopeResult]) -> int:
+def add_job_summary(results: "list[ScopeResult] | Report") -> int:
     """Adds the commit check result to the GitHub job summary."""
     if not JOB_SUMMARY_ENABLED or not GITHUB_STEP_SUMMARY:
         return 0
@@ -801,7 +4061,7 @@ def add_job_summary(results: list[ScopeResult]) -> int:
     return exit_code_for(results)
 
 
-def set_result_output(results: list[ScopeResult]) -> None:
+def set_result_output(results: "list[ScopeResult] | Report") -> None:
     """Expose the structured results as the ``result`` action output.
 
     Uses the heredoc form of ``GITHUB_OUTPUT`` so multi-line JSON survives.
@@ -809,13 +4069,18 @@ def set_result_output(results: list[ScopeResult]) -> None:
     output_path = os.getenv("GITHUB_OUTPUT")
     if not output_path:
         return
-    payload = {
-        "status": overall_status(results),
+    report = as_report(results)
+    payload: dict[str, Any] = {
+        "status": report.status,
         "scopes": [
-            {"label": scope.label, "status": scope.status, "checks": scope.checks}
-            for scope in results
+            {"label": scope.label, "status": status, "checks": scope.checks}
+            | ({"reason": scope.reason} if scope.reason else {})
+            | ({"sha": scope.sha} if scope.sha else {})
+            for scope, status in zip(report.results, report.statuses)
         ],
     }
+    if _result_cache is not None:
+        payload["cache"] = _result_cache.stats()
     with open(output_path, "a", encoding="utf-8") as f:
         f.write("result<<EOF\n")
         f.write(json.dumps(payload, indent=2))
@@ -824,20 +4089,7 @@ def set_result_output(results: list[ScopeResult]) -> None:
 
 def is_fork_pr() -> bool:
     """Returns True when the triggering PR originates from a forked repository."""
-    event_path = os.getenv("GITHUB_EVENT_PATH")
-    if not event_path:
-        return False
-    try:
-        with open(event_path, "r", encoding="utf-8") as f:
-            event = json.load(f)
-        pr = event.get("pull_request", {})
-        head_full_name = pr.get("head", {}).get("repo", {}).get("full_name", "")
-        base_full_name = pr.get("base", {}).get("repo", {}).get("full_name", "")
-        return bool(
-            head_full_name and base_full_name and head_full_name != base_full_name
-        )
-    except Exception:
-        return False
+    return run_context().is_fork
 
 
 def is_fork_pr_with_readonly_token() -> bool:
@@ -847,7 +4099,7 @@ def is_fork_pr_with_readonly_token() -> bool:
     Under pull_request_target, GITHUB_TOKEN has the workflow's configured
     permissions regardless of whether the PR is from a fork.
     """
-    return is_fork_pr() and os.getenv("GITHUB_EVENT_NAME", "") != "pull_request_target"
+    return is_fork_pr() and run_context().event_name != "pull_request_target"
 
 
 def get_pr_number() -> int:
@@ -862,18 +4114,11 @@ def get_pr_number() -> int:
     if len(parts) >= 4 and parts[1] == "pull":
         return int(parts[2])
     # Fallback: read PR number from event payload
-    event_path = os.getenv("GITHUB_EVENT_PATH")
-    if event_path:
-        try:
-            with open(event_path, "r", encoding="utf-8") as f:
-                event = json.load(f)
-            number = event.get("number") or (event.get("pull_request", {}) or {}).get(
-                "number"
-            )
-            if number:
-                return int(number)
-        except Exception:
-            pass
+    context = run_context()
+    number = context.event.get("number") or context.pull_request.get("number")
+    with contextlib.suppress(TypeError, ValueError):
+        if number:
+            return int(number)
     raise ValueError(
         "Unable to determine PR number from GITHUB_REF or GITHUB_EVENT_PATH"
     )
@@ -887,6 +4132,206 @@ def _is_bot(comment: Any) -> bool:
         return False
 
 
+#: Wraps the state blob in the PR comment; an HTML comment, so it is not shown.
+STATE_PREFIX = "<!-- commit-check-state "
+STATE_SUFFIX = " -->"
+
+#: Longest blob written. A comment holds 65,536 characters and the report
+#: needs its share; past this the oldest commits are left out, and simply
+#: checked again next time.
+STATE_MAX_CHARS = 32_000
+
+
+def run_signature() -> list[Any]:
+    """What decides which scopes a run has: the enabled checks and the head."""
+    return [build_check_args(), PR_TITLE_ENABLED, get_pr_head_sha()]
+
+
+def _is_checks(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(c, dict) for c in value)
+
+
+def encode_pr_state(
+    results: list[ScopeResult], statuses: list[str] | None = None
+) -> str:
+    """The hidden state for the PR comment: the checks of every scope.
+
+    Commits are stored by SHA (``commits``, with their number in ``total``),
+    everything else by label (``scopes``), alongside ``run_signature()``.
+    JSON, zlib-compressed and base64-encoded (which has no ``--`` to end the
+    HTML comment early), under ``results_namespace()``, so a change of config
+    or commit-check version invalidates all of it. Only real verdicts are
+    kept; a scope that timed out, was not started, had every check skip (an
+    ignored author), or printed something unparseable is checked again.
+    ``""`` when there is nothing to store. ``statuses`` are those of
+    ``results``, when the caller already has them (see Report).
+    """
+    if statuses is None:
+        statuses = [scope.status for scope in results]
+    kept = [
+        scope
+        for scope, status in zip(results, statuses)
+        if scope.checks and status in ("pass", "fail")
+    ]
+    commits = [(scope.sha, scope.checks) for scope in kept if scope.sha]
+    scopes = {scope.label: scope.checks for scope in kept if not scope.sha}
+    total = sum(1 for scope in results if scope.sha)
+    namespace = results_namespace() if kept else None
+    signature = run_signature() if namespace else None
+    while namespace:
+        document = {
+            "key": namespace,
+            "run": signature,
+            "commits": dict(commits),
+            "total": total,
+            "scopes": scopes,
+        }
+        blob = base64.b64encode(
+            zlib.compress(json.dumps(document, separators=(",", ":")).encode(), 9)
+        ).decode("ascii")
+        if len(blob) <= STATE_MAX_CHARS:
+            return f"{STATE_PREFIX}{blob}{STATE_SUFFIX}"
+        if not commits:
+            break
+        commits = commits[max(1, len(commits) // 4) :]
+    return ""
+
+
+def decode_pr_state(body: str) -> dict[str, Any]:
+    """The document ``encode_pr_state`` stored in ``body``.
+
+    ``commits`` and ``scopes`` keep only entries that are lists of checks.
+    Empty when there is no blob, it does not decode, or it was written under
+    a different config or commit-check version.
+    """
+    start = body.find(STATE_PREFIX)
+    if start < 0:
+        return {}
+    start += len(STATE_PREFIX)
+    end = body.find(STATE_SUFFIX, start)
+    try:
+        document = json.loads(zlib.decompress(base64.b64decode(body[start:end])))
+        commits = document["commits"]
+        scopes = document.get("scopes", {})
+        key = document["key"]
+    except Exception:
+        return {}
+    if not isinstance(commits, dict) or not isinstance(scopes, dict):
+        return {}
+    if key != results_namespace():
+        return {}
+    return {
+        "run": document.get("run"),
+        "total": document.get("total"),
+        "commits": {sha: c for sha, c in commits.items() if _is_checks(c)},
+        "scopes": {label: c for label, c in scopes.items() if _is_checks(c)},
+    }
+
+
+#: ``edited`` changes that leave commits, branch and author as they were.
+EDIT_ONLY_FIELDS = frozenset({"title", "body"})
+
+
+def restore_edited_run(
+    state: dict[str, Any], edited: set[str], args: list[str]
+) -> list[ScopeResult] | None:
+    """Every scope of a run for an ``edited`` event, from the previous run.
+
+    Only the PR title is checked, and only if it is what changed; the rest is
+    the state the previous run left in the PR comment. ``None`` when that
+    state cannot stand in for a full run: it is missing, was written for
+    other inputs or another head commit, or lacks a scope this run needs.
+    """
+    signature = run_signature()
+    if not state or state.get("run") != signature or signature[-1] is None:
+        return None
+    commits, scopes = state["commits"], state["scopes"]
+    if len(commits) != state.get("total"):
+        return None
+    results: list[ScopeResult] = []
+    if PR_TITLE_ENABLED:
+        if "title" in edited or "PR title" not in scopes:
+            results.extend(check_pr_title())
+        else:
+            results.append(ScopeResult(label="PR title", checks=scopes["PR title"]))
+    if "--message" in args:
+        if not commits:
+            return None
+        total = len(commits)
+        results.extend(
+            ScopeResult(label=f"Commit {index}/{total}", checks=checks, sha=sha)
+            for index, (sha, checks) in enumerate(commits.items(), start=1)
+        )
+    for flag in args:
+        if flag in CHECK_LABELS:
+            if CHECK_LABELS[flag] not in scopes:
+                return None
+            label = CHECK_LABELS[flag]
+            results.append(ScopeResult(label=label, checks=scopes[label]))
+    return results
+
+
+def _get_pr_issue() -> Any:
+    """The current pull request as a PyGithub issue (for its comments)."""
+    from github import Auth, Github  # type: ignore
+
+    token = os.getenv("GITHUB_TOKEN")
+    repo_name = os.getenv("GITHUB_REPOSITORY")
+    if not token:
+        raise ValueError("GITHUB_TOKEN is not set")
+    if not repo_name:
+        raise ValueError("GITHUB_REPOSITORY is not set")
+    g = Github(auth=Auth.Token(token))
+    return g.get_repo(repo_name).get_issue(get_pr_number())
+
+
+#: Who posts the action's comment under the workflow's ``GITHUB_TOKEN``.
+ACTIONS_BOT = "github-actions[bot]"
+
+
+def _token_login() -> str | None:
+    """The account ``GITHUB_TOKEN`` acts as, when GitHub says (a personal
+    token does; the workflow's own token cannot ask)."""
+    try:
+        from github import Auth, Github  # type: ignore
+
+        return Github(auth=Auth.Token(os.environ["GITHUB_TOKEN"])).get_user().login
+    except Exception:
+        return None
+
+
+def _posted_by_this_action(comment: Any) -> bool:
+    """Whether the token the action runs with posted ``comment``: as
+    ``ACTIONS_BOT``, or as the account a personal token belongs to. Any other
+    bot or app could have been made to post a forged state."""
+    try:
+        login = comment.user.login
+    except Exception:
+        return False
+    return login == ACTIONS_BOT or (bool(login) and login == _token_login())
+
+
+def load_pr_state() -> dict[str, Any]:
+    """The state the action's own PR comment carries (see ``decode_pr_state``).
+
+    Read only when ``pr-comments`` is on, since that is what writes it, and
+    only from a comment this action's token posted: ``COMMENT_MARKER`` is
+    plain text anyone can paste, and a state blob in their comment would
+    otherwise let them mark their own commits as passing. Any failure means
+    no state, and every commit is checked as before.
+    """
+    if not (PR_COMMENTS_ENABLED and is_pr_event()):
+        return {}
+    try:
+        target, _stale = _find_own_comments(run_context().pr_comments)
+    except Exception as e:
+        print(f"::debug::could not read the PR comment state: {e}")
+        return {}
+    if target is None or not _posted_by_this_action(target):
+        return {}
+    return decode_pr_state(target.body)
+
+
 def _find_own_comments(comments: list[Any]) -> tuple[Any | None, list[Any]]:
     """Pick the comment to update and the ones to delete.
 
@@ -905,7 +4350,7 @@ def _find_own_comments(comments: list[Any]) -> tuple[Any | None, list[Any]]:
     return (legacy[-1], []) if legacy else (None, [])
 
 
-def add_pr_comments(results: list[ScopeResult]) -> int:
+def add_pr_comments(results: "list[ScopeResult] | Report") -> int:
     """Posts the commit check result as a comment on the pull request."""
     if not PR_COMMENTS_ENABLED:
         return 0
@@ -918,7 +4363,8 @@ def add_pr_comments(results: list[ScopeResult]) -> int:
             "Skipping PR comment: pull requests from forked repositories "
             "cannot write comments via the pull_request event (GITHUB_TOKEN is "
             "read-only for forks). "
-            "See https://github.com/commit-check/commit-check-action/blob/main/docs/fork-pr-comments.md "
+            "See https://github.com/commit-check/commit-check-action/blob/main/"
+            "docs/fork-pr-comments.md "
             "for how to enable PR comments on fork PRs."
         )
         print(f"::warning::{msg}")
@@ -932,12 +4378,13 @@ def add_pr_comments(results: list[ScopeResult]) -> int:
                     "read-only permissions.\n\n"
                     "> **\U0001f4a1 Tip:** To enable PR comments on fork PRs, see "
                     "[Enabling PR Comments on Fork Pull Requests]"
-                    "(https://github.com/commit-check/commit-check-action/blob/main/docs/fork-pr-comments.md).\n"
+                    "(https://github.com/commit-check/commit-check-action/blob/main/"
+                    "docs/fork-pr-comments.md).\n"
                 )
         return 0
 
     try:
-        from github import Auth, Github, GithubException  # type: ignore
+        from github import GithubException  # type: ignore
     except ImportError as e:
         # Imported here, so it has to be caught here. Leaving it inside the
         # try below would bind GithubException only on success — and an
@@ -948,22 +4395,10 @@ def add_pr_comments(results: list[ScopeResult]) -> int:
         return 0
 
     try:
-        token = os.getenv("GITHUB_TOKEN")
-        repo_name = os.getenv("GITHUB_REPOSITORY")
         pr_number = get_pr_number()
-
-        if not token:
-            raise ValueError("GITHUB_TOKEN is not set")
-        if not repo_name:
-            raise ValueError("GITHUB_REPOSITORY is not set")
-
-        g = Github(auth=Auth.Token(token))
-        repo = g.get_repo(repo_name)
-        pull_request = repo.get_issue(pr_number)
-
+        context = run_context()
         pr_comment_body = render_pr_comment(results)
-
-        target, stale = _find_own_comments(list(pull_request.get_comments()))
+        target, stale = _find_own_comments(context.pr_comments)
 
         if target is not None:
             if target.body == pr_comment_body:
@@ -976,7 +4411,7 @@ def add_pr_comments(results: list[ScopeResult]) -> int:
                 comment.delete()
         else:
             print(f"Creating a new comment on PR #{pr_number}.")
-            pull_request.create_comment(body=pr_comment_body)
+            context.pr_issue.create_comment(body=pr_comment_body)
 
         return exit_code_for(results)
     except GithubException as e:
@@ -1003,32 +4438,57 @@ def add_pr_comments(results: list[ScopeResult]) -> int:
         return 0
 
 
-def log_error_and_exit(ret_code: int, results: list[ScopeResult]) -> None:
+def log_error_and_exit(ret_code: int, results: "list[ScopeResult] | Report") -> None:
     """Logs a summary error to GitHub Actions and exits with the given code."""
-    if ret_code != 0 and results:
-        failures = _failure_count(results)
+    report = as_report(results)
+    if ret_code != 0 and report.results:
+        failures = report.failed
+        timeouts = report.timed_out
         unit = "failure" if failures == 1 else "failures"
-        print(f"::error::commit-check found {failures} {unit}.")
+        if timeouts:
+            print(
+                f"::error::commit-check found {failures} {unit}; "
+                f"{timeouts} timed out."
+            )
+        elif failures or report.status != "timeout":
+            print(f"::error::commit-check found {failures} {unit}.")
+        else:
+            print(
+                "::error::commit-check ran out of its time budget; "
+                f"{report.not_started} not started."
+            )
+    stop_worker_pool()
     sys.exit(ret_code)
 
 
 def main():
     """Main function to run commit-check and render all output surfaces."""
+    global _setup
+    _setup = measure_setup()
     _reconfigure_io()
+    load_inputs()
     log_env_vars()
+    if _setup is not None:
+        print(f"::debug::setup took {_setup[0]:.1f}s ({_setup[1] or 'unknown'})")
 
-    ret_code, results = run_commit_check()
+    with in_run_context():
+        ret_code, results = run_commit_check()
+        report = compile_report(results)
+        record_stats(report)
 
-    render_step_log(results)
-    set_result_output(results)
+        render_step_log(report)
+        set_result_output(report)
 
-    ret_code = max(ret_code, add_job_summary(results), add_pr_comments(results))
+        ret_code = max(ret_code, add_job_summary(report), add_pr_comments(report))
 
     if DRY_RUN_ENABLED:
         ret_code = 0
 
-    log_error_and_exit(ret_code, results)
+    log_error_and_exit(ret_code, report)
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == [WORKER_FLAG]:
+        serve_worker(*sys.argv[2:3])
+    else:
+        main()
@@ -6,9 +6,14 @@ import os
 import sys
 import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, PropertyMock, call, patch
 
 os.environ.setdefault("GITHUB_STEP_SUMMARY", "/tmp/step_summary.txt")
+# Most tests assert on the CLI invocations, so pin the serial CLI backend:
+# otherwise they would pass or fail depending on whether commit-check happens
+# to be importable. The other backends are tested on their own below.
+os.environ.setdefault("BACKEND", "serial")
 
 import main  # noqa: E402
 
@@ -22,6 +27,21 @@ FOOTER = (
 )
 pin_version = patch("main._commit_check_version", new=lambda: PINNED_VERSION)
 
+#: This repo's own commit-check.toml inherits from GitHub, and every test that
+#: runs the whole action would fetch it. They run with the config unflattened;
+#: TestFlattenConfig calls the real function, kept here.
+flatten_config = main.flatten_config
+offline = patch("main.flatten_config", return_value=None)
+
+
+def setUpModule():
+    offline.start()
+
+
+def tearDownModule():
+    offline.stop()
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -54,6 +74,24 @@ def json_output(*checks) -> str:
     return json.dumps({"status": status, "checks": list(checks)})
 
 
+def rev_list(stdout: str) -> MagicMock:
+    """A ``git rev-list`` process, as stream_commits starts it, that printed
+    ``stdout``."""
+    return MagicMock(stdout=io.BytesIO(stdout.encode()), **{"poll.return_value": 0})
+
+
+def fake_objects(**messages: str) -> MagicMock:
+    """A GitObjects that holds a commit with each of ``messages``, by SHA;
+    its walk is ``git rev-list``'s."""
+    objects = MagicMock(
+        **{"read.return_value": None, "walk.side_effect": main.rev_list}
+    )
+    objects.commit.side_effect = lambda sha: (
+        main.GitCommit(sha=sha, message=messages[sha]) if sha in messages else None
+    )
+    return objects
+
+
 def pass_scope(label: str = "Branch", value: str = "") -> main.ScopeResult:
     return main.ScopeResult(label=label, checks=[make_check("branch", value=value)])
 
@@ -157,10 +195,66 @@ class TestBuildCheckArgs(unittest.TestCase):
         self.assertEqual(result, ["--message", "--branch"])
 
 
-class TestParseCommitMessages(unittest.TestCase):
-    def test_splits_messages_and_trims_surrounding_newlines(self):
-        result = main.parse_commit_messages("\nfix: first\n\x00\nfeat: second\n\n\x00")
-        self.assertEqual(result, ["fix: first", "feat: second"])
+class TestEnvInt(unittest.TestCase):
+    def test_integer_value(self):
+        with patch.dict(os.environ, {"MAX_WORKERS": "4"}):
+            self.assertEqual(main.env_int("MAX_WORKERS"), 4)
+
+    def test_blank_uses_default(self):
+        with patch.dict(os.environ, {"MAX_WORKERS": ""}):
+            self.assertEqual(main.env_int("MAX_WORKERS", 3), 3)
+
+    def test_malformed_value_warns_and_uses_default(self):
+        with (
+            patch.dict(os.environ, {"MAX_WORKERS": "many"}),
+            patch("builtins.print") as mock_print,
+        ):
+            self.assertEqual(main.env_int("MAX_WORKERS"), 0)
+        self.assertIn("::warning::", mock_print.call_args[0][0])
+
+
+class TestCheckWorkers(unittest.TestCase):
+    def test_zero_sizes_from_cpu_count(self):
+        with (
+            patch("main.MAX_WORKERS", 0),
+            patch("main.os.cpu_count", return_value=4),
+        ):
+            self.assertEqual(main.check_workers(100), 4)
+
+    def test_input_overrides_cpu_count(self):
+        with (
+            patch("main.MAX_WORKERS", 8),
+            patch("main.os.cpu_count", return_value=2),
+        ):
+            self.assertEqual(main.check_workers(100), 8)
+
+    def test_never_more_workers_than_work(self):
+        with patch("main.MAX_WORKERS", 8):
+            self.assertEqual(main.check_workers(3), 3)
+            self.assertEqual(main.check_workers(0), 1)
+
+
+class TestParseCommitObject(unittest.TestCase):
+    def test_reads_headers_and_message(self):
+        data = (
+            b"tree 4b825dc642cb6eb9a060e54bf8d69288fbee4904\n"
+            b"parent a1\nparent b2\n"
+            b"author A U Thor <author@example.com> 1700000000 +0100\n"
+            b"committer C O Mitter <committer@example.com> 1700000001 +0000\n"
+            b"gpgsig -----BEGIN PGP SIGNATURE-----\n"
+            b" \n abc\n -----END PGP SIGNATURE-----\n"
+            b"\nfix: first\n\nBody line.\n"
+        )
+        commit = main.parse_commit_object("c3", data)
+        self.assertEqual(commit.sha, "c3")
+        self.assertEqual(commit.message, "fix: first\n\nBody line.")
+        self.assertEqual(commit.author, "A U Thor <author@example.com>")
+        self.assertEqual(commit.committer, "C O Mitter <committer@example.com>")
+        self.assertEqual(commit.parents, ["a1", "b2"])
+
+    def test_message_is_decoded_from_its_encoding(self):
+        data = "tree t\nencoding ISO-8859-1\n\nfix: café\n".encode("latin-1")
+        self.assertEqual(main.parse_commit_object("a1", data).message, "fix: café")
 
 
 class TestGetPrTitle(unittest.TestCase):
@@ -259,6 +353,307 @@ class TestRunCheckJson(unittest.TestCase):
         self.assertEqual(raw, "Commit rejected.\n")
 
 
+def _commit_check_importable() -> bool:
+    try:
+        import commit_check  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class TestInProcessEngine(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            "main",
+            BACKEND="auto",
+            _in_process_engine=None,
+            _in_process_failed=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_serial_backend_never_loads_the_engine(self):
+        with (
+            patch("main.BACKEND", "serial"),
+            patch("main.InProcessEngine") as mock_engine,
+            patch("main.subprocess.run", return_value=MagicMock(stdout="{}")),
+        ):
+            main.check_scope("Branch", ["--branch"])
+        mock_engine.assert_not_called()
+
+    def test_engine_is_loaded_once_and_shared(self):
+        with patch("main.InProcessEngine") as mock_engine:
+            first = main.get_in_process_engine()
+            second = main.get_in_process_engine()
+        self.assertIs(first, second)
+        mock_engine.assert_called_once()
+
+    def test_failed_load_is_remembered(self):
+        with (
+            patch("main.InProcessEngine", side_effect=ImportError("no module")),
+            patch("builtins.print"),
+        ):
+            self.assertIsNone(main.get_in_process_engine())
+            self.assertIsNone(main.get_in_process_engine())
+            self.assertEqual(main.InProcessEngine.call_count, 1)
+
+    def test_check_scope_uses_engine_without_spawning_the_cli(self):
+        engine = MagicMock()
+        engine.run.return_value = {"checks": [make_check("message", value="fix: x")]}
+        with (
+            patch("main._in_process_engine", engine),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            scope = main.check_scope("Commit 1/1", ["--message"], input_text="fix: x")
+        self.assertEqual(scope.checks[0]["value"], "fix: x")
+        engine.run.assert_called_once_with(["--message"], input_text="fix: x")
+        mock_run.assert_not_called()
+
+    def test_engine_error_falls_back_to_the_cli(self):
+        engine = MagicMock()
+        engine.run.side_effect = RuntimeError("internal API changed")
+        mock_result = MagicMock(
+            returncode=1, stdout=json_output(make_check("branch", status="fail"))
+        )
+        with (
+            patch("main._in_process_engine", engine),
+            patch("main.subprocess.run", return_value=mock_result) as mock_run,
+            patch("builtins.print"),
+        ):
+            scope = main.check_scope("Branch", ["--branch"])
+        self.assertEqual(scope.status, "fail")
+        mock_run.assert_called_once()
+
+    @unittest.skipUnless(_commit_check_importable(), "commit-check not installed")
+    def test_matches_cli_json_shape(self):
+        data = main.InProcessEngine().run(["--message"], input_text="WIP bad msg")
+        self.assertEqual(data["status"], "fail")
+        self.assertEqual(
+            set(data["checks"][0]),
+            {"rule_id", "check", "status", "value", "error", "suggest", "docs_url"},
+        )
+        failed = [c["check"] for c in data["checks"] if c["status"] == "fail"]
+        self.assertIn("message", failed)
+
+
+class TestCommitCheckPython(unittest.TestCase):
+    def test_interpreter_next_to_the_script(self):
+        with tempfile.TemporaryDirectory() as folder:
+            script = os.path.join(folder, "commit-check")
+            python = os.path.join(folder, "python")
+            for path in (script, python):
+                open(path, "w").close()
+            with patch("main.shutil.which", return_value=script):
+                self.assertEqual(main.commit_check_python(), python)
+
+    def test_interpreter_from_the_shebang(self):
+        with tempfile.TemporaryDirectory() as folder:
+            script = os.path.join(folder, "commit-check")
+            with open(script, "w") as f:
+                f.write(f"#!{sys.executable}\nimport commit_check\n")
+            with patch("main.shutil.which", return_value=script):
+                self.assertEqual(main.commit_check_python(), sys.executable)
+
+    def test_no_cli_on_path(self):
+        with patch("main.shutil.which", return_value=None):
+            self.assertIsNone(main.commit_check_python())
+
+
+@unittest.skipUnless(_commit_check_importable(), "commit-check not installed")
+class TestWorkerPool(unittest.TestCase):
+    """End to end: real workers, this interpreter, this script."""
+
+    def make_pool(self, size: int = 1, max_requests: int = 100) -> main.WorkerPool:
+        pool = main.WorkerPool(sys.executable, size, max_requests=max_requests)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def pids(self, pool: main.WorkerPool) -> list[int]:
+        return [w.process.pid for w in list(pool._idle.queue) if w is not None]
+
+    def test_checks_a_scope(self):
+        pool = self.make_pool()
+        self.assertTrue(pool.alive)
+        data = pool.run(["--message"], "WIP bad msg")
+        self.assertEqual(data["status"], "fail")
+
+    def test_worker_is_recycled_after_max_requests(self):
+        pool = self.make_pool(max_requests=2)
+        first = self.pids(pool)
+        pool.run(["--message"], "feat: one")
+        self.assertEqual(self.pids(pool), first)
+        pool.run(["--message"], "feat: two")
+        self.assertNotEqual(self.pids(pool), first)
+
+    def test_crashed_worker_falls_back_once_and_is_replaced(self):
+        pool = self.make_pool()
+        worker = pool._idle.queue[0]
+        worker.process.kill()
+        worker.process.wait()
+        with patch("builtins.print"):
+            self.assertIsNone(pool.run(["--message"], "feat: x"))
+        self.assertEqual(pool.run(["--message"], "feat: x")["status"], "pass")
+
+    def test_shutdown_ends_every_worker(self):
+        pool = main.WorkerPool(sys.executable, 2)
+        workers = list(pool._idle.queue)
+        pool.shutdown()
+        self.assertTrue(all(w.process.poll() is not None for w in workers))
+
+
+class TestWorkerPoolLifecycle(unittest.TestCase):
+    def test_pool_whose_workers_never_start_sends_everything_to_the_cli(self):
+        with patch("main.Worker") as mock_worker:
+            mock_worker.return_value.wait_ready.return_value = False
+            pool = main.WorkerPool("python", 2)
+        self.assertFalse(pool.alive)
+        self.assertIsNone(pool.run(["--message"], "fix: x"))
+        self.assertIsNone(pool.run(["--message"], "fix: x"))
+
+    def test_only_the_workers_backend_starts_a_pool(self):
+        with (
+            patch.multiple("main", SCOPE_TIMEOUT=0, TIME_BUDGET=0),
+            patch("main.start_worker_pool") as mock_start,
+        ):
+            main.ParallelBackend().start()
+            main.InProcessBackend().start()
+            mock_start.assert_not_called()
+            main.WorkerPoolBackend().start()
+            mock_start.assert_called_once()
+
+    def test_not_started_without_an_interpreter(self):
+        with (
+            patch("main.BACKEND", "auto"),
+            patch("main.commit_check_python", return_value=None),
+            patch("main.WorkerPool") as mock_pool,
+        ):
+            main.start_worker_pool()
+        mock_pool.assert_not_called()
+
+    def test_run_checks_prefers_the_pool_over_the_cli(self):
+        pool = MagicMock()
+        pool.run.return_value = {"checks": [make_check("branch")]}
+        with (
+            patch("main.BACKEND", "workers"),
+            patch("main._worker_pool", pool),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            data, raw = main.run_checks(["--branch"])
+        self.assertEqual(data["checks"][0]["check"], "branch")
+        self.assertEqual(raw, "")
+        mock_run.assert_not_called()
+
+    def test_pool_is_stopped_before_exit(self):
+        pool = MagicMock()
+        with (
+            patch("main._worker_pool", pool),
+            self.assertRaises(SystemExit),
+        ):
+            main.log_error_and_exit(0, [])
+        pool.shutdown.assert_called_once()
+
+
+class TestSelectBackend(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            "main",
+            BACKEND="auto",
+            get_in_process_engine=MagicMock(return_value=None),
+            commit_check_python=MagicMock(return_value=None),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def pick(self, scope_count):
+        backend, reason = main.select_backend(scope_count)
+        self.assertTrue(reason)
+        return backend.name
+
+    def test_input_names_the_backend(self):
+        with patch("main.BACKEND", "workers"):
+            self.assertEqual(self.pick(500), "workers")
+
+    def test_pick_outside_a_run_is_made_once(self):
+        with (
+            patch.multiple("main", _backend=None, _idle_backend=None),
+            patch("main.select_backend", wraps=main.select_backend) as mock_select,
+        ):
+            self.assertIs(main.get_backend(), main.get_backend())
+            mock_select.assert_called_once_with(None)
+            with patch("main.BACKEND", "serial"):
+                self.assertEqual(main.get_backend().name, "serial")
+
+    def test_unknown_input_warns_and_uses_auto(self):
+        with (
+            patch("main.BACKEND", "turbo"),
+            patch("builtins.print") as mock_print,
+        ):
+            self.assertEqual(self.pick(2), "serial")
+        self.assertIn("::warning::", mock_print.call_args[0][0])
+
+    def test_auto_prefers_in_process(self):
+        main.get_in_process_engine.return_value = MagicMock()
+        self.assertEqual(self.pick(500), "in-process")
+
+    def test_auto_runs_a_couple_of_scopes_serially(self):
+        main.commit_check_python.return_value = "/venv/bin/python"
+        self.assertEqual(self.pick(2), "serial")
+
+    def test_auto_uses_workers_when_the_cli_interpreter_is_known(self):
+        main.commit_check_python.return_value = "/venv/bin/python"
+        self.assertEqual(self.pick(500), "workers")
+
+    def test_auto_falls_back_to_a_process_pool(self):
+        self.assertEqual(self.pick(500), "parallel")
+        self.assertEqual(self.pick(None), "parallel")
+
+    def test_run_commit_check_reports_the_choice_and_stops_the_backend(self):
+        backend = MagicMock(spec=main.Backend)
+        backend.name = "workers"
+        with (
+            patch("main.select_backend", return_value=(backend, "because")),
+            patch("main.MESSAGE_ENABLED", False),
+            patch("main.PR_TITLE_ENABLED", False),
+            patch("main.run_other_checks", return_value=[pass_scope()]),
+            patch("builtins.print") as mock_print,
+        ):
+            main.run_commit_check()
+        printed = [c[0][0] for c in mock_print.call_args_list]
+        self.assertIn("::debug::backend=workers (because)", printed)
+        backend.start.assert_called_once()
+        backend.stop.assert_called_once()
+        self.assertIsNone(main._backend)
+
+
+class TestEstimateScopeCount(unittest.TestCase):
+    def test_counts_title_commits_and_other_flags(self):
+        with (
+            patch("main.PR_TITLE_ENABLED", True),
+            patch("main.is_pr_event", return_value=True),
+            patch("main.get_pr_commit_count", return_value=30),
+        ):
+            count = main.estimate_scope_count(["--message", "--branch"])
+        self.assertEqual(count, 32)
+
+    def test_unknown_commit_count_is_unknown(self):
+        with (
+            patch("main.is_pr_event", return_value=True),
+            patch("main.get_pr_commit_count", return_value=None),
+        ):
+            self.assertIsNone(main.estimate_scope_count(["--message"]))
+
+    def test_outside_a_pr_the_message_is_one_scope(self):
+        with patch("main.is_pr_event", return_value=False):
+            self.assertEqual(main.estimate_scope_count(["--message", "--branch"]), 2)
+
+    def test_commit_count_is_read_from_the_payload(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            json.dump({"pull_request": {"commits": 7}}, f)
+        self.addCleanup(os.unlink, f.name)
+        with patch.dict(os.environ, {"GITHUB_EVENT_PATH": f.name}):
+            self.assertEqual(main.get_pr_commit_count(), 7)
+
+
 class TestScopeResult(unittest.TestCase):
     def test_status_pass_when_all_checks_pass(self):
         scope = main.ScopeResult(
@@ -328,21 +723,57 @@ class TestRunPrMessageChecks(unittest.TestCase):
         self.assertEqual(len(scopes[0].failures), 1)
 
     def test_labels_commits_in_order(self):
-        results = [
-            MagicMock(returncode=0, stdout=json_output(make_check("message"))),
-            MagicMock(
-                returncode=1,
-                stdout=json_output(make_check("message", status="fail")),
-            ),
-            MagicMock(returncode=0, stdout=json_output(make_check("message"))),
-        ]
-        with patch("main.subprocess.run", side_effect=results):
+        # Keyed on the input rather than on call order: the checks run
+        # concurrently, so the order the CLI is invoked in is not fixed.
+        def fake_run(command, input=None, **kwargs):
+            status = "fail" if input == "bad" else "pass"
+            return MagicMock(
+                returncode=int(status == "fail"),
+                stdout=json_output(make_check("message", status=status)),
+            )
+
+        with patch("main.subprocess.run", side_effect=fake_run):
             scopes = main.run_pr_message_checks(["ok", "bad", "ok"])
         self.assertEqual(
             [s.label for s in scopes], ["Commit 1/3", "Commit 2/3", "Commit 3/3"]
         )
         self.assertEqual(scopes[1].status, "fail")
 
+    def test_results_keep_commit_order_when_checks_finish_out_of_order(self):
+        import time
+
+        def fake_run(command, input=None, **kwargs):
+            # The first commit finishes last.
+            time.sleep(0.05 if input == "msg 1" else 0)
+            return MagicMock(
+                returncode=0,
+                stdout=json_output(make_check("message", value=input)),
+            )
+
+        messages = [f"msg {i}" for i in range(1, 6)]
+        with (
+            patch("main.BACKEND", "parallel"),
+            patch("main.MAX_WORKERS", 5),
+            patch("main.subprocess.run", side_effect=fake_run),
+        ):
+            scopes = main.run_pr_message_checks(messages)
+        self.assertEqual(
+            [(s.label, s.checks[0]["value"]) for s in scopes],
+            [(f"Commit {i}/5", f"msg {i}") for i in range(1, 6)],
+        )
+
+    def test_single_worker_runs_serially_without_a_pool(self):
+        mock_result = MagicMock(returncode=0, stdout=json_output(make_check("message")))
+        with (
+            patch("main.MAX_WORKERS", 1),
+            patch("main.subprocess.run", return_value=mock_result) as mock_run,
+            patch("main.ThreadPoolExecutor") as mock_pool,
+        ):
+            scopes = main.run_pr_message_checks(["fix: a", "fix: b"])
+        self.assertEqual(len(scopes), 2)
+        self.assertEqual(mock_run.call_count, 2)
+        mock_pool.assert_not_called()
+
     def test_empty_list(self):
         with patch("main.subprocess.run") as mock_run:
             scopes = main.run_pr_message_checks([])
@@ -357,8 +788,42 @@ class TestRunOtherChecks(unittest.TestCase):
         self.assertEqual(scopes, [])
         mock_run.assert_not_called()
 
-    def test_runs_each_flag_as_its_own_scope(self):
+    def test_runs_all_flags_in_one_call_and_splits_by_check(self):
+        combined = MagicMock(
+            returncode=1,
+            stdout=json_output(
+                make_check("branch", status="fail"),
+                make_check("merge_base"),
+                make_check("author_name", value="Jane Doe"),
+            ),
+        )
+        with patch("main.subprocess.run", return_value=combined) as mock_run:
+            scopes = main.run_other_checks(["--branch", "--author-name"])
+        mock_run.assert_called_once()
+        self.assertEqual(
+            mock_run.call_args[0][0],
+            ["commit-check", "--format", "json", "--branch", "--author-name"],
+        )
+        self.assertEqual([s.label for s in scopes], ["Branch", "Author name"])
+        self.assertEqual(scopes[0].status, "fail")
+        self.assertEqual(
+            [c["check"] for c in scopes[0].checks], ["branch", "merge_base"]
+        )
+        self.assertEqual(scopes[1].status, "pass")
+        self.assertEqual(scopes[1].checks[0]["value"], "Jane Doe")
+
+    def test_single_flag_is_its_own_call(self):
+        result = MagicMock(returncode=0, stdout=json_output(make_check("branch")))
+        with patch("main.subprocess.run", return_value=result) as mock_run:
+            scopes = main.run_other_checks(["--branch"])
+        self.assertEqual([s.label for s in scopes], ["Branch"])
+        self.assertEqual(
+            mock_run.call_args[0][0], ["commit-check", "--format", "json", "--branch"]
+        )
+
+    def test_unparseable_combined_output_runs_each_flag_on_its_own(self):
         results = [
+            MagicMock(returncode=1, stdout="Error: bad config"),
             MagicMock(
                 returncode=1, stdout=json_output(make_check("branch", status="fail"))
             ),
@@ -366,18 +831,28 @@ class TestRunOtherChecks(unittest.TestCase):
         ]
         with patch("main.subprocess.run", side_effect=results) as mock_run:
             scopes = main.run_other_checks(["--branch", "--author-name"])
+        self.assertEqual(mock_run.call_count, 3)
         self.assertEqual([s.label for s in scopes], ["Branch", "Author name"])
-        self.assertEqual(scopes[0].status, "fail")
-        self.assertEqual(scopes[1].status, "pass")
-        self.assertEqual(
-            mock_run.call_args_list[0][0][0],
-            ["commit-check", "--format", "json", "--branch"],
-        )
+        self.assertEqual([s.status for s in scopes], ["fail", "pass"])
         self.assertEqual(
             mock_run.call_args_list[1][0][0],
-            ["commit-check", "--format", "json", "--author-name"],
+            ["commit-check", "--format", "json", "--branch"],
         )
 
+    def test_unknown_check_name_runs_each_flag_on_its_own(self):
+        results = [
+            MagicMock(
+                returncode=0,
+                stdout=json_output(make_check("branch"), make_check("new_rule")),
+            ),
+            MagicMock(returncode=0, stdout=json_output(make_check("branch"))),
+            MagicMock(returncode=0, stdout=json_output(make_check("author_email"))),
+        ]
+        with patch("main.subprocess.run", side_effect=results) as mock_run:
+            scopes = main.run_other_checks(["--branch", "--author-email"])
+        self.assertEqual(mock_run.call_count, 3)
+        self.assertEqual([s.label for s in scopes], ["Branch", "Author email"])
+
     def test_unknown_flag_is_skipped(self):
         with patch("main.subprocess.run") as mock_run:
             scopes = main.run_other_checks(["--unknown"])
@@ -385,92 +860,231 @@ class TestRunOtherChecks(unittest.TestCase):
         mock_run.assert_not_called()
 
 
-class TestGetPrCommitMessages(unittest.TestCase):
+class TestGetPrCommits(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("main.git_objects")
+        self.objects = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
     def test_non_pr_event_returns_empty(self):
         with patch.dict(os.environ, {"GITHUB_EVENT_NAME": "push"}):
-            result = main.get_pr_commit_messages()
+            result = list(main.get_pr_commits())
         self.assertEqual(result, [])
 
-    def test_merge_ref_is_preferred(self):
+    def test_lists_the_resolved_range(self):
+        for event in ("pull_request", "pull_request_target"):
+            with (
+                self.subTest(event=event),
+                patch.dict(os.environ, {"GITHUB_EVENT_NAME": event}),
+                patch("main.pr_commit_range", return_value="a0..b2"),
+                patch(
+                    "main.stream_commits",
+                    return_value=iter([("a1", "fix: first"), ("b2", "feat: second")]),
+                ) as mock_stream,
+            ):
+                result = list(main.get_pr_commits())
+            self.assertEqual(result, [("a1", "fix: first"), ("b2", "feat: second")])
+            mock_stream.assert_called_once_with("a0..b2", self.objects, [])
+
+    def test_nothing_to_compare_returns_empty(self):
         with (
             patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request"}),
-            patch(
-                "main.get_messages_from_merge_ref",
-                return_value=["fix: first", "feat: second"],
-            ) as mock_merge,
-            patch("main.get_messages_from_head_ref") as mock_head,
+            patch("main.pr_commit_range", return_value=None),
+            patch("main.stream_commits") as mock_stream,
         ):
-            result = main.get_pr_commit_messages()
-        self.assertEqual(result, ["fix: first", "feat: second"])
-        mock_merge.assert_called_once()
-        mock_head.assert_not_called()
+            result = list(main.get_pr_commits())
+        self.assertEqual(result, [])
+        mock_stream.assert_not_called()
 
-    def test_pull_request_target_is_supported(self):
+    def test_exception_returns_empty(self):
         with (
-            patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request_target"}),
-            patch("main.get_messages_from_merge_ref", return_value=["fix: first"]),
+            patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request"}),
+            patch("main.pr_commit_range", side_effect=Exception("git failed")),
         ):
-            result = main.get_pr_commit_messages()
-        self.assertEqual(result, ["fix: first"])
+            result = list(main.get_pr_commits())
+        self.assertEqual(result, [])
+
+
+class TestGitMessageReaders(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(main.close_git_objects)
+
+    def git(self, *args: str) -> str:
+        return main.subprocess.run(
+            ["git", *args], capture_output=True, encoding="utf-8", check=True
+        ).stdout.strip()
+
+    def make_repo(self) -> tuple[str, str]:
+        """A PR of two commits checked out as GitHub's merge commit; returns
+        the base and PR tips."""
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, cwd)
+        self.git("init", "--quiet", "--initial-branch=main")
+        self.git("config", "user.name", "Tester")
+        self.git("config", "user.email", "tester@example.com")
+        self.git("commit", "--quiet", "--allow-empty", "-m", "chore: root")
+        self.git("checkout", "--quiet", "-b", "pr")
+        for subject in ("fix: first", "feat: second"):
+            self.git("commit", "--quiet", "--allow-empty", "-m", subject)
+        self.git("checkout", "--quiet", "main")
+        self.git("commit", "--quiet", "--allow-empty", "-m", "chore: base")
+        self.git("update-ref", "refs/remotes/origin/main", "main")
+        self.git("checkout", "--quiet", "--detach")
+        self.git("merge", "--quiet", "--no-ff", "-m", "Merge", "pr")
+        return self.git("rev-parse", "main"), self.git("rev-parse", "pr")
+
+    def messages(self, revisions: str) -> list[str]:
+        return [msg for _sha, msg in main.stream_commits(revisions, main.git_objects())]
+
+    def test_merge_ref_is_preferred(self):
+        base, head = self.make_repo()
+        revisions = main.pr_commit_range(main.git_objects())
+        self.assertEqual(revisions, f"{base}..{head}")
+        self.assertEqual(self.messages(revisions), ["fix: first", "feat: second"])
 
     def test_falls_back_to_base_ref_when_merge_ref_is_unavailable(self):
+        base, head = self.make_repo()
+        self.git("checkout", "--quiet", "pr")
+        with patch.dict(os.environ, {"GITHUB_BASE_REF": "main"}):
+            revisions = main.pr_commit_range(main.git_objects())
+        self.assertEqual(revisions, f"{base}..{head}")
+        with patch.dict(os.environ, {"GITHUB_BASE_REF": ""}):
+            self.assertIsNone(main.pr_commit_range(main.git_objects()))
+
+    def test_payload_shas_are_preferred(self):
+        base, head = self.make_repo()
+        # A custom checkout: neither the merge ref nor origin/<base> helps.
+        self.git("checkout", "--quiet", "main")
         with (
-            patch.dict(
-                os.environ,
-                {
-                    "GITHUB_EVENT_NAME": "pull_request",
-                    "GITHUB_BASE_REF": "main",
-                },
-            ),
-            patch("main.get_messages_from_merge_ref", return_value=[]),
-            patch(
-                "main.get_messages_from_head_ref",
-                return_value=["fix: first", "feat: second"],
-            ) as mock_head,
+            patch("main.get_pr_base_sha", return_value=base),
+            patch("main.get_pr_head_sha", return_value=head),
         ):
-            result = main.get_pr_commit_messages()
-        self.assertEqual(result, ["fix: first", "feat: second"])
-        mock_head.assert_called_once_with("main")
+            revisions = main.pr_commit_range(main.git_objects())
+        self.assertEqual(revisions, f"{base}..{head}")
+        self.assertEqual(self.messages(revisions), ["fix: first", "feat: second"])
 
-    def test_exception_returns_empty(self):
+    def test_payload_shas_missing_locally_fall_back_to_the_guess(self):
+        base, head = self.make_repo()
         with (
-            patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request"}),
-            patch(
-                "main.get_messages_from_merge_ref", side_effect=Exception("git failed")
-            ),
+            patch("main.get_pr_base_sha", return_value="0" * 40),
+            patch("main.get_pr_head_sha", return_value=head),
+            patch("sys.stdout", new_callable=io.StringIO),
         ):
-            result = main.get_pr_commit_messages()
-        self.assertEqual(result, [])
-
+            revisions = main.pr_commit_range(main.git_objects())
+        self.assertEqual(revisions, f"{base}..{head}")
 
-class TestGitMessageReaders(unittest.TestCase):
-    def test_get_messages_from_merge_ref(self):
-        mock_result = MagicMock(
-            returncode=0, stdout="fix: first\n\x00feat: second\n\x00"
+    def test_commit_count_is_checked_against_the_payload(self):
+        self.make_repo()
+        for count, warned in ((2, False), (3, True), (None, False)):
+            with (
+                self.subTest(count=count),
+                patch("main.get_pr_commit_count", return_value=count),
+                patch("sys.stderr", new_callable=io.StringIO) as stderr,
+            ):
+                self.assertEqual(len(list(main.iter_pr_commits())), 2)
+            self.assertEqual("but the pull request has 3" in stderr.getvalue(), warned)
+
+    def test_commits_without_a_message_count_towards_the_payload(self):
+        base, _head = self.make_repo()
+        self.git("checkout", "--quiet", "pr")
+        self.git(
+            "commit", "--quiet", "--allow-empty", "--allow-empty-message", "-m", ""
         )
-        with patch("main.subprocess.run", return_value=mock_result) as mock_run:
-            result = main.get_messages_from_merge_ref()
-        self.assertEqual(result, ["fix: first", "feat: second"])
+        head = self.git("rev-parse", "HEAD")
+        with (
+            patch("main.pr_commit_range", return_value=f"{base}..{head}"),
+            patch("main.get_pr_commit_count", return_value=3),
+            patch("sys.stderr", new_callable=io.StringIO) as stderr,
+        ):
+            self.assertEqual(len(list(main.iter_pr_commits())), 2)
+        self.assertEqual(stderr.getvalue(), "")
+
+    def test_one_object_reader_serves_the_run(self):
+        self.make_repo()
+        popen = main.subprocess.Popen
+        with (
+            patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request"}),
+            patch("main.subprocess.Popen", side_effect=popen) as mock_popen,
+        ):
+            commits = list(main.iter_pr_commits())
+        self.assertEqual(len(commits), 2)
         self.assertEqual(
-            mock_run.call_args[0][0],
-            ["git", "log", "--pretty=format:%B%x00", "--reverse", "HEAD^1..HEAD^2"],
+            [c[0][0][:2] for c in mock_popen.call_args_list],
+            [["git", "cat-file"], ["git", "rev-list"]],
         )
 
-    def test_get_messages_from_head_ref(self):
-        mock_result = MagicMock(returncode=0, stdout="fix: first\n\x00")
-        with patch("main.subprocess.run", return_value=mock_result) as mock_run:
-            result = main.get_messages_from_head_ref("main")
-        self.assertEqual(result, ["fix: first"])
+    def test_object_reader(self):
+        base, _head = self.make_repo()
+        objects = main.git_objects()
+        self.assertIsNone(objects.read("no-such-ref"))
+        self.assertIsNone(objects.commit(self.git("rev-parse", "HEAD^{tree}")))
+        commit = objects.commit(base)
+        self.assertEqual(commit.message, "chore: base")
+        self.assertEqual(commit.author, "Tester <tester@example.com>")
+        self.assertEqual(commit.parents, [self.git("rev-parse", "main^")])
+        self.assertEqual(objects.resolve("HEAD^1"), base)
+
+    def test_records_are_reassembled_across_chunks(self):
+        shas = {"a" * 40: "fix: first", "b" * 40: "fix: second"}
+        process = rev_list("".join(f"{sha}\n" for sha in shas))
+        with (
+            patch("main.LOG_CHUNK_SIZE", 7),
+            patch("main.subprocess.Popen", return_value=process) as mock_popen,
+        ):
+            result = list(main.stream_commits("a..b", fake_objects(**shas)))
+        self.assertEqual(result, list(shas.items()))
         self.assertEqual(
-            mock_run.call_args[0][0],
-            [
-                "git",
-                "log",
-                "--pretty=format:%B%x00",
-                "--reverse",
-                "origin/main..HEAD",
-            ],
+            mock_popen.call_args[0][0], ["git", "rev-list", "--reverse", "a..b"]
         )
+        process.wait.assert_called_once()
+
+    def test_commits_are_handed_on_before_git_finishes(self):
+        read, write = os.pipe()
+        stdout = os.fdopen(read, "rb", buffering=0)
+        self.addCleanup(stdout.close)
+        process = MagicMock(stdout=stdout, **{"poll.return_value": 0})
+        objects = fake_objects(a1="fix: first", b2="fix: second")
+        with patch("main.subprocess.Popen", return_value=process):
+            commits = main.stream_commits("a..b", objects)
+            os.write(write, b"a1\nb")
+            # The first SHA is whole; git has not even finished the second.
+            self.assertEqual(next(commits), ("a1", "fix: first"))
+            os.write(write, b"2\n")
+            os.close(write)
+            self.assertEqual(list(commits), [("b2", "fix: second")])
+
+    def test_git_is_stopped_when_the_reader_stops(self):
+        process = rev_list("a1\nb2\n")
+        process.poll.return_value = None
+        objects = fake_objects(a1="fix: first", b2="fix: second")
+        with patch("main.subprocess.Popen", return_value=process):
+            commits = main.stream_commits("a..b", objects)
+            next(commits)
+            commits.close()
+        process.kill.assert_called_once()
+        process.wait.assert_called_once()
+
+    def test_pr_commits_are_read_ahead_on_a_thread(self):
+        started = main.threading.Event()
+        release = main.threading.Event()
+
+        def reader():
+            started.set()
+            yield ("a1", "fix: first")
+            self.assertTrue(release.wait(timeout=5))
+            yield ("b2", "fix: second")
+
+        with (
+            patch.dict(os.environ, {"GITHUB_EVENT_NAME": "pull_request"}),
+            patch("main.iter_pr_commits", side_effect=reader),
+        ):
+            commits = main.get_pr_commits()
+            # Returned before git printed anything, and already running.
+            self.assertTrue(started.wait(timeout=5))
+            self.assertEqual(next(commits), ("a1", "fix: first"))
+            release.set()
+            self.assertEqual(list(commits), [("b2", "fix: second")])
 
 
 class TestRunCommitCheck(unittest.TestCase):
@@ -480,13 +1094,13 @@ class TestRunCommitCheck(unittest.TestCase):
             patch("main.BRANCH_ENABLED", False),
             patch("main.AUTHOR_NAME_ENABLED", False),
             patch("main.AUTHOR_EMAIL_ENABLED", False),
-            patch("main.get_pr_commit_messages", return_value=["fix: something"]),
+            patch("main.get_pr_commits", return_value=[("a1", "fix: something")]),
             patch("main.run_pr_message_checks", return_value=[pass_scope()]) as mock_pr,
             patch("main.run_other_checks", return_value=[]),
         ):
             rc, results = main.run_commit_check()
         self.assertEqual(rc, 0)
-        mock_pr.assert_called_once_with(["fix: something"])
+        mock_pr.assert_called_once_with(["fix: something"], {}, set())
         self.assertEqual(len(results), 1)
 
     def test_pr_path_fails_when_any_scope_fails(self):
@@ -495,7 +1109,7 @@ class TestRunCommitCheck(unittest.TestCase):
             patch("main.BRANCH_ENABLED", True),
             patch("main.AUTHOR_NAME_ENABLED", False),
             patch("main.AUTHOR_EMAIL_ENABLED", False),
-            patch("main.get_pr_commit_messages", return_value=["bad msg"]),
+            patch("main.get_pr_commits", return_value=[("a1", "bad msg")]),
             patch("main.run_pr_message_checks", return_value=[fail_scope()]),
             patch("main.run_other_checks", return_value=[pass_scope()]),
         ):
@@ -559,7 +1173,7 @@ class TestRunCommitCheck(unittest.TestCase):
             patch("main.BRANCH_ENABLED", False),
             patch("main.AUTHOR_NAME_ENABLED", False),
             patch("main.AUTHOR_EMAIL_ENABLED", False),
-            patch("main.get_pr_commit_messages", return_value=[]),
+            patch("main.get_pr_commits", return_value=[]),
             patch("main.run_pr_message_checks") as mock_pr,
             patch(
                 "main.check_scope", return_value=pass_scope("Commit message")
@@ -583,7 +1197,7 @@ class TestRunCommitCheck(unittest.TestCase):
             patch("main.BRANCH_ENABLED", True),
             patch("main.AUTHOR_NAME_ENABLED", False),
             patch("main.AUTHOR_EMAIL_ENABLED", False),
-            patch("main.get_pr_commit_messages", return_value=["fix: x"]),
+            patch("main.get_pr_commits", return_value=[("a1", "fix: x")]),
             patch("main.run_pr_message_checks", return_value=[pass_scope()]),
             patch("main.run_other_checks", side_effect=fake_other_checks),
         ):
@@ -592,6 +1206,68 @@ class TestRunCommitCheck(unittest.TestCase):
         self.assertIn("--branch", captured_args)
 
 
+class TestRunCommitCheckConcurrency(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            "main",
+            PR_TITLE_ENABLED=True,
+            MESSAGE_ENABLED=True,
+            BRANCH_ENABLED=True,
+            AUTHOR_NAME_ENABLED=False,
+            AUTHOR_EMAIL_ENABLED=False,
+            is_pr_event=MagicMock(return_value=True),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stages_overlap_with_reading_git_history(self):
+        import threading
+
+        others_started = threading.Event()
+
+        def slow_git():
+            # Only returns once the branch check is already running, which
+            # would deadlock (and time out) if the stages ran one by one.
+            self.assertTrue(others_started.wait(timeout=5))
+            return [("a1", "fix: a")]
+
+        def other_checks(args):
+            others_started.set()
+            return [pass_scope("Branch")]
+
+        with (
+            patch("main.get_pr_commits", side_effect=slow_git),
+            patch("main.check_pr_title", return_value=[pass_scope("PR title")]),
+            patch("main.run_pr_message_checks", return_value=[fail_scope()]),
+            patch("main.run_other_checks", side_effect=other_checks),
+        ):
+            rc, results = main.run_commit_check()
+        self.assertEqual(rc, 1)
+        self.assertEqual(
+            [r.label for r in results], ["PR title", "Commit 1/1", "Branch"]
+        )
+
+    def test_report_order_does_not_depend_on_completion_order(self):
+        import time
+
+        def slow_title():
+            time.sleep(0.05)
+            return [pass_scope("PR title")]
+
+        with (
+            patch("main.get_pr_commits", return_value=[("a1", "fix: a")]),
+            patch("main.check_pr_title", side_effect=slow_title),
+            patch(
+                "main.run_pr_message_checks", return_value=[pass_scope("Commit 1/1")]
+            ),
+            patch("main.run_other_checks", return_value=[pass_scope("Branch")]),
+        ):
+            _rc, results = main.run_commit_check()
+        self.assertEqual(
+            [r.label for r in results], ["PR title", "Commit 1/1", "Branch"]
+        )
+
+
 class TestRenderStepLog(unittest.TestCase):
     def _run(self, results):
         buffer = io.StringIO()
@@ -886,14 +1562,15 @@ class TestRenderPrComment(unittest.TestCase):
     def test_all_pass_matches_job_summary(self):
         comment = main.render_pr_comment([pass_scope("Branch")])
         summary = main.render_job_summary([pass_scope("Branch")])
-        self.assertEqual(comment, summary)
+        # The same report; only the hidden state follows it.
+        self.assertEqual(comment.split(f"\n{main.STATE_PREFIX}")[0], summary)
         self.assertTrue(comment.startswith(main.COMMENT_MARKER))
         self.assertIn("✅ **All 1 check passed**", comment)
 
     def test_failure_matches_job_summary(self):
         comment = main.render_pr_comment([fail_scope("Commit 1/1")])
         summary = main.render_job_summary([fail_scope("Commit 1/1")])
-        self.assertEqual(comment, summary)
+        self.assertEqual(comment.split(f"\n{main.STATE_PREFIX}")[0], summary)
         self.assertTrue(comment.startswith(main.COMMENT_MARKER))
         self.assertIn("❌ **1 of 1 check failed**", comment)
         self.assertIn("| Scope | Checked value | Failed checks |", comment)
@@ -1250,6 +1927,75 @@ class TestIsForkPr(unittest.TestCase):
         os.unlink(event_path)
 
 
+class TestRunContext(unittest.TestCase):
+    def setUp(self):
+        event = {
+            "number": 7,
+            "pull_request": {
+                "title": "feat: x",
+                "commits": 3,
+                "head": {"sha": "h1", "repo": {"full_name": "fork/repo"}},
+                "base": {"repo": {"full_name": "owner/repo"}},
+            },
+        }
+        event_path = os.path.join(tempfile.mkdtemp(), "event.json")
+        with open(event_path, "w", encoding="utf-8") as f:
+            json.dump(event, f)
+        env = patch.dict(
+            os.environ,
+            {
+                "GITHUB_EVENT_NAME": "pull_request",
+                "GITHUB_EVENT_PATH": event_path,
+                "GITHUB_REF": "refs/heads/feature",
+            },
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_payload_is_parsed_once_per_run(self):
+        with (
+            patch("main.json.load", wraps=json.load) as mock_load,
+            main.in_run_context(),
+        ):
+            self.assertEqual(main.get_pr_title(), "feat: x")
+            self.assertEqual(main.get_pr_commit_count(), 3)
+            self.assertEqual(main.get_pr_head_sha(), "h1")
+            self.assertTrue(main.is_fork_pr())
+            self.assertEqual(main.get_pr_number(), 7)
+        mock_load.assert_called_once()
+
+    def test_null_payload_objects_are_tolerated(self):
+        # What GitHub sends once the head fork was deleted.
+        event = {"pull_request": {"head": {"repo": None}, "base": None}}
+        with open(os.environ["GITHUB_EVENT_PATH"], "w", encoding="utf-8") as f:
+            json.dump(event, f)
+        self.assertFalse(main.is_fork_pr())
+        self.assertIsNone(main.get_pr_head_sha())
+        self.assertIsNone(main.get_pr_base_sha())
+
+    def test_nested_runs_share_the_outer_context(self):
+        with main.in_run_context() as outer, main.in_run_context() as inner:
+            self.assertIs(inner, outer)
+            self.assertIs(main.run_context(), outer)
+        self.assertIsNone(main._context)
+
+    def test_outside_a_run_the_payload_is_read_afresh(self):
+        self.assertIsNot(main.run_context(), main.run_context())
+
+
+class TestLoadInputs(unittest.TestCase):
+    def test_inputs_are_read_again(self):
+        self.addCleanup(main.load_inputs)
+        with patch.dict(os.environ, {"MESSAGE": "false", "MAX_FAILURES": "3"}):
+            main.load_inputs()
+            self.assertFalse(main.MESSAGE_ENABLED)
+            self.assertEqual(main.MAX_FAILURES, 3)
+        with patch.dict(os.environ, {"MESSAGE": "true", "MAX_FAILURES": "0"}):
+            main.load_inputs()
+            self.assertTrue(main.MESSAGE_ENABLED)
+            self.assertEqual(main.MAX_FAILURES, 0)
+
+
 class TestLogErrorAndExit(unittest.TestCase):
     def test_exits_with_specified_code(self):
         with self.assertRaises(SystemExit) as ctx:
@@ -1266,9 +2012,134 @@ class TestLogErrorAndExit(unittest.TestCase):
         self.assertIn("::error::commit-check found 1 failure.", printed)
 
 
+class TestReport(unittest.TestCase):
+    def test_every_surface_renders_from_one_pass(self):
+        results = [pass_scope(), fail_scope("Commit 1/1"), skip_scope("PR title")]
+        with patch.object(
+            main.ScopeResult,
+            "status",
+            new_callable=PropertyMock,
+            side_effect=["pass", "fail", "skip"],
+        ) as status:
+            report = main.compile_report(results)
+            with (
+                patch("sys.stdout", io.StringIO()),
+                patch.dict(os.environ, {"GITHUB_OUTPUT": os.devnull}),
+            ):
+                main.render_step_log(report)
+                main.set_result_output(report)
+                main.render_job_summary(report)
+                main.render_pr_comment(report)
+        self.assertEqual(status.call_count, len(results))
+        self.assertEqual((report.failed, report.skipped, report.total), (1, 1, 3))
+
+    def test_markdown_is_rendered_once(self):
+        report = main.compile_report([pass_scope()])
+        self.assertIs(main.render_report(report), main.render_job_summary(report))
+
+    def test_docs_lines_only_in_the_step_log(self):
+        report = main.compile_report([fail_scope("Commit 1/1")])
+        self.assertTrue(any("Docs:" in line for line in report.tree(True)))
+        self.assertFalse(any("Docs:" in line for line in report.tree(False)))
+
+
+class TestSetupTime(unittest.TestCase):
+    def test_job_summary_reports_the_setup_time(self):
+        with patch("main._setup", (3.4, "cached")):
+            summary = main.render_job_summary([pass_scope()])
+            comment = main.render_pr_comment([pass_scope()])
+        self.assertTrue(summary.endswith("_Setup took 3s (cached environment)._"))
+        self.assertNotIn("Setup took", comment)
+
+    def test_setup_time_is_measured_from_the_exported_start(self):
+        env = {"SETUP_STARTED": "100", "SETUP_ENV": "fresh"}
+        with patch.dict(os.environ, env), patch("main.time.time", return_value=112.5):
+            self.assertEqual(main.measure_setup(), (12.5, "fresh"))
+
+    def test_no_setup_time_outside_the_action(self):
+        with patch.dict(os.environ, {"SETUP_STARTED": ""}):
+            self.assertIsNone(main.measure_setup())
+        self.assertNotIn("Setup took", main.render_job_summary([pass_scope()]))
+
+
+class TestRunStats(unittest.TestCase):
+    """Each run is recorded in stats-file and compared with the ones before."""
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "stats", "runs.sqlite")
+        patcher = patch.multiple(
+            main,
+            STATS_FILE=self.path,
+            _result_cache=None,
+            _setup=None,
+            _trend="",
+            _run_stats=main.RunStats(backend="serial", phases={"checks": 1.0}),
+            config_fingerprint=MagicMock(return_value="cfg"),
+            _commit_check_version=MagicMock(return_value="2.13.4"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.report = main.compile_report([pass_scope(), pass_scope("Commit 1/1")])
+
+    def rows(self) -> list:
+        db = main.sqlite3.connect(self.path)
+        try:
+            return db.execute("SELECT version, check_seconds FROM runs").fetchall()
+        finally:
+            db.close()
+
+    def test_every_run_is_recorded(self):
+        main.record_stats(self.report)
+        main.record_stats(self.report)
+        self.assertEqual(self.rows(), [("2.13.4", 1.0), ("2.13.4", 1.0)])
+        self.assertEqual(main._trend, "")  # too few runs for a trend yet
+
+    def test_trend_compares_with_the_median(self):
+        for seconds in (1.0, 1.2, 0.8):
+            main._run_stats.phases["checks"] = seconds
+            main.record_stats(self.report)
+        main._run_stats.phases["checks"] = 2.0
+        with patch("main._commit_check_version", return_value="2.14.0"):
+            main.record_stats(self.report)
+        self.assertIn("### Performance trend", main._trend)
+        self.assertIn("| Checks | 2.0 s | 1.0 s | ⚠️ +100% |", main._trend)
+        self.assertIn("commit-check changed from 2.13.4 to 2.14.0", main._trend)
+        self.assertIn(main._trend, main.render_job_summary(self.report))
+        self.assertNotIn("Performance trend", main.render_pr_comment(self.report))
+
+    def test_only_the_newest_rows_are_kept(self):
+        with patch("main.STATS_KEEP", 2):
+            for _ in range(4):
+                main.record_stats(self.report)
+        self.assertEqual(len(self.rows()), 2)
+
+    def test_unusable_store_costs_only_the_trend(self):
+        # A file where the store's directory should be.
+        open(os.path.dirname(self.path), "w").close()
+        with patch("builtins.print") as mock_print:
+            main.record_stats(self.report)
+        self.assertEqual(main._trend, "")
+        self.assertIn("Unable to record run statistics", str(mock_print.call_args))
+
+    def test_run_times_its_phases(self):
+        async def fake_checks(args, backend):
+            list(main.get_pr_commits())
+            return []
+
+        with (
+            patch("main._run_checks_concurrently", new=fake_checks),
+            patch("main.is_pr_event", return_value=True),
+            patch("main.iter_pr_commits", return_value=iter(())),
+        ):
+            main.run_commit_check()
+        self.assertEqual(set(main._run_stats.phases), {"config", "git", "checks"})
+        self.assertEqual(main._run_stats.backend, "serial")
+
+
 class TestMain(unittest.TestCase):
     def test_success_path(self):
         with (
+            patch("main.load_inputs"),
             patch("main.log_env_vars"),
             patch("main.run_commit_check", return_value=(0, [pass_scope()])),
             patch("main.render_step_log"),
@@ -1283,6 +2154,7 @@ class TestMain(unittest.TestCase):
 
     def test_failure_path_exits_nonzero(self):
         with (
+            patch("main.load_inputs"),
             patch("main.log_env_vars"),
             patch("main.run_commit_check", return_value=(1, [fail_scope()])),
             patch("main.render_step_log"),
@@ -1297,6 +2169,7 @@ class TestMain(unittest.TestCase):
 
     def test_dry_run_forces_zero(self):
         with (
+            patch("main.load_inputs"),
             patch("main.log_env_vars"),
             patch("main.run_commit_check", return_value=(1, [fail_scope()])),
             patch("main.render_step_log"),
@@ -1495,7 +2368,9 @@ class TestSkipRenderingEdgeCases(unittest.TestCase):
         It previously contributed a row with an empty value and an empty
         rule list — a blank accusation under "Failed checks".
         """
-        table = main._markdown_table([fail_scope("Commit 1/1"), skip_scope("PR title")])
+        table = main._markdown_table(
+            main.compile_report([fail_scope("Commit 1/1"), skip_scope("PR title")])
+        )
         self.assertIn("| Commit 1/1 |", table)
         self.assertNotIn("PR title", table)
         # header + separator + exactly one data row
@@ -1514,3 +2389,1720 @@ class TestSkipRenderingEdgeCases(unittest.TestCase):
         out = buf.getvalue()
         self.assertIn("1 of 2 checks passed, 1 skipped", out)
         self.assertNotIn("all checks passed", out)
+
+
+def timeout_scope(label: str = "Commit 1/1") -> main.ScopeResult:
+    """A scope whose check was stopped by scope-timeout."""
+    return main.ScopeResult(
+        label=label, outcome="timeout", reason="timed out after 120s"
+    )
+
+
+class TestTimeouts(unittest.TestCase):
+    """A hung check is stopped and reported, and the budget stops new ones."""
+
+    def setUp(self):
+        patcher = patch.multiple(main, SCOPE_TIMEOUT=0, _deadline=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_time_left_is_unlimited_by_default(self):
+        self.assertIsNone(main.time_left())
+
+    def test_time_left_scales_scope_timeout_by_scope_count(self):
+        with patch("main.SCOPE_TIMEOUT", 30):
+            self.assertEqual(main.time_left(3), 90)
+
+    def test_time_left_is_cut_to_the_budget(self):
+        with (
+            patch("main.SCOPE_TIMEOUT", 30),
+            patch("main._deadline", main.time.monotonic() + 5),
+        ):
+            self.assertLessEqual(main.time_left(), 5)
+
+    def test_timed_out_check_becomes_a_timeout_scope(self):
+        expired = main.subprocess.TimeoutExpired(["commit-check"], 30)
+        with (
+            patch("main.SCOPE_TIMEOUT", 30),
+            patch("main.subprocess.run", side_effect=expired) as mock_run,
+        ):
+            scope = main.check_scope("Branch", ["--branch"])
+        self.assertEqual(mock_run.call_args.kwargs["timeout"], 30)
+        self.assertEqual(scope.status, "timeout")
+        self.assertEqual(scope.reason, "timed out after 30s")
+
+    def test_spent_budget_skips_without_running(self):
+        with (
+            patch("main._deadline", main.time.monotonic() - 1),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            scope = main.check_scope("Branch", ["--branch"])
+        mock_run.assert_not_called()
+        self.assertEqual(scope.status, "skip")
+        self.assertEqual(scope.reason, main.BUDGET_EXHAUSTED)
+
+    def test_in_process_checks_with_a_limit_run_in_a_killable_worker(self):
+        pool = MagicMock(alive=True)
+        pool.run.side_effect = main.subprocess.TimeoutExpired(["worker"], 30)
+        backend = main.InProcessBackend()
+        with (
+            patch("main.SCOPE_TIMEOUT", 30),
+            patch("main.WorkerPool", return_value=pool) as mock_pool,
+            patch("main._backend", backend),
+            patch("main.run_check_in_process") as mock_in_process,
+        ):
+            backend.start()
+            scope = main.check_scope("Commit 1/1", ["--message"], "fix: x")
+            backend.stop()
+        mock_pool.assert_called_once_with(sys.executable, 1)
+        pool.run.assert_called_once_with(["--message"], "fix: x", 30)
+        mock_in_process.assert_not_called()
+        self.assertEqual(scope.status, "timeout")
+        pool.shutdown.assert_called_once()
+
+    def test_in_process_checks_without_a_limit_stay_in_process(self):
+        backend = main.InProcessBackend()
+        with (
+            patch.multiple("main", TIME_BUDGET=0, _backend=backend),
+            patch("main.WorkerPool") as mock_pool,
+            patch(
+                "main.run_check_in_process",
+                return_value={"checks": [make_check("branch")]},
+            ),
+        ):
+            backend.start()
+            scope = main.check_scope("Branch", ["--branch"])
+        mock_pool.assert_not_called()
+        self.assertEqual(scope.status, "pass")
+
+    def test_in_process_checks_stay_in_process_when_no_worker_starts(self):
+        backend = main.InProcessBackend()
+        with (
+            patch.multiple("main", SCOPE_TIMEOUT=30, _backend=backend),
+            patch("main.WorkerPool", return_value=MagicMock(alive=False)),
+            patch(
+                "main.run_check_in_process",
+                return_value={"checks": [make_check("branch")]},
+            ),
+            patch("builtins.print"),
+        ):
+            backend.start()
+            scope = main.check_scope("Branch", ["--branch"])
+        self.assertEqual(scope.status, "pass")
+
+    def test_exhausted_budget_times_the_run_out(self):
+        skipped = main.ScopeResult(
+            label="Commit 1/2", outcome="skip", reason=main.BUDGET_EXHAUSTED
+        )
+        results = [skipped, pass_scope("Commit 2/2")]
+        self.assertEqual(main.overall_status(results), "timeout")
+        self.assertEqual(main.exit_code_for(results), 1)
+        body = main.render_report(results)
+        self.assertIn(
+            "⏱ **Time budget exhausted**: 1 of 2 checks passed, 1 not started", body
+        )
+        self.assertNotIn("| Scope |", body)
+        with (
+            patch("builtins.print") as mock_print,
+            self.assertRaises(SystemExit),
+        ):
+            main.log_error_and_exit(1, results)
+        mock_print.assert_any_call(
+            "::error::commit-check ran out of its time budget; 1 not started."
+        )
+
+    def test_git_log_is_bounded_by_the_budget(self):
+        with (
+            patch("main.SCOPE_TIMEOUT", 30),
+            patch("main.subprocess.Popen", return_value=rev_list("")),
+            patch("main.threading.Timer") as mock_timer,
+        ):
+            list(main.stream_commits("a..b", fake_objects()))
+        self.assertEqual(mock_timer.call_args[0][0], 30)
+        mock_timer.return_value.cancel.assert_called_once()
+
+    def test_git_log_past_the_budget_is_killed(self):
+        read, write = os.pipe()
+        stdout = os.fdopen(read, "rb", buffering=0)
+        self.addCleanup(stdout.close)
+        process = MagicMock(stdout=stdout, **{"poll.return_value": None})
+        killed = main.threading.Event()
+
+        def kill():
+            # Killing git closes its end of the pipe.
+            if not killed.is_set():
+                killed.set()
+                os.close(write)
+
+        process.kill.side_effect = kill
+        with (
+            patch("main.time_left", return_value=0.01),
+            patch("main.subprocess.Popen", return_value=process),
+            self.assertRaises(main.subprocess.TimeoutExpired),
+        ):
+            list(main.stream_commits("a..b", fake_objects()))
+
+    def test_timed_out_combined_call_reruns_each_flag(self):
+        """The combined call's timeout cannot be pinned on one flag."""
+        expired = main.subprocess.TimeoutExpired(["commit-check"], 60)
+        with (
+            patch("main.SCOPE_TIMEOUT", 30),
+            patch(
+                "main.subprocess.run",
+                side_effect=[
+                    expired,
+                    MagicMock(returncode=0, stdout=json_output(make_check("branch"))),
+                    main.subprocess.TimeoutExpired(["commit-check"], 30),
+                ],
+            ) as mock_run,
+        ):
+            scopes = main.run_other_checks(["--branch", "--author-name"])
+        self.assertEqual(mock_run.call_args_list[0].kwargs["timeout"], 60)
+        self.assertEqual([s.status for s in scopes], ["pass", "timeout"])
+        self.assertEqual(scopes[1].label, "Author name")
+
+    def test_worker_request_is_killed_past_its_timeout(self):
+        worker = main.Worker.__new__(main.Worker)
+        worker.requests = 0
+        worker.process = main.subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdin=main.subprocess.PIPE,
+            stdout=main.subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(worker.process.wait)
+        started = main.time.monotonic()
+        with self.assertRaises(main.subprocess.TimeoutExpired):
+            worker.request(["--branch"], None, timeout=0.5)
+        self.assertLess(main.time.monotonic() - started, 10)
+
+    def test_timeout_fails_the_run(self):
+        self.assertEqual(
+            main.overall_status([pass_scope(), timeout_scope()]), "timeout"
+        )
+        self.assertEqual(main.overall_status([fail_scope(), timeout_scope()]), "fail")
+        self.assertEqual(main.exit_code_for([pass_scope(), timeout_scope()]), 1)
+
+    def test_report_names_timeouts(self):
+        body = main.render_report([pass_scope("Branch"), timeout_scope()])
+        self.assertIn("⏱ **1 of 2 checks timed out** — not validated", body)
+        self.assertIn("  ⏱ Commit 1/1 (timed out after 120s)", body)
+        self.assertIn(
+            "| Commit 1/1 | — | _timed out after 120s — not validated_ |", body
+        )
+
+    def test_report_counts_timeouts_next_to_failures(self):
+        body = main.render_report([fail_scope(), timeout_scope("Commit 2/2")])
+        self.assertIn("❌ **1 of 2 checks failed**, 1 timed out", body)
+
+    def test_budget_skip_shows_its_reason(self):
+        scope = main.ScopeResult(
+            label="Branch", outcome="skip", reason=main.BUDGET_EXHAUSTED
+        )
+        body = main.render_report([scope])
+        self.assertIn(f"  ⊘ Branch ({main.BUDGET_EXHAUSTED})", body)
+
+    def test_step_log_annotates_timeout(self):
+        buf = io.StringIO()
+        with patch("sys.stdout", buf):
+            main.render_step_log([timeout_scope()])
+        self.assertIn("commit-check: Commit 1/1", buf.getvalue())
+        self.assertIn("timed out after 120s", buf.getvalue())
+
+    def test_result_output_carries_reason(self):
+        output_path = os.path.join(tempfile.mkdtemp(), "output.txt")
+        with patch.dict(os.environ, {"GITHUB_OUTPUT": output_path}):
+            main.set_result_output([timeout_scope(), pass_scope()])
+        with open(output_path, encoding="utf-8") as file_obj:
+            content = file_obj.read()
+        payload = json.loads(content.split("result<<EOF\n", 1)[1].rsplit("\nEOF", 1)[0])
+        self.assertEqual(payload["status"], "timeout")
+        self.assertEqual(payload["scopes"][0]["reason"], "timed out after 120s")
+        self.assertNotIn("reason", payload["scopes"][1])
+
+    def test_exit_message_mentions_timeouts(self):
+        with (
+            patch("builtins.print") as mock_print,
+            self.assertRaises(SystemExit),
+        ):
+            main.log_error_and_exit(1, [timeout_scope()])
+        self.assertIn("1 timed out", mock_print.call_args[0][0])
+
+
+class TestFailFast(unittest.TestCase):
+    """Once the failure limit is hit, no new check is started."""
+
+    def setUp(self):
+        patcher = patch.multiple(
+            main,
+            FAIL_FAST_ENABLED=False,
+            MAX_FAILURES=0,
+            _failures=0,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_limit_by_default(self):
+        self.assertEqual(main.failure_limit(), 0)
+        self.assertFalse(main.failure_limit_reached())
+
+    def test_fail_fast_is_a_limit_of_one(self):
+        with patch("main.FAIL_FAST_ENABLED", True):
+            self.assertEqual(main.failure_limit(), 1)
+
+    def test_max_failures_overrides_fail_fast(self):
+        with patch("main.FAIL_FAST_ENABLED", True), patch("main.MAX_FAILURES", 3):
+            self.assertEqual(main.failure_limit(), 3)
+
+    def test_check_scope_is_not_started_past_the_limit(self):
+        with (
+            patch("main.FAIL_FAST_ENABLED", True),
+            patch("main._failures", 1),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            scope = main.check_scope("Branch", ["--branch"])
+        mock_run.assert_not_called()
+        self.assertEqual(scope.status, "skip")
+        self.assertEqual(scope.reason, main.FAILURE_LIMIT_REACHED)
+
+    def test_failures_are_counted(self):
+        result = MagicMock(
+            returncode=1, stdout=json_output(make_check("branch", status="fail"))
+        )
+        with patch("main.subprocess.run", return_value=result):
+            main.check_scope("Branch", ["--branch"])
+        self.assertEqual(main._failures, 1)
+
+    def test_newest_commit_is_checked_first_and_stops_the_rest(self):
+        def fake_run(command, input_text, timeout):
+            status = "fail" if input_text == "newest" else "pass"
+            return int(status == "fail"), json_output(
+                make_check("message", status=status)
+            )
+
+        with (
+            patch("main.FAIL_FAST_ENABLED", True),
+            patch("main._run_cancellable", side_effect=fake_run) as mock_run,
+        ):
+            scopes = main.run_pr_message_checks(["oldest", "middle", "newest"])
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertEqual(
+            [s.label for s in scopes], ["Commit 1/3", "Commit 2/3", "Commit 3/3"]
+        )
+        self.assertEqual([s.status for s in scopes], ["skip", "skip", "fail"])
+
+    def test_limit_counts_several_failures(self):
+        def fake_run(command, input_text, timeout):
+            return 1, json_output(make_check("message", status="fail"))
+
+        with (
+            patch("main.MAX_FAILURES", 2),
+            patch("main._run_cancellable", side_effect=fake_run) as mock_run,
+        ):
+            scopes = main.run_pr_message_checks(["a", "b", "c", "d"])
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual([s.status for s in scopes], ["skip", "skip", "fail", "fail"])
+
+    def test_failing_title_stops_commit_checks(self):
+        def title():
+            return [main.tally(fail_scope("PR title"))]
+
+        with (
+            patch.multiple(
+                main,
+                FAIL_FAST_ENABLED=True,
+                PR_TITLE_ENABLED=True,
+                MESSAGE_ENABLED=True,
+                BRANCH_ENABLED=False,
+                AUTHOR_NAME_ENABLED=False,
+                AUTHOR_EMAIL_ENABLED=False,
+                is_pr_event=MagicMock(return_value=True),
+                get_pr_commits=MagicMock(
+                    return_value=[("a1", "fix: a"), ("b2", "fix: b")]
+                ),
+                check_pr_title=MagicMock(side_effect=title),
+            ),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            rc, results = main.run_commit_check()
+        mock_run.assert_not_called()
+        self.assertEqual(rc, 1)
+        self.assertEqual([r.status for r in results], ["fail", "skip", "skip"])
+
+    def test_running_checks_are_cancelled_at_the_limit(self):
+        """A check that hangs is killed once another one fails."""
+
+        run_cancellable = main._run_cancellable
+
+        def fake_run(command, input_text, timeout):
+            if input_text == "bad":
+                # Fails only once the other check is running.
+                while not main._running:
+                    main.time.sleep(0.01)
+                return 1, json_output(make_check("message", status="fail"))
+            return run_cancellable(
+                [sys.executable, "-c", "import time; time.sleep(30)"], None, None
+            )
+
+        started = main.time.monotonic()
+        with (
+            patch.multiple(main, FAIL_FAST_ENABLED=True, MAX_WORKERS=2),
+            patch("main._run_cancellable", side_effect=fake_run),
+            patch("main.get_backend", return_value=main.ParallelBackend()),
+            patch("builtins.print"),
+        ):
+            # Newest first: "slow" starts, then "bad" fails while it runs.
+            scopes = main.run_pr_message_checks(["bad", "slow"])
+        self.assertLess(main.time.monotonic() - started, 10)
+        self.assertEqual([s.status for s in scopes], ["fail", "skip"])
+        self.assertEqual(scopes[1].reason, main.CANCELLED)
+        self.assertEqual(main._running, set())
+
+    def test_cancelled_cli_check_raises(self):
+        with (
+            patch("main.FAIL_FAST_ENABLED", True),
+            patch("main._failures", 1),
+            self.assertRaises(main.CheckCancelled),
+        ):
+            # Registered after the limit was reached: killed at once.
+            main._run_cancellable(
+                [sys.executable, "-c", "import time; time.sleep(30)"], None, None
+            )
+
+    def test_cancelled_worker_is_not_replaced(self):
+        pool = main.WorkerPool.__new__(main.WorkerPool)
+        pool._idle = main.queue.Queue()
+        worker = MagicMock()
+        worker.request.side_effect = main.CheckCancelled(["worker"])
+        pool._idle.put(worker)
+        with (
+            patch.object(pool, "_spawn") as mock_spawn,
+            self.assertRaises(main.CheckCancelled),
+        ):
+            pool.run(["--message"], "fix: x")
+        worker.close.assert_called_once()
+        mock_spawn.assert_not_called()
+        self.assertFalse(pool.alive)
+
+    def test_cancelled_worker_request_raises(self):
+        worker = main.Worker.__new__(main.Worker)
+        worker.requests = 0
+        worker.process = main.subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdin=main.subprocess.PIPE,
+            stdout=main.subprocess.PIPE,
+            text=True,
+        )
+        self.addCleanup(worker.process.wait)
+        with (
+            patch("main.FAIL_FAST_ENABLED", True),
+            patch("main._failures", 1),
+            self.assertRaises(main.CheckCancelled),
+        ):
+            worker.request(["--branch"], None)
+
+    def test_cancelled_combined_call_cancels_every_flag(self):
+        with patch(
+            "main.run_checks", side_effect=main.CheckCancelled(["commit-check"])
+        ):
+            scopes = main.run_other_checks(["--branch", "--author-name"])
+        self.assertEqual([s.reason for s in scopes], [main.CANCELLED] * 2)
+
+    def test_report_counts_cancelled_checks(self):
+        cancelled = main.ScopeResult(
+            label="Commit 1/3", outcome="skip", reason=main.CANCELLED
+        )
+        not_started = main.ScopeResult(
+            label="Commit 2/3", outcome="skip", reason=main.FAILURE_LIMIT_REACHED
+        )
+        body = main.render_report([cancelled, not_started, fail_scope("Commit 3/3")])
+        self.assertIn("❌ **1 of 3 checks failed**, 1 not started, 1 cancelled", body)
+        self.assertIn(f"  ⊘ Commit 1/3 ({main.CANCELLED})", body)
+
+    def test_report_says_how_many_were_not_evaluated(self):
+        skipped = main.ScopeResult(
+            label="Commit 1/2", outcome="skip", reason=main.FAILURE_LIMIT_REACHED
+        )
+        body = main.render_report([skipped, fail_scope("Commit 2/2")])
+        self.assertIn("❌ **1 of 2 checks failed**, 1 not started", body)
+        self.assertIn(f"  ⊘ Commit 1/2 ({main.FAILURE_LIMIT_REACHED})", body)
+
+    def test_ignored_authors_are_not_counted_as_not_started(self):
+        not_started = main.ScopeResult(
+            label="Commit 1/3", outcome="skip", reason=main.BUDGET_EXHAUSTED
+        )
+        ignored = main.ScopeResult(
+            label="Commit 2/3", checks=[make_check("message", status="skip")]
+        )
+        body = main.render_report([not_started, ignored, fail_scope("Commit 3/3")])
+        self.assertIn("❌ **1 of 3 checks failed**, 1 not started, 1 skipped", body)
+
+
+class TestInputMemo(unittest.TestCase):
+    """Identical inputs within a run are evaluated once."""
+
+    def test_repeated_input_is_evaluated_once(self):
+        memo = main.InputMemo()
+        evaluate = MagicMock(return_value=({"checks": []}, "{}"))
+        first = memo.lookup(["--message"], "wip", evaluate)
+        second = memo.lookup(["--message"], "wip", evaluate)
+        evaluate.assert_called_once()
+        self.assertIs(first, second)
+        self.assertEqual(memo.summary(), "2 scopes, 1 unique inputs (2.0x)")
+
+    def test_different_args_are_different_inputs(self):
+        memo = main.InputMemo()
+        evaluate = MagicMock(return_value=(None, ""))
+        memo.lookup(["--message"], "x", evaluate)
+        memo.lookup(["--branch"], "x", evaluate)
+        self.assertEqual(evaluate.call_count, 2)
+
+    def test_concurrent_duplicate_waits_for_the_first(self):
+        import threading
+
+        memo = main.InputMemo()
+        release = threading.Event()
+        evaluate = MagicMock(side_effect=lambda: release.wait(5) and (None, "x"))
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [
+                pool.submit(memo.lookup, ["--message"], "wip", evaluate)
+                for _ in range(2)
+            ]
+            release.set()
+            outcomes = [f.result(timeout=5) for f in futures]
+        evaluate.assert_called_once()
+        self.assertEqual(outcomes, [(None, "x"), (None, "x")])
+
+    def test_timeout_is_shared_with_duplicates(self):
+        memo = main.InputMemo()
+        expired = main.subprocess.TimeoutExpired(["commit-check"], 30)
+        evaluate = MagicMock(side_effect=expired)
+        for _ in range(2):
+            with self.assertRaises(main.subprocess.TimeoutExpired):
+                memo.lookup(["--message"], "wip", evaluate)
+        evaluate.assert_called_once()
+
+    def test_title_matching_the_commit_is_checked_once(self):
+        result = MagicMock(
+            returncode=0, stdout=json_output(make_check("message", value="feat: x"))
+        )
+        with (
+            patch.multiple(
+                main,
+                PR_TITLE_ENABLED=True,
+                MESSAGE_ENABLED=True,
+                BRANCH_ENABLED=False,
+                AUTHOR_NAME_ENABLED=False,
+                AUTHOR_EMAIL_ENABLED=False,
+                is_pr_event=MagicMock(return_value=True),
+                get_pr_title=MagicMock(return_value="feat: x"),
+                get_pr_commits=MagicMock(return_value=[("a1", "feat: x")]),
+            ),
+            patch("main.subprocess.run", return_value=result) as mock_run,
+            patch("builtins.print") as mock_print,
+        ):
+            rc, results = main.run_commit_check()
+        mock_run.assert_called_once()
+        self.assertEqual(rc, 0)
+        self.assertEqual([r.label for r in results], ["PR title", "Commit 1/1"])
+        self.assertIn(
+            call("::debug::dedupe: 2 scopes, 1 unique inputs (2.0x)"),
+            mock_print.call_args_list,
+        )
+
+
+class TestResultCache(unittest.TestCase):
+    """Message results persist across runs, keyed by everything that decides them."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        patcher = patch.multiple(
+            main,
+            _commit_check_version=MagicMock(return_value="2.13.4"),
+            config_fingerprint=MagicMock(return_value="config"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.checks = [make_check("message", value="feat: x")]
+
+    def cache(self, max_bytes: int = 1 << 20) -> main.ResultCache:
+        return main.ResultCache(self.dir, max_bytes)
+
+    def test_round_trip_across_instances(self):
+        first = self.cache()
+        self.assertIsNone(first.get(["--message"], "feat: x"))
+        first.put(["--message"], "feat: x", self.checks)
+        second = self.cache()
+        self.assertEqual(second.get(["--message"], "feat: x\n"), self.checks)
+        self.assertEqual(first.stats(), {"hits": 0, "misses": 1})
+        self.assertEqual(second.stats(), {"hits": 1, "misses": 0})
+
+    def test_version_change_is_a_miss(self):
+        self.cache().put(["--message"], "feat: x", self.checks)
+        with patch("main._commit_check_version", return_value="2.14.0"):
+            self.assertIsNone(self.cache().get(["--message"], "feat: x"))
+
+    def test_config_change_is_a_miss(self):
+        self.cache().put(["--message"], "feat: x", self.checks)
+        with patch("main.config_fingerprint", return_value="other"):
+            self.assertIsNone(self.cache().get(["--message"], "feat: x"))
+
+    def test_checks_without_input_are_not_cached(self):
+        cache = self.cache()
+        cache.put(["--branch"], None, self.checks)
+        self.assertIsNone(cache.get(["--branch"], None))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0})
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_unkeyable_config_disables_the_cache(self):
+        with patch("main.config_fingerprint", return_value=None):
+            cache = self.cache()
+            cache.put(["--message"], "feat: x", self.checks)
+            self.assertIsNone(cache.get(["--message"], "feat: x"))
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_evicts_least_recently_used_first(self):
+        cache = self.cache()
+        for index, msg in enumerate(["old", "used", "new"]):
+            cache.put(["--message"], msg, self.checks)
+            path = cache._path(["--message"], msg)
+            os.utime(path, (1000 + index, 1000 + index))
+        cache.get(["--message"], "old")  # now the most recently used
+        size = os.path.getsize(cache._path(["--message"], "old"))
+        cache.max_bytes = 2 * size
+        cache.evict()
+        self.assertIsNotNone(cache.get(["--message"], "old"))
+        self.assertIsNone(cache.get(["--message"], "used"))
+        self.assertIsNotNone(cache.get(["--message"], "new"))
+
+    def test_eviction_leaves_other_files_alone(self):
+        layer = os.path.join(self.dir, "config", "ab.json")
+        os.makedirs(os.path.dirname(layer))
+        with open(layer, "w", encoding="utf-8") as f:
+            f.write("{}")
+        os.utime(layer, (1000, 1000))
+        cache = self.cache()
+        cache.put(["--message"], "feat: x", self.checks)
+        cache.max_bytes = 0
+        cache.evict()
+        self.assertTrue(os.path.exists(layer))
+        self.assertIsNone(cache.get(["--message"], "feat: x"))
+
+    def test_hit_skips_the_cli(self):
+        self.cache().put(["--message"], "feat: x", self.checks)
+        with (
+            patch("main._result_cache", self.cache()),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            scope = main.check_scope("Commit 1/1", ["--message"], "feat: x")
+        mock_run.assert_not_called()
+        self.assertEqual(scope.checks, self.checks)
+
+    def test_miss_is_stored(self):
+        result = MagicMock(returncode=0, stdout=json_output(*self.checks))
+        with (
+            patch("main._result_cache", self.cache()),
+            patch("main.subprocess.run", return_value=result),
+        ):
+            main.check_scope("Commit 1/1", ["--message"], "feat: x")
+        self.assertEqual(self.cache().get(["--message"], "feat: x"), self.checks)
+
+    def test_result_output_reports_hits_and_misses(self):
+        cache = self.cache()
+        cache.get(["--message"], "feat: x")
+        output_path = os.path.join(tempfile.mkdtemp(), "output.txt")
+        with (
+            patch.dict(os.environ, {"GITHUB_OUTPUT": output_path}),
+            patch("main._result_cache", cache),
+        ):
+            main.set_result_output([pass_scope()])
+        with open(output_path, encoding="utf-8") as file_obj:
+            content = file_obj.read()
+        self.assertIn('"misses": 1', content)
+
+
+class TestConfigFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, self.cwd)
+        patcher = patch("main.get_in_process_engine", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_changes_with_cchk_variables(self):
+        before = main.config_fingerprint()
+        with patch.dict(os.environ, {"CCHK_SUBJECT_MAX_LENGTH": "50"}):
+            self.assertNotEqual(main.config_fingerprint(), before)
+
+    def test_changes_with_the_config_file(self):
+        before = main.config_fingerprint()
+        with open("cchk.toml", "w", encoding="utf-8") as f:
+            f.write("[commit]\nsubject_max_length = 50\n")
+        self.assertNotEqual(main.config_fingerprint(), before)
+
+    def test_changes_with_heads_author_when_user_name_is_unset(self):
+        env = {
+            "GIT_CONFIG_GLOBAL": os.devnull,
+            "GIT_CONFIG_NOSYSTEM": "1",
+            "GIT_COMMITTER_NAME": "Committer",
+            "GIT_COMMITTER_EMAIL": "c@example.com",
+        }
+        with patch.dict(os.environ, env):
+            main.subprocess.run(["git", "init", "--quiet"], check=True)
+            fingerprints = []
+            for author in ("Alice", "dependabot[bot]"):
+                main.subprocess.run(
+                    ["git", "commit", "--quiet", "--allow-empty", "-m", "x"],
+                    check=True,
+                    env={
+                        **os.environ,
+                        "GIT_AUTHOR_NAME": author,
+                        "GIT_AUTHOR_EMAIL": "a@example.com",
+                    },
+                )
+                fingerprints.append(main.config_fingerprint())
+        self.assertNotEqual(fingerprints[0], fingerprints[1])
+
+    def test_inherited_config_cannot_be_keyed_without_the_engine(self):
+        with open("cchk.toml", "w", encoding="utf-8") as f:
+            f.write('inherit_from = "github:org/repo:cchk.toml"\n')
+        self.assertIsNone(main.config_fingerprint())
+
+
+def commit_scope(sha: str, status: str = "pass") -> main.ScopeResult:
+    return main.ScopeResult(
+        label="Commit 1/1",
+        checks=[make_check("message", status=status, value=f"msg {sha}")],
+        sha=sha,
+    )
+
+
+class TestPrState(unittest.TestCase):
+    """Commits reported in the PR comment are not checked again."""
+
+    def setUp(self):
+        patcher = patch("main.results_namespace", return_value="ns")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        results = [commit_scope("a1"), commit_scope("b2", "fail"), pass_scope()]
+        blob = main.encode_pr_state(results)
+        self.assertTrue(blob.startswith("<!-- commit-check-state "))
+        state = main.decode_pr_state(f"report\n{blob}")
+        self.assertEqual(
+            state["commits"], {"a1": results[0].checks, "b2": results[1].checks}
+        )
+        self.assertEqual(state["scopes"], {"Branch": results[2].checks})
+        self.assertEqual(state["total"], 2)
+
+    def test_other_config_or_version_is_ignored(self):
+        blob = main.encode_pr_state([commit_scope("a1")])
+        with patch("main.results_namespace", return_value="other"):
+            self.assertEqual(main.decode_pr_state(blob), {})
+
+    def test_unusable_blob_is_ignored(self):
+        self.assertEqual(main.decode_pr_state("<!-- commit-check-state %%% -->"), {})
+        self.assertEqual(main.decode_pr_state("no state here"), {})
+
+    def test_only_real_verdicts_are_stored(self):
+        timed_out = main.ScopeResult(
+            label="Commit 1/1", outcome="timeout", reason="timed out", sha="a1"
+        )
+        self.assertEqual(main.encode_pr_state([timed_out]), "")
+        ignored = commit_scope("b2")
+        ignored.checks = [make_check("message", status="skip")]
+        self.assertEqual(main.encode_pr_state([ignored]), "")
+
+    def test_oldest_commits_are_dropped_to_fit(self):
+        # Hash-like SHAs, which do not compress away.
+        shas = [main.hashlib.sha1(str(i).encode()).hexdigest() for i in range(40)]
+        with patch("main.STATE_MAX_CHARS", 1500):
+            blob = main.encode_pr_state([commit_scope(sha) for sha in shas])
+        self.assertLessEqual(len(blob), 1500 + len("<!-- commit-check-state  -->"))
+        restored = main.decode_pr_state(blob)["commits"]
+        self.assertIn(shas[-1], restored)
+        self.assertNotIn(shas[0], restored)
+
+    def test_pr_comment_carries_the_state_after_the_report(self):
+        results = [commit_scope("a1")]
+        body = main.render_pr_comment(results)
+        self.assertTrue(body.startswith(main.render_report(results)))
+        self.assertEqual(
+            main.decode_pr_state(body)["commits"], {"a1": results[0].checks}
+        )
+
+    def test_job_summary_carries_no_state(self):
+        self.assertNotIn("commit-check-state", main.render_report([commit_scope("a1")]))
+
+    def _load(self, comment):
+        issue = MagicMock()
+        issue.get_comments.return_value = [comment]
+        with (
+            patch("main.PR_COMMENTS_ENABLED", True),
+            patch("main.is_pr_event", return_value=True),
+            patch("main._get_pr_issue", return_value=issue),
+        ):
+            return main.load_pr_state()
+
+    def test_loads_state_from_the_bot_comment(self):
+        results = [commit_scope("a1")]
+        comment = MagicMock(body=main.render_pr_comment(results))
+        comment.user.type = "Bot"
+        comment.user.login = "github-actions[bot]"
+        self.assertEqual(self._load(comment)["commits"], {"a1": results[0].checks})
+
+    def test_state_in_a_person_s_comment_is_not_trusted(self):
+        comment = MagicMock(body=main.render_pr_comment([commit_scope("a1")]))
+        comment.user.type = "User"
+        comment.user.login = "someone"
+        with patch("main._token_login", return_value=None):
+            self.assertEqual(self._load(comment), {})
+
+    def test_state_in_another_bot_s_comment_is_not_trusted(self):
+        comment = MagicMock(body=main.render_pr_comment([commit_scope("a1")]))
+        comment.user.type = "Bot"
+        comment.user.login = "renovate[bot]"
+        with patch("main._token_login", return_value="ci-user"):
+            self.assertEqual(self._load(comment), {})
+
+    def test_state_from_the_token_s_own_account_is_trusted(self):
+        results = [commit_scope("a1")]
+        comment = MagicMock(body=main.render_pr_comment(results))
+        comment.user.type = "User"
+        comment.user.login = "ci-user"
+        with patch("main._token_login", return_value="ci-user"):
+            self.assertEqual(self._load(comment)["commits"], {"a1": results[0].checks})
+
+    def test_comments_are_listed_once_per_run(self):
+        results = [commit_scope("a1")]
+        comment = MagicMock(body=main.render_pr_comment(results))
+        comment.user.login = "github-actions[bot]"
+        issue = MagicMock()
+        issue.get_comments.return_value = [comment]
+        get_issue = MagicMock(return_value=issue)
+        with (
+            patch.multiple(
+                main,
+                PR_COMMENTS_ENABLED=True,
+                is_pr_event=MagicMock(return_value=True),
+                is_fork_pr_with_readonly_token=MagicMock(return_value=False),
+                get_pr_number=MagicMock(return_value=1),
+                _get_pr_issue=get_issue,
+            ),
+            patch.dict(sys.modules, {"github": MagicMock()}),
+            patch("builtins.print"),
+            main.in_run_context(),
+        ):
+            self.assertEqual(main.load_pr_state()["commits"], {"a1": results[0].checks})
+            main.add_pr_comments(results)
+        get_issue.assert_called_once()
+        issue.get_comments.assert_called_once()
+
+    def test_no_state_without_pr_comments(self):
+        with (
+            patch("main.PR_COMMENTS_ENABLED", False),
+            patch("main._get_pr_issue") as mock_issue,
+        ):
+            self.assertEqual(main.load_pr_state(), {})
+        mock_issue.assert_not_called()
+
+    def test_restored_commits_are_not_checked_again(self):
+        old = [make_check("message", value="fix: old")]
+
+        def fake_run(command, input=None, **kwargs):
+            return MagicMock(returncode=0, stdout=json_output(make_check("message")))
+
+        with (patch("main.subprocess.run", side_effect=fake_run) as mock_run,):
+            scopes = main.check_commit_messages(
+                [("a1", "fix: old"), ("b2", "fix: new")], ["--message"], {"a1": old}
+            )
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[1]["input"], "fix: new")
+        self.assertEqual([s.label for s in scopes], ["Commit 1/2", "Commit 2/2"])
+        self.assertEqual(scopes[0].checks, old)
+        self.assertEqual([s.sha for s in scopes], ["a1", "b2"])
+
+
+class TestEditedEvent(unittest.TestCase):
+    """A title or description edit re-checks the title and nothing else."""
+
+    def setUp(self):
+        self.event = {
+            "action": "edited",
+            "changes": {"title": {"from": "feat: old"}},
+            "pull_request": {"title": "feat: new", "head": {"sha": "h1"}},
+        }
+        event_path = os.path.join(tempfile.mkdtemp(), "event.json")
+        with open(event_path, "w", encoding="utf-8") as f:
+            json.dump(self.event, f)
+        patcher = patch.multiple(
+            main,
+            PR_TITLE_ENABLED=True,
+            MESSAGE_ENABLED=True,
+            BRANCH_ENABLED=True,
+            AUTHOR_NAME_ENABLED=False,
+            AUTHOR_EMAIL_ENABLED=False,
+            results_namespace=MagicMock(return_value="ns"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        env = patch.dict(
+            os.environ,
+            {"GITHUB_EVENT_NAME": "pull_request", "GITHUB_EVENT_PATH": event_path},
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.previous = [
+            main.ScopeResult(label="PR title", checks=[make_check("message")]),
+            commit_scope("a1"),
+            main.ScopeResult(label="Branch", checks=[make_check("branch")]),
+        ]
+
+    def state(self) -> dict:
+        return main.decode_pr_state(main.encode_pr_state(self.previous))
+
+    def test_reads_changed_fields(self):
+        self.assertEqual(main.get_edited_fields(), {"title"})
+
+    def test_other_actions_are_not_edits(self):
+        with patch("main._read_event_payload", return_value={"action": "synchronize"}):
+            self.assertIsNone(main.get_edited_fields())
+
+    def test_title_edit_checks_only_the_title(self):
+        title = [main.ScopeResult(label="PR title", checks=[make_check("message")])]
+        with patch("main.check_pr_title", return_value=title) as mock_title:
+            results = main.restore_edited_run(
+                self.state(), {"title"}, ["--message", "--branch"]
+            )
+        mock_title.assert_called_once()
+        self.assertEqual(
+            [r.label for r in results], ["PR title", "Commit 1/1", "Branch"]
+        )
+        self.assertEqual(results[1].sha, "a1")
+
+    def test_body_edit_checks_nothing(self):
+        with patch("main.check_pr_title") as mock_title:
+            results = main.restore_edited_run(
+                self.state(), {"body"}, ["--message", "--branch"]
+            )
+        mock_title.assert_not_called()
+        self.assertEqual(len(results), 3)
+
+    def test_state_for_another_head_is_not_used(self):
+        state = self.state()
+        self.event["pull_request"]["head"]["sha"] = "h2"
+        with patch("main._read_event_payload", return_value=self.event):
+            self.assertIsNone(
+                main.restore_edited_run(state, {"title"}, ["--message", "--branch"])
+            )
+
+    def test_incomplete_state_is_not_used(self):
+        state = self.state()
+        state["total"] = 2
+        self.assertIsNone(
+            main.restore_edited_run(state, {"title"}, ["--message", "--branch"])
+        )
+
+    def test_title_edit_run_makes_one_cli_call(self):
+        body = main.render_pr_comment(self.previous)
+        result = MagicMock(returncode=0, stdout=json_output(make_check("message")))
+        with (
+            patch("main.load_pr_state", return_value=main.decode_pr_state(body)),
+            patch("main.get_pr_commits") as mock_git,
+            patch("main.subprocess.run", return_value=result) as mock_run,
+        ):
+            rc, results = main.run_commit_check()
+        mock_git.assert_not_called()
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[1]["input"], "feat: new")
+        self.assertEqual(rc, 0)
+        self.assertEqual(len(results), 3)
+
+    def test_base_change_runs_everything(self):
+        self.event["changes"] = {"base": {"ref": {"from": "main"}}}
+        with (
+            patch("main._read_event_payload", return_value=self.event),
+            patch("main.load_pr_state") as mock_state,
+            patch("main.restore_edited_run") as mock_restore,
+            patch("main.get_pr_commits", return_value=[]),
+            patch("main.check_pr_title", return_value=[]),
+            patch("main.check_commit_messages", return_value=[]),
+            patch("main.run_other_checks", return_value=[]),
+        ):
+            main.run_commit_check()
+        mock_restore.assert_not_called()
+        mock_state.assert_called_once()  # for the commits, as on any run
+
+    def test_state_is_loaded_once_when_it_cannot_be_restored(self):
+        state = {"commits": {"a1": "pass"}}
+        with (
+            patch("main.load_pr_state", return_value=state) as mock_state,
+            patch("main.restore_edited_run", return_value=None),
+            patch("main.get_pr_commits", return_value=[]),
+            patch("main.check_pr_title", return_value=[]),
+            patch("main.check_commit_messages", return_value=[]) as mock_check,
+            patch("main.run_other_checks", return_value=[]),
+        ):
+            main.run_commit_check()
+        mock_state.assert_called_once()
+        self.assertEqual(mock_check.call_args[0][2], {"a1": "pass"})
+
+
+class TestGitNotes(unittest.TestCase):
+    """Results recorded in refs/notes/commit-check are not checked again."""
+
+    def setUp(self):
+        patcher = patch.multiple(
+            main,
+            GIT_NOTES_ENABLED=True,
+            results_namespace=MagicMock(return_value="ns"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(main._notes.clear)
+
+    def git(self, *args: str) -> str:
+        return main.subprocess.run(
+            ["git", *args], capture_output=True, encoding="utf-8", check=True
+        ).stdout.strip()
+
+    def make_repo(self) -> list[str]:
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, cwd)
+        self.git("init", "--quiet")
+        self.git("config", "user.name", "Tester")
+        self.git("config", "user.email", "tester@example.com")
+        for subject in ("fix: first", "feat: second"):
+            self.git("commit", "--quiet", "--allow-empty", "-m", subject)
+        return self.git("log", "--reverse", "--pretty=%H").split()
+
+    def read_notes(self) -> list[tuple[str, str]]:
+        main._notes.clear()
+        # A fresh reader, which sees the notes just written.
+        main.close_git_objects()
+        self.addCleanup(main.close_git_objects)
+        return list(main.stream_commits("HEAD", main.git_objects()))
+
+    def test_notes_are_read_with_the_commits(self):
+        process = rev_list("a1\nb2\n")
+        objects = fake_objects(a1="fix: first", b2="fix: second")
+        objects.read.return_value = ("n0", "commit", b"")
+        objects.note.side_effect = lambda ref, sha: "note\n" if sha == "a1" else None
+        with patch("main.subprocess.Popen", return_value=process):
+            list(main.stream_commits("a..b", objects))
+        self.assertEqual(main._notes, {"a1": "note\n"})
+        objects.read.assert_called_once_with(main.NOTES_REF)
+
+    def test_notes_are_found_under_any_fanout(self):
+        sha = "abcdef" + "0" * 34
+        objects = main.GitObjects.__new__(main.GitObjects)
+        blob = ("n1", "blob", b"note\n")
+        with patch.object(
+            main.GitObjects,
+            "read",
+            side_effect=lambda name: (blob if name == f"ref:ab/cd/{sha[4:]}" else None),
+        ) as mock_read:
+            self.assertEqual(objects.note("ref", sha), "note\n")
+        self.assertEqual(
+            [c[0][0] for c in mock_read.call_args_list],
+            [f"ref:{sha}", f"ref:ab/{sha[2:]}", f"ref:ab/cd/{sha[4:]}"],
+        )
+
+    def test_results_for_other_configs_are_ignored(self):
+        checks = [make_check("message")]
+        main._notes.update(
+            {
+                "a1": json.dumps({"ns": checks}),
+                "b2": json.dumps({"other": checks}),
+                "c3": "not json",
+            }
+        )
+        self.assertEqual(main.notes_results(), {"a1": checks})
+
+    def test_written_notes_are_read_back(self):
+        shas = self.make_repo()
+        first = commit_scope(shas[0])
+        main.write_git_notes([first, pass_scope()])
+        self.read_notes()
+        self.assertEqual(main.notes_results(), {shas[0]: first.checks})
+
+        # A second config's results are added beside the first's.
+        second = commit_scope(shas[1])
+        with patch("main.results_namespace", return_value="other"):
+            main.write_git_notes([commit_scope(shas[0]), second])
+            self.read_notes()
+            self.assertEqual(
+                main.notes_results(),
+                {shas[0]: first.checks, shas[1]: second.checks},
+            )
+        self.assertEqual(main.notes_results(), {shas[0]: first.checks})
+        self.assertEqual(self.git("rev-list", "--count", main.NOTES_REF), "2")
+
+    def test_notes_are_written_by_one_git_invocation(self):
+        shas = self.make_repo()
+        self.addCleanup(main.close_git_objects)
+        run = main.subprocess.run
+        for sha in shas:
+            with patch("main.subprocess.run", side_effect=run) as mock_run:
+                main.write_git_notes([commit_scope(sha)])
+            self.assertEqual(
+                [c.args[0][:2] for c in mock_run.call_args_list],
+                [["git", "fast-import"]],
+            )
+        self.assertEqual(self.git("rev-list", "--count", main.NOTES_REF), "2")
+
+    def test_unchanged_notes_are_not_written(self):
+        shas = self.make_repo()
+        main.write_git_notes([commit_scope(shas[0])])
+        self.read_notes()
+        with patch("main.subprocess.run") as mock_run:
+            main.write_git_notes([commit_scope(shas[0])])
+        mock_run.assert_not_called()
+
+    def test_notes_the_run_did_not_read_keep_other_namespaces(self):
+        shas = self.make_repo()
+        first = commit_scope(shas[0])
+        with patch("main.results_namespace", return_value="other"):
+            main.write_git_notes([first])
+        # As in a run restored from the PR comment, which walks no commits.
+        main._notes.clear()
+        main.write_git_notes([first])
+        self.read_notes()
+        self.assertEqual(
+            json.loads(main._notes[shas[0]]),
+            {"other": first.checks, "ns": first.checks},
+        )
+        main._notes.clear()
+        with patch("main.subprocess.run") as mock_run:
+            main.write_git_notes([first])
+        mock_run.assert_not_called()
+
+    def test_unfinished_checks_are_not_recorded(self):
+        timed_out = main.ScopeResult(
+            label="Commit 1/1", outcome="timeout", reason="timed out", sha="a1"
+        )
+        with patch("main.subprocess.run") as mock_run:
+            main.write_git_notes([timed_out])
+        mock_run.assert_not_called()
+
+    def test_recorded_commits_are_not_checked_again(self):
+        old = [make_check("message", value="fix: old")]
+        main._notes["a1"] = json.dumps({"ns": old})
+
+        def fake_run(command, input=None, **kwargs):
+            return MagicMock(returncode=0, stdout=json_output(make_check("message")))
+
+        with (patch("main.subprocess.run", side_effect=fake_run) as mock_run,):
+            scopes = main.check_commit_messages(
+                [("a1", "fix: old"), ("b2", "fix: new")], ["--message"]
+            )
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[1]["input"], "fix: new")
+        self.assertEqual(scopes[0].checks, old)
+
+
+class TestFlattenConfig(unittest.TestCase):
+    """An inherited config is resolved once and every check reads the result."""
+
+    PARENT = (
+        'inherit_from = "grandparent.toml"\n'
+        "[commit]\nsubject_max_length = 50\nallow_commit_types = ['feat', 'fix']\n"
+        "[branch]\nconventional_branch = true\n"
+    )
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, self.cwd)
+        patcher = patch("main.CACHE_DIR", os.path.abspath("cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with open("parent.toml", "w", encoding="utf-8") as f:
+            f.write(self.PARENT)
+        self.parent_url = "file://" + main.urllib.request.pathname2url(
+            os.path.abspath("parent.toml")
+        )
+
+    def write_config(self, inherit_from: str) -> None:
+        with open("cchk.toml", "w", encoding="utf-8") as f:
+            f.write(
+                f'inherit_from = "{inherit_from}"\n[commit]\nsubject_max_length = 72\n'
+            )
+
+    def flatten(self) -> dict | None:
+        path = flatten_config()
+        if path is None:
+            return None
+        self.addCleanup(os.remove, path)
+        with open(path, "rb") as f:
+            return main._parse_toml(f.read())
+
+    def expected(self) -> dict:
+        return {
+            "commit": {"subject_max_length": 72, "allow_commit_types": ["feat", "fix"]},
+            "branch": {"conventional_branch": True},
+        }
+
+    def test_config_without_inherit_from_is_left_alone(self):
+        with open("cchk.toml", "w", encoding="utf-8") as f:
+            f.write("[commit]\nsubject_max_length = 72\n")
+        self.assertIsNone(self.flatten())
+
+    def test_local_parent_is_merged_under_the_local_settings(self):
+        self.write_config("parent.toml")
+        # The parent's own inherit_from is dropped, as commit-check drops it.
+        self.assertEqual(self.flatten(), self.expected())
+
+    def test_remote_parent_is_fetched_and_cached(self):
+        self.write_config("github:org/repo:parent.toml")
+        with patch("main.inherit_url", return_value=self.parent_url):
+            self.assertEqual(self.flatten(), self.expected())
+        self.assertEqual(len(os.listdir(os.path.join("cache", "config"))), 1)
+
+    def test_unmodified_parent_is_read_from_the_cache(self):
+        self.write_config("github:org/repo:parent.toml")
+        with patch("main.inherit_url", return_value=self.parent_url):
+            self.flatten()
+        not_modified = main.urllib.error.HTTPError(
+            self.parent_url, 304, "Not Modified", MagicMock(), None
+        )
+        with (
+            patch("main.inherit_url", return_value=self.parent_url),
+            patch("main.urllib.request.urlopen", side_effect=not_modified) as fetch,
+        ):
+            self.assertEqual(self.flatten(), self.expected())
+        request = fetch.call_args[0][0]
+        self.assertTrue(request.has_header("If-modified-since"))
+
+    def test_unreachable_parent_falls_back_to_the_cached_copy(self):
+        self.write_config("github:org/repo:parent.toml")
+        with patch("main.inherit_url", return_value=self.parent_url):
+            self.flatten()
+        offline_error = main.urllib.error.URLError("offline")
+        with (
+            patch("main.inherit_url", return_value=self.parent_url),
+            patch("main.urllib.request.urlopen", side_effect=offline_error),
+        ):
+            self.assertEqual(self.flatten(), self.expected())
+
+    def test_unreachable_parent_without_a_copy_is_left_to_commit_check(self):
+        self.write_config("github:org/repo:parent.toml")
+        with patch(
+            "main.urllib.request.urlopen",
+            side_effect=main.urllib.error.URLError("offline"),
+        ):
+            self.assertIsNone(self.flatten())
+
+    def test_inherit_url(self):
+        self.assertEqual(
+            main.inherit_url("github:org/repo@v1:cfg/cchk.toml"),
+            "https://raw.githubusercontent.com/org/repo/v1/cfg/cchk.toml",
+        )
+        self.assertEqual(
+            main.inherit_url("github:org/repo:cchk.toml"),
+            "https://raw.githubusercontent.com/org/repo/HEAD/cchk.toml",
+        )
+        self.assertEqual(main.inherit_url("github:repo"), "")
+        self.assertIsNone(main.inherit_url("../cchk.toml"))
+
+    def test_dump_toml_round_trips(self):
+        config = {
+            "top": 'quote " and \\ and \x7f and é',
+            "commit": {"n": 1, "ratio": 0.5, "on": False, "list": ["a", "b"]},
+            "deep": {"nested": {"key with space": "v"}, "rows": [{"a": 1}]},
+        }
+        self.assertEqual(main._parse_toml(main.dump_toml(config).encode()), config)
+
+    def test_checks_are_pointed_at_the_flattened_config(self):
+        result = MagicMock(returncode=0, stdout="{}")
+        with (
+            patch("main._config_path", "/tmp/flat.toml"),
+            patch("main.subprocess.run", return_value=result) as mock_run,
+        ):
+            main.run_check_json(["--message"], input_text="fix: x")
+        self.assertEqual(
+            mock_run.call_args[0][0],
+            [
+                "commit-check",
+                "--format",
+                "json",
+                "--config",
+                "/tmp/flat.toml",
+                "--message",
+            ],
+        )
+
+    def test_run_flattens_once_and_removes_the_file(self):
+        self.write_config("parent.toml")
+        seen = []
+
+        async def fake_checks(args, backend):
+            seen.append(main._config_path)
+            return []
+
+        with (
+            patch("main.flatten_config", new=flatten_config),
+            patch("main._run_checks_concurrently", new=fake_checks),
+        ):
+            main.run_commit_check()
+        self.assertTrue(seen[0].endswith(".toml"))
+        self.assertFalse(os.path.exists(seen[0]))
+        self.assertIsNone(main._config_path)
+
+
+class TestSkipUpstream(unittest.TestCase):
+    """Commits whose patch is already on the base branch are not checked."""
+
+    def setUp(self):
+        patcher = patch("main.SKIP_UPSTREAM_ENABLED", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(main._upstream.clear)
+
+    def git(self, *args: str) -> str:
+        return main.subprocess.run(
+            ["git", *args], capture_output=True, encoding="utf-8", check=True
+        ).stdout.strip()
+
+    def test_reads_the_cherry_mark(self):
+        process = rev_list("=a1\n+b2\n")
+        objects = fake_objects(a1="fix: first", b2="feat: second")
+        with patch("main.subprocess.Popen", return_value=process):
+            result = list(main.stream_commits("a...b", objects))
+        self.assertEqual(result, [("a1", "fix: first"), ("b2", "feat: second")])
+        self.assertEqual(main._upstream, {"a1"})
+
+    def test_rev_list_args_and_range(self):
+        self.assertEqual(main.rev_list_args(), ["--cherry-mark", "--right-only"])
+        self.assertEqual(main.commit_range("a", "b"), "a...b")
+        with patch("main.SKIP_UPSTREAM_ENABLED", False):
+            self.assertEqual(main.rev_list_args(), [])
+            self.assertEqual(main.commit_range("a", "b"), "a..b")
+
+    def test_finds_cherry_picked_commits(self):
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, cwd)
+        self.git("init", "--quiet", "--initial-branch=main")
+        self.git("config", "user.name", "Tester")
+        self.git("config", "user.email", "tester@example.com")
+        self.git("commit", "--quiet", "--allow-empty", "-m", "chore: root")
+        self.git("checkout", "--quiet", "-b", "pr")
+        for name in ("a", "b"):
+            with open(name, "w") as file:
+                file.write(name)
+            self.git("add", name)
+            self.git("commit", "--quiet", "-m", f"feat: add {name}")
+        picked = self.git("rev-parse", "HEAD~1")
+        self.git("checkout", "--quiet", "main")
+        # Diverge first, or the pick fast-forwards to the very same commit.
+        self.git("commit", "--quiet", "--allow-empty", "-m", "chore: base")
+        self.git("cherry-pick", picked)
+        self.addCleanup(main.close_git_objects)
+        commits = list(
+            main.stream_commits(main.commit_range("main", "pr"), main.git_objects())
+        )
+        self.assertEqual([msg for _sha, msg in commits], ["feat: add a", "feat: add b"])
+        self.assertEqual(main._upstream, {picked})
+
+    def test_upstream_commits_are_skipped(self):
+        main._upstream.add("a1")
+
+        def fake_run(command, input=None, **kwargs):
+            return MagicMock(returncode=0, stdout=json_output(make_check("message")))
+
+        with (
+            patch("main.results_namespace", return_value="ns"),
+            patch("main.subprocess.run", side_effect=fake_run) as mock_run,
+        ):
+            scopes = main.check_commit_messages(
+                [("a1", "fix: old"), ("b2", "fix: new")], ["--message"]
+            )
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[1]["input"], "fix: new")
+        self.assertEqual(
+            [(s.outcome, s.reason) for s in scopes],
+            [("skip", main.ALREADY_UPSTREAM), ("", "")],
+        )
+        self.assertEqual(main.exit_code_for(scopes), 0)
+
+
+class TestNativeObjects(unittest.TestCase):
+    """The pure-Python reader agrees with git, packed or not."""
+
+    def git(self, *args: str) -> str:
+        return main.subprocess.run(
+            ["git", *args], capture_output=True, encoding="utf-8", check=True
+        ).stdout.strip()
+
+    def make_repo(self) -> tuple[str, str]:
+        """A PR of a few commits, each changing a large file a little so a
+        repack stores them as deltas, checked out as GitHub's merge commit."""
+        cwd = os.getcwd()
+        os.chdir(tempfile.mkdtemp())
+        self.addCleanup(os.chdir, cwd)
+        self.git("init", "--quiet", "--initial-branch=main")
+        self.git("config", "user.name", "Tester")
+        self.git("config", "user.email", "tester@example.com")
+        lines = [f"line {i}\n" for i in range(2000)]
+
+        def commit(subject: str, line: int) -> None:
+            lines[line] = f"{subject}\n"
+            with open("file.txt", "w") as f:
+                f.writelines(lines)
+            self.git("add", "file.txt")
+            self.git("commit", "--quiet", "-m", subject)
+
+        commit("chore: root", 0)
+        self.git("tag", "-a", "-m", "v1", "v1")
+        self.git("checkout", "--quiet", "-b", "pr")
+        for i, subject in enumerate(("fix: first", "feat: second", "docs: third")):
+            commit(subject, 10 + i)
+        self.git("checkout", "--quiet", "main")
+        commit("chore: base", 1500)
+        self.git("update-ref", "refs/remotes/origin/main", "main")
+        self.git("checkout", "--quiet", "--detach")
+        self.git("merge", "--quiet", "--no-ff", "-m", "Merge", "pr")
+        self.git("notes", "--ref", main.NOTES_REF, "add", "-m", "note", "pr~1")
+        return self.git("rev-parse", "main"), self.git("rev-parse", "pr")
+
+    def assert_agrees_with_git(self) -> None:
+        native = main.NativeObjects()
+        self.addCleanup(native.close)
+        git = main.GitObjects()
+        self.addCleanup(git.close)
+        for name in (
+            "HEAD",
+            "HEAD^1",
+            "HEAD^2",
+            "HEAD^2~2",
+            "HEAD^{commit}",
+            "origin/main",
+            "pr",
+            "v1",
+            "v1^{commit}",
+            "HEAD:file.txt",
+            main.NOTES_REF,
+            "missing",
+            "HEAD^3",
+        ):
+            with self.subTest(name=name):
+                self.assertEqual(native.read(name), git.read(name))
+        head = native.resolve("HEAD^2")
+        assert head is not None
+        self.assertEqual(native.commit(head), git.commit(head))
+        self.assertEqual(native.note(main.NOTES_REF, head), None)
+        first_parent = native.resolve("HEAD^2~1")
+        assert first_parent is not None
+        self.assertEqual(native.note(main.NOTES_REF, first_parent), "note\n")
+        revisions = main.pr_commit_range(native)
+        self.assertEqual(revisions, main.pr_commit_range(git))
+        assert revisions is not None
+        self.assertEqual(list(native.walk(revisions)), list(main.rev_list(revisions)))
+        self.assertEqual(
+            [msg for _sha, msg in main.stream_commits(revisions, native)],
+            ["fix: first", "feat: second", "docs: third"],
+        )
+
+    def test_loose_objects(self):
+        self.make_repo()
+        self.assert_agrees_with_git()
+
+    def test_packed_objects_and_refs(self):
+        self.make_repo()
+        self.git("repack", "--quiet", "-adf")
+        self.git("pack-refs", "--all")
+        self.assertFalse(os.path.exists(".git/refs/heads/pr"))
+        self.assert_agrees_with_git()
+
+    def test_walk_through_merges_agrees_with_git(self):
+        self.make_repo()
+        self.git("checkout", "--quiet", "pr")
+        for i in range(3):
+            self.git("commit", "--quiet", "--allow-empty", "-m", f"fix: pr {i}")
+            self.git("checkout", "--quiet", "main")
+            self.git("commit", "--quiet", "--allow-empty", "-m", f"chore: main {i}")
+            self.git("checkout", "--quiet", "pr")
+            self.git("merge", "--quiet", "--no-edit", "main")
+        native = main.NativeObjects()
+        self.addCleanup(native.close)
+        self.assertEqual(list(native.walk("main..pr")), list(main.rev_list("main..pr")))
+
+    def test_commit_time_is_parsed(self):
+        commit = main.parse_commit_object(
+            "a1", b"committer C <c@example.com> 1700000000 +0100\n\nfix: x\n"
+        )
+        self.assertEqual(commit.commit_time, 1700000000)
+
+    def test_delta_is_applied(self):
+        base = b"0123456789"
+        # Sizes 10 -> 7; copy 4 bytes from offset 2, then insert "abc".
+        delta = bytes([10, 7, 0x80 | 0x01 | 0x10, 2, 4, 3]) + b"abc"
+        self.assertEqual(main.apply_delta(base, delta), b"2345abc")
+
+    def test_used_only_when_asked(self):
+        self.make_repo()
+        self.addCleanup(main.close_git_objects)
+        for native, upstream, reader in (
+            (False, False, main.GitObjects),
+            (True, False, main.NativeObjects),
+            # Patch-ids are git's to compute.
+            (True, True, main.GitObjects),
+        ):
+            main.close_git_objects()
+            with (
+                self.subTest(native=native, upstream=upstream),
+                patch.multiple(
+                    main, NATIVE_GIT_ENABLED=native, SKIP_UPSTREAM_ENABLED=upstream
+                ),
+            ):
+                self.assertIsInstance(main.git_objects(), reader)
+
+    def test_unsupported_repositories_fall_back_to_git(self):
+        self.make_repo()
+        self.git("config", "extensions.partialClone", "origin")
+        with self.assertRaises(main.UnsupportedRepository):
+            main.NativeObjects()
+        self.addCleanup(main.close_git_objects)
+        main.close_git_objects()
+        with (
+            patch("main.NATIVE_GIT_ENABLED", True),
+            patch("sys.stdout", new_callable=io.StringIO) as stdout,
+        ):
+            self.assertIsInstance(main.git_objects(), main.GitObjects)
+        self.assertIn("extensions.partialclone", stdout.getvalue())
+
+
+class TestDeepenShallowClone(unittest.TestCase):
+    """A shallow checkout fetches just enough history for the PR."""
+
+    def git(self, *args: str) -> str:
+        return main.subprocess.run(
+            ["git", *args], capture_output=True, encoding="utf-8", check=True
+        ).stdout.strip()
+
+    def make_clone(self, behind: int = 20) -> tuple[str, str]:
+        """A shallow clone of a PR of three commits, whose base branch moved
+        on by ``behind`` commits; returns the base and head SHAs."""
+        cwd = os.getcwd()
+        root = tempfile.mkdtemp()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(root)
+        self.git("init", "--quiet", "--initial-branch=main", "src")
+        os.chdir("src")
+        self.git("config", "user.name", "Tester")
+        self.git("config", "user.email", "tester@example.com")
+
+        def commit(*subjects: str) -> None:
+            for subject in subjects:
+                self.git("commit", "--quiet", "--allow-empty", "-m", subject)
+
+        commit(*(f"chore: old {i}" for i in range(30)))
+        self.git("checkout", "--quiet", "-b", "pr")
+        commit("fix: first", "feat: second", "docs: third")
+        self.git("checkout", "--quiet", "main")
+        commit(*(f"chore: base {i}" for i in range(behind)))
+        base, head = self.git("rev-parse", "main"), self.git("rev-parse", "pr")
+        os.chdir(root)
+        self.git("clone", "--quiet", "--bare", "src", "remote.git")
+        remote = "file://" + os.path.join(root, "remote.git").replace(os.sep, "/")
+        self.git("clone", "--quiet", "--depth=1", "--branch=pr", remote, "clone")
+        os.chdir("clone")
+        patcher = patch.multiple(
+            main,
+            get_pr_base_sha=MagicMock(return_value=base),
+            get_pr_head_sha=MagicMock(return_value=head),
+            get_pr_commit_count=MagicMock(return_value=3),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return base, head
+
+    def deepen(self) -> str:
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            main.deepen_shallow_clone()
+        return stdout.getvalue()
+
+    def test_fetches_until_the_merge_base_is_reached(self):
+        base, head = self.make_clone()
+        output = self.deepen()
+        self.git("merge-base", base, head)
+        self.addCleanup(main.close_git_objects)
+        revisions = main.commit_range(base, head)
+        self.assertEqual(
+            [msg for _sha, msg in main.stream_commits(revisions, main.git_objects())],
+            ["fix: first", "feat: second", "docs: third"],
+        )
+        # 3 + 16 commits deeper on the PR's side, which passes the fork
+        # point, and the base's 20 down to it; not the 30 older ones.
+        self.assertIn("in 1 round(s): 39 commits fetched", output)
+        self.assertEqual(self.git("rev-parse", "--is-shallow-repository"), "true")
+
+    def test_each_round_fetches_more(self):
+        base, head = self.make_clone()
+        with (
+            patch("main.DEEPEN_STEP", 1),
+            patch("main.get_pr_commit_count", return_value=None),
+        ):
+            output = self.deepen()
+        # 1 commit deep, then 2 more, which reaches the fork point.
+        self.assertIn("in 2 round(s)", output)
+        self.git("merge-base", base, head)
+
+    def test_rounds_are_capped(self):
+        base, head = self.make_clone()
+        with (
+            patch("main.DEEPEN_STEP", 1),
+            patch("main.get_pr_commit_count", return_value=None),
+            patch("main.DEEPEN_ROUNDS", 1),
+        ):
+            output = self.deepen()
+        self.assertIn("No merge base", output)
+        self.assertIn("in 1 round(s)", output)
+
+    def test_complete_histories_are_left_alone(self):
+        self.make_clone()
+        self.git("fetch", "--quiet", "--unshallow")
+        run = main.subprocess.run
+        with patch("main.subprocess.run", side_effect=run) as mock_run:
+            self.assertEqual(self.deepen(), "")
+        mock_run.assert_called_once()
+
+    def test_disabled_without_rounds_or_payload(self):
+        self.make_clone()
+        for rounds, base in ((0, "b0"), (8, None)):
+            with (
+                self.subTest(rounds=rounds, base=base),
+                patch("main.DEEPEN_ROUNDS", rounds),
+                patch("main.get_pr_base_sha", return_value=base),
+                patch("main.subprocess.run") as mock_run,
+            ):
+                main.deepen_shallow_clone()
+            mock_run.assert_not_called()
+
+
+class TestStreamedCommitChecks(unittest.TestCase):
+    """Commits still arriving from git are checked as they come."""
+
+    def setUp(self):
+        patcher = patch("main._result_cache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(main._upstream.clear)
+
+    def fake_run(self, command, input=None, **kwargs):
+        status = "fail" if input.startswith("bad") else "pass"
+        return MagicMock(
+            returncode=0,
+            stdout=json_output(make_check("message", status=status, value=input)),
+        )
+
+    def test_labels_and_shas_follow_git_order(self):
+        main._upstream.add("c3")
+        restored = [make_check("message", value="fix: restored")]
+        commits = iter(
+            [
+                ("a1", "fix: first"),
+                ("b2", "fix: restored"),
+                ("c3", "fix: picked"),
+                ("d4", "bad message"),
+            ]
+        )
+        with patch("main.subprocess.run", side_effect=self.fake_run) as mock_run:
+            scopes = main.check_commit_messages(
+                commits, ["--message"], {"b2": restored}
+            )
+        self.assertEqual(
+            [(s.label, s.sha, s.status) for s in scopes],
+            [
+                ("Commit 1/4", "a1", "pass"),
+                ("Commit 2/4", "b2", "pass"),
+                ("Commit 3/4", "c3", "skip"),
+                ("Commit 4/4", "d4", "fail"),
+            ],
+        )
+        self.assertEqual(scopes[1].checks, restored)
+        self.assertEqual(scopes[2].reason, main.ALREADY_UPSTREAM)
+        self.assertEqual(
+            [c.kwargs["input"] for c in mock_run.call_args_list],
+            ["fix: first", "bad message"],
+        )
+
+    def test_commits_git_did_not_list_in_time_are_reported(self):
+        def listing():
+            yield ("a1", "fix: first")
+            raise main.subprocess.TimeoutExpired(["git", "rev-list"], 5)
+
+        for limit in (0, 5):
+            with (
+                self.subTest(failure_limit=limit),
+                patch("main.is_pr_event", return_value=True),
+                patch("main.iter_pr_commits", side_effect=listing),
+                patch("main.get_pr_commit_count", return_value=3),
+                patch("main.failure_limit", return_value=limit),
+                patch("main._failures", 0),
+                patch("main.subprocess.run", side_effect=self.fake_run),
+            ):
+                scopes = main.check_commit_messages(
+                    main.get_pr_commits(), ["--message"]
+                )
+            self.assertEqual(
+                [(s.label, s.status) for s in scopes],
+                [("Commit 1/1", "pass"), ("Unlisted commits", "timeout")],
+            )
+            self.assertIn("the 2 remaining commits", scopes[1].reason)
+
+    def test_listing_timed_out_before_any_commit_does_not_check_head(self):
+        expired = main.subprocess.TimeoutExpired(["git", "rev-list"], 5)
+        with (
+            patch("main.is_pr_event", return_value=True),
+            patch("main.iter_pr_commits", side_effect=expired),
+            patch("main.get_pr_commit_count", return_value=None),
+            patch("main._failures", 0),
+            patch("main.subprocess.run") as mock_run,
+        ):
+            scopes = main.check_commit_messages(main.get_pr_commits(), ["--message"])
+        self.assertEqual(
+            [(s.label, s.status) for s in scopes], [("Unlisted commits", "timeout")]
+        )
+        self.assertIn("the remaining commits", scopes[0].reason)
+        mock_run.assert_not_called()
+
+    def test_checks_start_before_git_finishes(self):
+        checked = main.threading.Event()
+
+        def commits():
+            yield ("a1", "fix: first")
+            # Only continues once the first commit was checked, which would
+            # time out if checking waited for the whole list.
+            self.assertTrue(checked.wait(timeout=5))
+            yield ("b2", "fix: second")
+
+        def fake_run(command, input=None, **kwargs):
+            checked.set()
+            return self.fake_run(command, input)
+
+        with (
+            patch("main.MAX_WORKERS", 2),
+            patch("main.BACKEND", "parallel"),
+            patch("main.subprocess.run", side_effect=fake_run),
+        ):
+            scopes = main.check_commit_messages(commits(), ["--message"])
+        self.assertEqual([s.label for s in scopes], ["Commit 1/2", "Commit 2/2"])
+
+    def test_no_commits_checks_head(self):
+        with patch("main.check_scope", return_value=pass_scope("Commit message")):
+            scopes = main.check_commit_messages(iter(()), ["--message"])
+        self.assertEqual([s.label for s in scopes], ["Commit message"])
+
+    def test_failure_limits_wait_for_every_commit(self):
+        commits = [("a1", "fix: first"), ("b2", "fix: second")]
+        with (
+            patch("main.FAIL_FAST_ENABLED", True),
+            patch("main.run_pr_message_checks", return_value=[]) as mock_pr,
+        ):
+            main.check_commit_messages(iter(commits), ["--message"])
+        self.assertEqual(mock_pr.call_args[0][0], ["fix: first", "fix: second"])